@@ -0,0 +1,325 @@
+"""
+离线基准测试：本地生成合成媒体语料，直接驱动各提取器并统计耗时、吞吐与内存峰值
+
+用法（在插件根目录下执行，需要已安装 AstrBot 运行环境）：
+    python bench/bench_extract.py                       # 运行并打印结果
+    python bench/bench_extract.py --save base.json      # 保存为基线
+    python bench/bench_extract.py --baseline base.json  # 与基线对比
+    python bench/bench_extract.py --enable enable_pixel_stats  # 打开可选功能
+    python bench/bench_extract.py --pixel-stats         # 像素统计阶段与 EXIF 阶段对比
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+from PIL.TiffImagePlugin import IFDRational
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.extractor import AudioExtractor, ImageExtractor, VideoExtractor  # noqa: E402
+from core.file_type import FileExt  # noqa: E402
+from core.media_source import MediaSource  # noqa: E402
+
+
+class MockGeoResolver:
+    """不联网的逆地理解析替身"""
+
+    async def resolve(self, gps_info: dict) -> str:
+        return "模拟地址"
+
+    async def close(self):
+        pass
+
+
+def load_config() -> dict:
+    """以配置 schema 的默认值充当 AstrBotConfig"""
+    schema = json.loads((ROOT / "_conf_schema.json").read_text(encoding="utf-8"))
+    conf = {key: item.get("default") for key, item in schema.items()}
+    conf["enable_geo_resolver"] = True
+    conf["enable_phash"] = False
+    return conf
+
+
+# -------------------- 语料生成 --------------------
+
+
+def make_jpeg(
+    size: tuple[int, int], comment_len: int, gps: bool, off_type: bool = False
+) -> bytes:
+    img = Image.new("RGB", size, (120, 160, 200))
+    exif = Image.Exif()
+    exif[0x010F] = "BenchMake"  # Make
+    exif[0x0110] = "BenchModel"  # Model
+    exif[0x0132] = "2024:01:01 12:00:00"  # DateTime
+    sub = exif.get_ifd(0x8769)
+    sub[0x9286] = b"ASCII\x00\x00\x00" + b"filter: none; " * (comment_len // 14)
+    if off_type:
+        # 类型不符合标准的数值标签，覆盖格式化器的回退路径
+        sub[0x829D] = "f2.8"  # FNumber
+        sub[0x829A] = "1/100"  # ExposureTime
+        sub[0x9204] = "abc"  # ExposureBiasValue
+        sub[0x920A] = (IFDRational(50, 1), IFDRational(35, 1))  # FocalLength
+    if gps:
+        gps_ifd = exif.get_ifd(0x8825)
+        gps_ifd.update({1: "N", 2: (31.0, 14.0, 2.5), 3: "E", 4: (121.0, 28.0, 0.1)})
+    buf = BytesIO()
+    img.save(buf, "JPEG", exif=exif, quality=85)
+    return buf.getvalue()
+
+
+def make_wav(seconds: float, rate: int = 44100, channels: int = 2) -> bytes:
+    frames = int(seconds * rate)
+    buf = BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        pattern = struct.pack("<hh", 12000, -12000) * (channels // 2 or 1)
+        w.writeframes(pattern * (frames // (len(pattern) // (2 * channels))))
+    return buf.getvalue()
+
+
+def make_flac(seconds: float, rate: int = 44100, channels: int = 2) -> bytes:
+    """仅含 STREAMINFO + VORBIS_COMMENT 的最小 FLAC，足以让 mutagen 读取信息"""
+    total = int(seconds * rate)
+    info = struct.pack(">HH", 4096, 4096) + b"\x00" * 6
+    packed = (rate << 44) | ((channels - 1) << 41) | (15 << 36) | total
+    info += packed.to_bytes(8, "big") + b"\x00" * 16
+    vendor = b"bench"
+    comments = [b"TITLE=Bench", b"ARTIST=Synthetic"]
+    vc = struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", len(comments))
+    vc += b"".join(struct.pack("<I", len(c)) + c for c in comments)
+    blocks = b"\x00" + len(info).to_bytes(3, "big") + info
+    blocks += b"\x84" + len(vc).to_bytes(3, "big") + vc
+    return b"fLaC" + blocks + b"\xff\xf8" + b"\x00" * 64
+
+
+def _ogg_crc(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1
+            crc &= 0xFFFFFFFF
+    return crc
+
+
+def _ogg_page(packet: bytes, seq: int, granule: int, flags: int) -> bytes:
+    segments = [255] * (len(packet) // 255) + [len(packet) % 255]
+    header = struct.pack("<4sBBqIII", b"OggS", 0, flags, granule, 1, seq, 0)
+    page = header + bytes([len(segments)]) + bytes(segments) + packet
+    return page[:22] + struct.pack("<I", _ogg_crc(page)) + page[26:]
+
+
+def make_ogg(seconds: float, rate: int = 44100, channels: int = 2) -> bytes:
+    """Vorbis 标识头 + 注释头，末页 granule 决定时长"""
+    ident = b"\x01vorbis" + struct.pack("<IBIiii", 0, channels, rate, 0, 128000, 0)
+    ident += b"\xb8\x01"
+    vendor = b"bench"
+    comment = b"\x03vorbis" + struct.pack("<I", len(vendor)) + vendor
+    comment += struct.pack("<I", 1) + struct.pack("<I", 11) + b"TITLE=Bench" + b"\x01"
+    return (
+        _ogg_page(ident, 0, 0, 0x02)
+        + _ogg_page(comment, 1, 0, 0)
+        + _ogg_page(b"\x00" * 32, 2, int(seconds * rate), 0x04)
+    )
+
+
+def make_amr(seconds: float) -> bytes:
+    return b"#!AMR\n" + (b"\x3c" + b"\x00" * 31) * int(seconds * 50)
+
+
+def make_silk(seconds: float) -> bytes:
+    frame = struct.pack("<H", 40) + b"\x00" * 40
+    return b"\x02#!SILK_V3" + frame * int(seconds * 50)
+
+
+def make_ffmpeg_video(fmt: str, seconds: int, tmp: Path) -> bytes | None:
+    if not shutil.which("ffmpeg"):
+        return None
+    out = tmp / f"bench.{fmt}"
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc=size=640x360:rate=30:duration={seconds}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=duration={seconds}",
+        "-shortest",
+        str(out),
+    ]
+    if subprocess.run(cmd, capture_output=True).returncode != 0:
+        return None
+    return out.read_bytes()
+
+
+def build_corpus(tmp: Path) -> dict[str, bytes]:
+    corpus = {
+        "jpeg_small_plain": make_jpeg((640, 480), 0, False),
+        "jpeg_large_gps": make_jpeg((4000, 3000), 256, True),
+        "jpeg_huge_comment": make_jpeg((1920, 1080), 16 * 1024, True),
+        "jpeg_off_type_exif": make_jpeg((640, 480), 0, False, off_type=True),
+        "wav_10s": make_wav(10),
+        "wav_120s": make_wav(120),
+        "flac_60s": make_flac(60),
+        "ogg_60s": make_ogg(60),
+        "amr_30s": make_amr(30),
+        "silk_30s": make_silk(30),
+    }
+    for fmt in ("mp4", "mkv"):
+        if data := make_ffmpeg_video(fmt, 10, tmp):
+            corpus[f"{fmt}_10s"] = data
+    return corpus
+
+
+# -------------------- 执行 --------------------
+
+
+async def run_one(extractors: dict, name: str, data: bytes, rounds: int) -> dict:
+    ext = FileExt.from_bytes(data)
+    media = ext.media_type()
+
+    async def call():
+        with MediaSource.from_bytes(data) as source:
+            if media == "image":
+                return await extractors["image"].get_image_info(source, ext)
+            if media == "audio":
+                return await extractors["audio"].get_audio_info(source, ext)
+            if media == "video":
+                return await extractors["video"].get_video_info(source, ext)
+        return FileExt.from_bytes(data).is_known()  # 未知格式只测类型识别
+
+    latencies = []
+    tracemalloc.start()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(latencies)
+    return {
+        "ext": ext.value,
+        "size": len(data),
+        "ok": bool(result),
+        "median_ms": round(median, 3),
+        "p95_ms": round(sorted(latencies)[math.ceil(0.95 * rounds) - 1], 3),  # 最近秩
+        "mb_per_s": round(len(data) / 1024 / 1024 / (median / 1000), 1)
+        if median
+        else 0,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+async def compare_pixel_stats(conf: dict, corpus: dict[str, bytes], rounds: int):
+    """JPEG 语料上 EXIF 阶段与像素统计阶段的中位耗时对比"""
+    from core.pixel_stats import analyze_pixels
+
+    extractor = ImageExtractor({**conf, "enable_pixel_stats": False}, MockGeoResolver())
+    print(f"{'文件':<20}{'EXIF ms':>10}{'像素统计 ms':>14}{'倍数':>8}")
+    for name, data in corpus.items():
+        if not name.startswith("jpeg"):
+            continue
+        exif_ms, pixel_ms = [], []
+        for _ in range(rounds):
+            with MediaSource.from_bytes(data) as source:
+                start = time.perf_counter()
+                await extractor.get_image_details(source, FileExt.JPG)
+                exif_ms.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                analyze_pixels(source, conf["pixel_stats_max_pixels"])
+                pixel_ms.append((time.perf_counter() - start) * 1000)
+        exif, pixel = statistics.median(exif_ms), statistics.median(pixel_ms)
+        print(f"{name:<20}{exif:>10.3f}{pixel:>14.3f}{pixel / exif:>8.1f}")
+
+
+def print_report(results: dict, baseline: dict | None):
+    header = (
+        f"{'文件':<20}{'类型':<8}{'大小KB':>10}{'中位ms':>10}"
+        f"{'p95ms':>10}{'MB/s':>9}{'峰值KB':>10}"
+    )
+    if baseline:
+        header += f"{'对比基线':>10}"
+    print(header)
+    for name, r in results.items():
+        line = (
+            f"{name:<20}{r['ext']:<8}{r['size'] / 1024:>10.1f}{r['median_ms']:>10.3f}"
+            f"{r['p95_ms']:>10.3f}{r['mb_per_s']:>9.1f}{r['peak_kb']:>10.1f}"
+        )
+        if baseline and (base := baseline.get(name)) and base["median_ms"]:
+            delta = (r["median_ms"] - base["median_ms"]) / base["median_ms"]
+            line += f"{delta:>+10.1%}"
+        if not r["ok"]:
+            line += "  (无结果)"
+        print(line)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="astrbot_plugin_extract 离线基准测试")
+    parser.add_argument("--rounds", type=int, default=20, help="每个文件的重复次数")
+    parser.add_argument("--save", type=Path, help="将结果保存为基线 JSON")
+    parser.add_argument("--baseline", type=Path, help="与指定基线 JSON 对比")
+    parser.add_argument("--filter", default="", help="只运行名称包含该字符串的文件")
+    parser.add_argument(
+        "--enable", action="append", default=[], help="打开指定的布尔配置项，可重复"
+    )
+    parser.add_argument(
+        "--pixel-stats", action="store_true", help="对比像素统计阶段与 EXIF 阶段的耗时"
+    )
+    args = parser.parse_args()
+
+    conf = load_config()
+    for key in args.enable:
+        conf[key] = True
+    extractors = {
+        "image": ImageExtractor(conf, MockGeoResolver()),
+        "audio": AudioExtractor(conf),
+        "video": VideoExtractor(conf),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(Path(tmp))
+
+    if args.pixel_stats:
+        await compare_pixel_stats(conf, corpus, args.rounds)
+        return
+
+    results = {}
+    for name, data in corpus.items():
+        if args.filter in name:
+            results[name] = await run_one(extractors, name, data, args.rounds)
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    print_report(results, baseline)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n基线已保存到 {args.save}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
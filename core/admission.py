@@ -0,0 +1,148 @@
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+MAX_BUCKETS = 10000  # 令牌桶数量上限，超出后淘汰最久未用的
+
+
+class TokenBucket:
+    """令牌桶：容量为每分钟额度（次数 / 字节 / 秒），按秒匀速回填"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float = 1) -> float:
+        """取出 amount 个令牌需要等待的秒数，不扣除"""
+        self._refill()
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """成功返回 0，否则返回需要等待的秒数"""
+        if wait := self.wait_time(amount):
+            return wait
+        self.tokens -= amount
+        return 0.0
+
+    def consume(self, amount: float):
+        """事后扣除实际用量（如耗时），允许透支，透支部分靠回填偿还"""
+        self._refill()
+        self.tokens -= amount
+
+    def exhausted(self) -> bool:
+        self._refill()
+        return self.tokens <= 0
+
+
+class RateLimiter:
+    """按 key（用户 / 群）分别限流，per_minute 为 0 表示不限"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def bucket(self, key: str) -> TokenBucket | None:
+        """取出（必要时创建）key 对应的令牌桶，不限流时返回 None"""
+        if self.per_minute <= 0 or not key:
+            return None
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.per_minute)
+            if len(self.buckets) > MAX_BUCKETS:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket
+
+
+class SingleFlight:
+    """
+    相同 key 的并发请求只执行一次，其余请求等待并共享结果
+    实际工作在独立任务中执行，发起者被取消时不影响其它等待者
+    """
+
+    def __init__(self):
+        self.inflight: dict[Any, asyncio.Future] = {}
+
+    async def do(
+        self, key: Any, func: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """返回 (结果, 是否复用了其它请求的结果)"""
+        if task := self.inflight.get(key):
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(func())
+        self.inflight[key] = task
+
+        def done(t: asyncio.Future):
+            if self.inflight.get(key) is t:
+                del self.inflight[key]
+            if not t.cancelled():
+                t.exception()  # 标记异常已取回，避免无人等待时告警
+
+        task.add_done_callback(done)
+        return await asyncio.shield(task), False
+
+
+class AdmissionController:
+    """
+    解析请求准入：用户 / 群令牌桶 + 全局并发上限 + 单飞合并
+    并发上限分为下载（此时尚未识别媒体类型）与按媒体类型的提取两类槽位
+    """
+
+    def __init__(self, config):
+        self.user_limiter = RateLimiter(config["user_rate_limit"])
+        self.group_limiter = RateLimiter(config["group_rate_limit"])
+        self.semaphores = {
+            media: asyncio.Semaphore(limit)
+            for media in ("image", "audio", "video", "download")
+            if (limit := config[f"max_inflight_{media}"]) > 0
+        }
+        self.flight = SingleFlight()
+        self.active = 0  # 正在处理的用户请求数，后台预解析据此让路
+
+    def check_rate(self, user_id: str, group_id: str) -> float:
+        """返回需要等待的秒数，0 表示放行；两个桶都有余量时才同时扣除"""
+        buckets = [
+            b
+            for b in (
+                self.user_limiter.bucket(user_id),
+                self.group_limiter.bucket(group_id),
+            )
+            if b is not None
+        ]
+        if wait := max((b.wait_time() for b in buckets), default=0.0):
+            return wait
+        for b in buckets:
+            b.try_acquire()
+        return 0.0
+
+    @contextlib.contextmanager
+    def track(self):
+        """标记一个用户请求的处理区间"""
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+
+    def busy(self, media: str) -> bool:
+        """有用户请求在处理，或该媒体类型的并发槽位已占满"""
+        sem = self.semaphores.get(media)
+        return self.active > 0 or (sem is not None and sem.locked())
+
+    def slot(self, media: str) -> contextlib.AbstractAsyncContextManager:
+        """按媒体类型占用并发槽位，未设置上限时为空上下文"""
+        return self.semaphores.get(media) or contextlib.nullcontext()
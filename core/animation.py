@@ -0,0 +1,162 @@
+import struct
+
+from .file_type import FileExt
+
+# APNG 中 delay_den 为 0 时按 1/100 秒处理
+APNG_DEFAULT_DEN = 100
+
+
+def parse_animation(data: bytes | memoryview, ext: FileExt) -> dict | None:
+    """
+    逐块扫描动图容器，统计帧数、帧间隔、总时长、循环次数（不解码像素）
+    仅对多帧图片返回结果，静态图返回 None
+    """
+    try:
+        if ext == FileExt.GIF:
+            result = _walk_gif(data)
+        elif ext == FileExt.WEBP:
+            result = _walk_webp(data)
+        elif ext == FileExt.PNG:
+            result = _walk_apng(data)
+        else:
+            return None
+    except (struct.error, IndexError, ValueError):
+        return None
+
+    if not result or result["frames"] <= 1:
+        return None
+    result["duration"] = sum(result["delays"])
+    return result
+
+
+# -------------------- GIF --------------------
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """跳过以 0 结尾的数据子块序列，返回其后的位置"""
+    size = data[pos]
+    while size:
+        pos += size + 1
+        size = data[pos]
+    return pos + 1
+
+
+def _walk_gif(data: bytes) -> dict | None:
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        return None
+
+    packed = data[10]
+    pos = 13
+    if packed & 0x80:
+        pos += 3 << ((packed & 0x07) + 1)
+
+    delays: list[int] = []
+    loop = 1  # 无 NETSCAPE 扩展时只播放一次
+    pending_delay = 0
+    end = len(data)
+
+    while pos < end:
+        block = data[pos]
+        if block == 0x3B:  # Trailer
+            break
+
+        if block == 0x21:  # Extension
+            label = data[pos + 1]
+            pos += 2
+            if label == 0xF9 and data[pos] >= 4:  # Graphic Control Extension
+                pending_delay = struct.unpack_from("<H", data, pos + 2)[0] * 10
+            elif label == 0xFF and data[pos] == 11:  # Application Extension
+                app_id = data[pos + 1 : pos + 12]
+                sub = pos + 12
+                if app_id in (b"NETSCAPE2.0", b"ANIMEXTS1.0") and data[sub] >= 3:
+                    if data[sub + 1] == 1:
+                        count = struct.unpack_from("<H", data, sub + 2)[0]
+                        loop = 0 if count == 0 else count + 1
+            pos = _skip_sub_blocks(data, pos)
+
+        elif block == 0x2C:  # Image Descriptor
+            flags = data[pos + 9]
+            pos += 10
+            if flags & 0x80:
+                pos += 3 << ((flags & 0x07) + 1)
+            pos = _skip_sub_blocks(data, pos + 1)  # 跳过 LZW 最小码长 + 数据
+            delays.append(pending_delay)
+            pending_delay = 0
+
+        else:
+            break
+
+    return {"frames": len(delays), "delays": delays, "loop": loop}
+
+
+# -------------------- WebP --------------------
+
+
+def _walk_webp(data: bytes) -> dict | None:
+    if data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        return None
+
+    delays: list[int] = []
+    loop = 0
+    pos = 12
+    end = min(len(data), struct.unpack_from("<I", data, 4)[0] + 8)
+
+    while pos + 8 <= end:
+        fourcc = data[pos : pos + 4]
+        size = struct.unpack_from("<I", data, pos + 4)[0]
+        body = pos + 8
+        if fourcc == b"ANIM":
+            loop = struct.unpack_from("<H", data, body + 4)[0]
+        elif fourcc == b"ANMF":
+            duration = int.from_bytes(data[body + 12 : body + 15], "little")
+            delays.append(duration)
+        pos = body + size + (size & 1)
+
+    return {"frames": len(delays), "delays": delays, "loop": loop}
+
+
+# -------------------- APNG --------------------
+
+
+def _walk_apng(data: bytes) -> dict | None:
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+
+    delays: list[int] = []
+    loop = 0
+    animated = False
+    pos = 8
+    end = len(data)
+
+    while pos + 8 <= end:
+        length = struct.unpack_from(">I", data, pos)[0]
+        ctype = data[pos + 4 : pos + 8]
+        body = pos + 8
+        if ctype == b"acTL":
+            animated = True
+            loop = struct.unpack_from(">I", data, body + 4)[0]
+        elif ctype == b"fcTL":
+            num, den = struct.unpack_from(">HH", data, body + 20)
+            delays.append(round(num * 1000 / (den or APNG_DEFAULT_DEN)))
+        elif ctype == b"IEND":
+            break
+        pos = body + length + 4  # 数据 + CRC
+
+    if not animated:
+        return None
+    return {"frames": len(delays), "delays": delays, "loop": loop}
+
+
+# -------------------- 格式化 --------------------
+
+
+def format_delays(delays: list[int], max_runs: int = 8) -> str:
+    """将帧间隔压缩为游程形式，例如：100ms×12, 200ms×3"""
+    runs: list[list[int]] = []
+    for d in delays:
+        if runs and runs[-1][0] == d:
+            runs[-1][1] += 1
+        else:
+            runs.append([d, 1])
+    text = ", ".join(f"{d}ms×{n}" if n > 1 else f"{d}ms" for d, n in runs[:max_runs])
+    return text + ", ..." if len(runs) > max_runs else text
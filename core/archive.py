@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import math
+import sqlite3
+import time
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from pathlib import Path
+
+from astrbot.api import logger
+
+from .media_source import MediaSource
+
+GPS_CELL_SCALE = 100  # 0.01° 网格，约 1 km
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_meta (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    group_id TEXT,
+    user_id TEXT,
+    media TEXT,
+    ext TEXT,
+    content_hash TEXT,
+    make TEXT COLLATE NOCASE,
+    model TEXT COLLATE NOCASE,
+    taken_at REAL,
+    lat REAL,
+    lon REAL,
+    gps_cell TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_meta_hash ON media_meta (content_hash);
+CREATE INDEX IF NOT EXISTS idx_meta_camera ON media_meta (model, make);
+CREATE INDEX IF NOT EXISTS idx_meta_taken ON media_meta (taken_at);
+CREATE INDEX IF NOT EXISTS idx_meta_cell ON media_meta (gps_cell);
+CREATE INDEX IF NOT EXISTS idx_meta_group ON media_meta (group_id, ts);
+"""
+
+COLUMNS = (
+    "ts",
+    "group_id",
+    "user_id",
+    "media",
+    "ext",
+    "content_hash",
+    "make",
+    "model",
+    "taken_at",
+    "lat",
+    "lon",
+    "gps_cell",
+    "details",
+)
+
+# 拍摄时间的常见写法：EXIF / ISO 8601
+TIME_FORMATS = ("%Y:%m:%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+
+def content_hash(source: MediaSource) -> str:
+    """内容哈希，hashlib 处理大块数据时会释放 GIL"""
+    return hashlib.blake2b(source.view, digest_size=16).hexdigest()
+
+
+def gps_cell(lat: float, lon: float) -> str:
+    return f"{math.floor(lat * GPS_CELL_SCALE)}:{math.floor(lon * GPS_CELL_SCALE)}"
+
+
+def parse_taken_at(value) -> float | None:
+    """拍摄时间转时间戳；EXIF 时间不带时区，按本地时间处理"""
+    if not value:
+        return None
+    text = str(value).strip("\x00 ")
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text[:19], fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def _clean(value) -> str | None:
+    if not value:
+        return None
+    return str(value).strip("\x00 ") or None
+
+
+def _json_default(obj):
+    if is_dataclass(obj):
+        return asdict(obj)
+    return str(obj)
+
+
+class MetadataArchive:
+    """
+    解析结果归档（SQLite）
+    写入先进入内存队列，由后台任务按间隔或批量阈值合并为一个事务落盘，
+    不占用解析请求的热路径
+    """
+
+    def __init__(self, db_path: Path, flush_interval: float = 5, batch_size: int = 200):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.pending: list[tuple] = []
+        self.wakeup = asyncio.Event()
+        self.lock = asyncio.Lock()  # 串行化落盘与查询对连接的使用
+        self.task: asyncio.Task | None = None
+        self.closing = False
+
+    # -------------------- 写入 --------------------
+
+    def record(
+        self,
+        media: str,
+        ext: str,
+        details: dict,
+        digest: str | None,
+        group_id: str | None,
+        user_id: str | None,
+    ):
+        """只做字段提取并入队，落盘由后台任务完成"""
+        camera = details.get("camera") or {}
+        lat, lon = details.get("coordinates") or (None, None)
+        row = (
+            time.time(),
+            group_id or None,
+            user_id or None,
+            media,
+            ext,
+            digest,
+            _clean(camera.get("make")),
+            _clean(camera.get("model")),
+            parse_taken_at(camera.get("datetime")),
+            lat,
+            lon,
+            gps_cell(lat, lon) if lat is not None else None,
+            json.dumps(details, ensure_ascii=False, default=_json_default),
+        )
+        self.pending.append(row)
+        if self.task is None:
+            self.task = asyncio.create_task(self._flush_loop())
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+
+    async def _flush_loop(self):
+        while not self.closing:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        rows, self.pending = self.pending, []
+        async with self.lock:
+            try:
+                await asyncio.to_thread(self._write, rows)
+            except sqlite3.Error as e:
+                logger.warning(f"解析结果归档写入失败（丢弃 {len(rows)} 条）: {e}")
+
+    def _write(self, rows: list[tuple]):
+        placeholders = ", ".join("?" * len(COLUMNS))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO media_meta ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+
+    # -------------------- 查询 --------------------
+
+    async def query(
+        self,
+        group_id: str | None = None,
+        model: str | None = None,
+        since: float | None = None,
+        digest: str | None = None,
+        cell: str | None = None,
+        limit: int = 10,
+    ) -> tuple[int, list[dict]]:
+        """按索引列过滤，返回 (总数, 最近 limit 条)；model 为前缀匹配"""
+        clauses, params = [], []
+        if group_id:
+            clauses.append("group_id = ?")
+            params.append(group_id)
+        if model:
+            escaped = (
+                model.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            clauses.append("model LIKE ? ESCAPE '\\'")
+            params.append(escaped + "%")
+        if since:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if digest:
+            clauses.append("content_hash = ?")
+            params.append(digest)
+        if cell:
+            clauses.append("gps_cell = ?")
+            params.append(cell)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        def run():
+            total = self.conn.execute(
+                f"SELECT COUNT(*) FROM media_meta{where}", params
+            ).fetchone()[0]
+            cur = self.conn.execute(
+                "SELECT ts, group_id, user_id, media, ext, make, model, taken_at "
+                f"FROM media_meta{where} ORDER BY ts DESC LIMIT ?",
+                [*params, limit],
+            )
+            cols = [c[0] for c in cur.description]
+            return total, [dict(zip(cols, row)) for row in cur.fetchall()]
+
+        await self.flush()  # 先落盘队列中的记录，保证查询结果完整
+        async with self.lock:
+            return await asyncio.to_thread(run)
+
+    # -------------------- 释放 --------------------
+
+    async def close(self):
+        """等待后台任务写完当前批次后退出，再落盘剩余记录"""
+        if self.task:
+            self.closing = True
+            self.wakeup.set()
+            await self.task
+            self.task = None
+        await self.flush()
+        self.conn.close()
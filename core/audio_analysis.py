@@ -0,0 +1,262 @@
+import math
+import shutil
+import struct
+import subprocess
+import threading
+
+import numpy as np
+from astrbot.api import logger
+
+from .media_source import MediaSource
+
+CHUNK_FRAMES = 1 << 16  # 每次处理的采样帧数
+WINDOW_MS = 50  # 静音判定窗口
+SILENCE_DB = -60.0  # 低于该电平视为静音
+SPARK_WIDTH = 32  # 波形缩略图宽度
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+FFMPEG_TIMEOUT = 30.0  # ffmpeg 解码的默认时限（秒），超时后终止进程
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class PcmAnalyzer:
+    """
+    流式 PCM 统计：峰值、RMS、近似响度、静音占比、波形缩略图
+    按块喂入归一化到 [-1, 1] 的 float32 数组（帧 × 声道），内存占用与时长无关
+    """
+
+    def __init__(self, sample_rate: int, channels: int, total_frames: int):
+        self.channels = channels
+        self.window = max(1, sample_rate * WINDOW_MS // 1000)
+        self.total_frames = max(1, total_frames)
+        self.frames = 0
+        self.peak = 0.0
+        self.sum_sq = 0.0
+        self.windows = 0
+        self.silent_windows = 0
+        self.spark = np.zeros(SPARK_WIDTH, dtype=np.float32)
+        self._silence_rms = 10 ** (SILENCE_DB / 20)
+        self._tail = np.empty((0, channels), dtype=np.float32)
+
+    def feed(self, block: np.ndarray):
+        if self._tail.size:
+            block = np.concatenate([self._tail, block])
+        n_win = len(block) // self.window
+        used = n_win * self.window
+        self._tail = block[used:].copy()
+        if n_win:
+            self._consume(block[:used], n_win)
+
+    def result(self) -> dict | None:
+        if self._tail.size:
+            self._consume(self._tail, 1, partial=True)
+            self._tail = self._tail[:0]
+        if not self.frames:
+            return None
+
+        mean_sq = self.sum_sq / (self.frames * self.channels)
+        rms = math.sqrt(mean_sq)
+        top = float(self.spark.max()) or 1.0
+        levels = np.minimum(
+            (self.spark / top * len(SPARK_CHARS)).astype(int), len(SPARK_CHARS) - 1
+        )
+        return {
+            "peak_db": _to_db(self.peak),
+            "rms_db": _to_db(rms),
+            # 未做 K 加权，仅为 BS.1770 的近似值
+            "lufs": round(-0.691 + 10 * math.log10(mean_sq * self.channels), 1)
+            if mean_sq
+            else None,
+            "silence_ratio": round(self.silent_windows / max(1, self.windows), 4),
+            "waveform": "".join(SPARK_CHARS[i] for i in levels),
+        }
+
+    # -------------------- 内部逻辑 --------------------
+
+    def _consume(self, block: np.ndarray, n_win: int, partial: bool = False):
+        abs_block = np.abs(block)
+        self.peak = max(self.peak, float(abs_block.max()))
+        sq = np.square(block, dtype=np.float64)
+        self.sum_sq += float(sq.sum())
+
+        if partial:
+            win_rms = np.sqrt(sq.mean(keepdims=True)).reshape(1)
+            win_peak = abs_block.max(keepdims=True).reshape(1)
+        else:
+            per_win = sq.reshape(n_win, -1)
+            win_rms = np.sqrt(per_win.mean(axis=1))
+            win_peak = abs_block.reshape(n_win, -1).max(axis=1)
+
+        self.windows += n_win
+        self.silent_windows += int((win_rms < self._silence_rms).sum())
+
+        # 每个窗口按其起始位置映射到缩略图的列
+        starts = self.frames + np.arange(n_win) * self.window
+        cols = np.minimum(starts * SPARK_WIDTH // self.total_frames, SPARK_WIDTH - 1)
+        np.maximum.at(self.spark, cols, win_peak.astype(np.float32))
+        self.frames += len(block)
+
+
+def analyze_audio(
+    source: MediaSource,
+    sample_rate: int | None = None,
+    channels: int | None = None,
+    duration: float | None = None,
+    timeout: float = FFMPEG_TIMEOUT,
+) -> dict | None:
+    """
+    WAV 直接读 PCM，其它格式在有 ffmpeg 时解码为 PCM 流再统计
+    整个过程是同步的，调用方应放到线程中执行
+    """
+    data = source.view
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return _analyze_wav(data)
+    if sample_rate and channels and duration and shutil.which("ffmpeg"):
+        total_frames = int(duration * sample_rate)
+        return _analyze_with_ffmpeg(
+            source, sample_rate, channels, total_frames, timeout
+        )
+    return None
+
+
+# -------------------- WAV --------------------
+
+
+def _analyze_wav(data: memoryview) -> dict | None:
+    fmt, pcm_range = _locate_wav_chunks(data)
+    if not fmt or not pcm_range:
+        return None
+
+    tag, channels, sample_rate, _, block_align, bits = struct.unpack_from(
+        "<HHIIHH", data, fmt
+    )
+    if tag == WAVE_FORMAT_EXTENSIBLE:
+        tag = struct.unpack_from("<H", data, fmt + 24)[0]  # SubFormat GUID 前 2 字节
+
+    sample_bytes = bits // 8
+    if not channels or block_align != sample_bytes * channels:
+        return None
+    if tag == WAVE_FORMAT_FLOAT and sample_bytes not in (4, 8):
+        return None
+    if tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_FLOAT):
+        return None
+
+    start, end = pcm_range
+    end = start + (end - start) // block_align * block_align
+    total_frames = (end - start) // block_align
+    analyzer = PcmAnalyzer(sample_rate, channels, total_frames)
+
+    step = CHUNK_FRAMES * block_align
+    for pos in range(start, end, step):
+        raw = data[pos : min(pos + step, end)]
+        analyzer.feed(_decode_pcm(raw, tag, sample_bytes, channels))
+    return analyzer.result()
+
+
+def _locate_wav_chunks(data: memoryview) -> tuple[int | None, tuple[int, int] | None]:
+    """返回 fmt 块数据起点与 data 块数据区间"""
+    fmt = pcm = None
+    pos = 12
+    while pos + 8 <= len(data):
+        cid = data[pos : pos + 4]
+        size = struct.unpack_from("<I", data, pos + 4)[0]
+        body = pos + 8
+        if cid == b"fmt ":
+            fmt = body
+        elif cid == b"data":
+            pcm = (body, min(body + size, len(data)))
+            break
+        pos = body + size + (size & 1)
+    return fmt, pcm
+
+
+def _decode_pcm(
+    raw: memoryview, tag: int, sample_bytes: int, channels: int
+) -> np.ndarray:
+    """把原始 PCM 字节视图转为 float32 (帧 × 声道)，除 24 bit 外均不拷贝原始数据"""
+    if tag == WAVE_FORMAT_FLOAT:
+        arr = np.frombuffer(raw, dtype="<f4" if sample_bytes == 4 else "<f8")
+        return arr.astype(np.float32).reshape(-1, channels)
+
+    if sample_bytes == 1:  # 8 bit 为无符号
+        arr = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+        return ((arr - 128) / 128).reshape(-1, channels)
+    if sample_bytes == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        arr = (b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8
+        return (arr / float(1 << 23)).astype(np.float32).reshape(-1, channels)
+
+    dtype = {2: "<i2", 4: "<i4"}[sample_bytes]
+    arr = np.frombuffer(raw, dtype=dtype)
+    scale = float(1 << (sample_bytes * 8 - 1))
+    return (arr / scale).astype(np.float32).reshape(-1, channels)
+
+
+# -------------------- ffmpeg 解码 --------------------
+
+
+def _analyze_with_ffmpeg(
+    source: MediaSource,
+    sample_rate: int,
+    channels: int,
+    total_frames: int,
+    timeout: float,
+) -> dict | None:
+    try:
+        with source.path() as tmp_path:
+            return _decode_with_ffmpeg(
+                tmp_path, sample_rate, channels, total_frames, timeout
+            )
+    except Exception as e:
+        logger.debug(f"ffmpeg 解码音频失败: {e}")
+        return None
+
+
+def _decode_with_ffmpeg(
+    path: str, sample_rate: int, channels: int, total_frames: int, timeout: float
+) -> dict | None:
+    """超过时限时由计时器终止 ffmpeg，读取随之结束，结果作废"""
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        path,
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(channels),
+        "-",
+    ]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
+        assert proc.stdout
+        killer = threading.Timer(timeout, proc.kill)
+        killer.start()
+        try:
+            analyzer = PcmAnalyzer(sample_rate, channels, total_frames)
+            step = CHUNK_FRAMES * 2 * channels
+            pending = b""
+            while chunk := proc.stdout.read(step):
+                chunk = pending + chunk
+                usable = len(chunk) // (2 * channels) * 2 * channels
+                pending = chunk[usable:]
+                if usable:
+                    raw = memoryview(chunk)[:usable]
+                    analyzer.feed(_decode_pcm(raw, WAVE_FORMAT_PCM, 2, channels))
+            proc.wait()
+        finally:
+            killer.cancel()
+        if proc.returncode != 0:
+            logger.debug(f"ffmpeg 解码未完成（返回码 {proc.returncode}）")
+            return None
+        return analyzer.result()
+
+
+def _to_db(value: float) -> float | None:
+    return round(20 * math.log10(value), 1) if value > 0 else None
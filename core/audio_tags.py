@@ -0,0 +1,243 @@
+import base64
+import binascii
+import io
+import struct
+
+from mutagen.apev2 import APEBinaryValue
+from mutagen.flac import Picture
+from mutagen.id3 import APIC, Frame
+from mutagen.mp4 import MP4Cover, MP4FreeForm
+from PIL import Image
+
+from .utils import get_storage_size
+
+MAX_TEXT_CHARS = 200  # 单个文本标签的展示上限（歌词、备注等）
+MAX_VALUES = 10  # 同一标签的多个取值最多展示几个
+
+# ID3 帧 id → 通用键名
+ID3_KEYS = {
+    "TIT2": "title",
+    "TIT3": "subtitle",
+    "TPE1": "artist",
+    "TPE2": "albumartist",
+    "TALB": "album",
+    "TDRC": "date",
+    "TYER": "date",
+    "TCON": "genre",
+    "TRCK": "tracknumber",
+    "TPOS": "discnumber",
+    "TCOM": "composer",
+    "TEXT": "lyricist",
+    "TLAN": "language",
+    "TBPM": "bpm",
+    "TSRC": "isrc",
+    "TPUB": "publisher",
+    "TCOP": "copyright",
+    "TSSE": "encoder",
+    "TENC": "encodedby",
+    "COMM": "comment",
+    "USLT": "lyrics",
+    "APIC": "picture",
+}
+
+# MP4 原子 → 通用键名；freeform 原子（----:mean:name）取 name
+MP4_KEYS = {
+    "©nam": "title",
+    "©ART": "artist",
+    "aART": "albumartist",
+    "©alb": "album",
+    "©day": "date",
+    "©gen": "genre",
+    "gnre": "genre",
+    "trkn": "tracknumber",
+    "disk": "discnumber",
+    "©wrt": "composer",
+    "©lyr": "lyrics",
+    "©cmt": "comment",
+    "©too": "encoder",
+    "cprt": "copyright",
+    "tmpo": "bpm",
+    "covr": "picture",
+}
+
+# Vorbis / APE 的同义键名（已转小写）
+ALIAS_KEYS = {
+    "album artist": "albumartist",
+    "year": "date",
+    "track": "tracknumber",
+    "disc": "discnumber",
+    "description": "comment",
+    "unsyncedlyrics": "lyrics",
+    "label": "publisher",
+    "metadata_block_picture": "picture",
+    "coverart": "picture",
+    "cover art (front)": "picture",
+}
+
+# 通用键名 → 展示名，未列出的键原样展示
+DISPLAY_NAMES = {
+    "title": "标题",
+    "subtitle": "副标题",
+    "artist": "艺术家",
+    "albumartist": "专辑艺术家",
+    "album": "专辑",
+    "date": "日期",
+    "genre": "流派",
+    "tracknumber": "音轨号",
+    "discnumber": "碟号",
+    "composer": "作曲",
+    "lyricist": "作词",
+    "language": "语言",
+    "bpm": "BPM",
+    "isrc": "ISRC",
+    "publisher": "发行商",
+    "copyright": "版权",
+    "encoder": "编码器",
+    "encodedby": "编码者",
+    "comment": "备注",
+    "lyrics": "歌词",
+    "picture": "封面",
+}
+
+# 图片在 FLAC / ID3 图片块中的用途（节选）
+PICTURE_TYPES = {0: "其它", 1: "文件图标", 3: "封面", 4: "封底", 6: "媒体", 8: "艺术家"}
+
+
+def read_tags(file) -> dict[str, str]:
+    """
+    mutagen 文件对象 → {展示名: 文本}：键名归一化为通用名，
+    封面只输出 MIME / 尺寸 / 大小摘要，长文本截断，其余二进制只显示字节数
+    """
+    values: dict[str, list[str]] = {}
+
+    def add(key: str, value: str):
+        if value:
+            values.setdefault(key, []).append(value)
+
+    for raw_key, value in file.tags.items() if file.tags else ():
+        key = _normalize_key(raw_key, value)
+        items = value if isinstance(value, list | tuple) else [value]
+        for item in items:
+            add(key, _format_item(key, item))
+
+    # FLAC 的图片块不在 Vorbis 注释里
+    for picture in getattr(file, "pictures", None) or ():
+        add("picture", _picture_summary(picture))
+
+    return {DISPLAY_NAMES.get(key, key): _join(items) for key, items in values.items()}
+
+
+def _normalize_key(raw_key: str, value) -> str:
+    if isinstance(value, Frame):  # ID3：APIC:cover、COMM::eng、TXXX:描述
+        if value.FrameID == "TXXX":
+            return ALIAS_KEYS.get(value.desc.lower(), value.desc.lower())
+        return ID3_KEYS.get(value.FrameID, value.FrameID)  # 部分帧的键含二进制数据
+    if raw_key in MP4_KEYS:
+        return MP4_KEYS[raw_key]
+    if raw_key.startswith("----:"):
+        raw_key = raw_key.rsplit(":", 1)[-1]
+    key = raw_key.lower()
+    return ALIAS_KEYS.get(key, key)
+
+
+def _format_item(key: str, item) -> str:
+    if isinstance(item, APIC):
+        return _summary(item.mime, item.data, PICTURE_TYPES.get(item.type))
+    if isinstance(item, MP4Cover):
+        mime = "image/png" if item.imageformat == MP4Cover.FORMAT_PNG else "image/jpeg"
+        return _summary(mime, item)
+    if isinstance(item, APEBinaryValue):  # APE 封面：文件名\0图片数据
+        _, _, data = bytes(item).partition(b"\x00")
+        return _summary(None, data) if key == "picture" else f"<{len(item)} B>"
+    if key == "picture" and isinstance(item, str):
+        return _vorbis_picture_summary(item)
+    if isinstance(item, Frame):
+        text = getattr(item, "text", None)  # USLT 为 str，文本帧为 list
+        if not text:  # PRIV / GEOB 等二进制帧
+            return f"<{item.FrameID}>"
+        item = text if isinstance(text, str) else ", ".join(map(str, text))
+    if isinstance(item, tuple):  # MP4 trkn / disk：(序号, 总数)
+        return "/".join(str(v) for v in item if v)
+    if isinstance(item, bytes | MP4FreeForm):
+        try:
+            item = bytes(item).decode("utf-8")
+        except UnicodeDecodeError:
+            return f"<{len(item)} B>"
+    return _cap(str(item))
+
+
+# -------------------- 图片 --------------------
+
+
+def _describe(
+    mime: str | None, dims: tuple[int, int] | None, length: int, role: str | None
+) -> str:
+    """MIME、尺寸、大小与用途，不把图片数据转成文本"""
+    parts = [mime or "image"]
+    if dims:
+        parts.append(f"{dims[0]}x{dims[1]}")
+    parts.append(get_storage_size(length))
+    text = " ".join(parts)
+    return f"{text}（{role}）" if role else text
+
+
+def _summary(mime: str | None, data: bytes, role: str | None = None) -> str:
+    return _describe(mime, _image_size(data), len(data), role)
+
+
+def _picture_summary(picture: Picture) -> str:
+    """FLAC 图片块自带宽高，缺失时才读图片头"""
+    dims = (picture.width, picture.height) if picture.width and picture.height else None
+    return _describe(
+        picture.mime,
+        dims or _image_size(picture.data),
+        len(picture.data),
+        PICTURE_TYPES.get(picture.type),
+    )
+
+
+def _vorbis_picture_summary(encoded: str) -> str:
+    """
+    OGG 中的 METADATA_BLOCK_PICTURE 为 base64 编码的 FLAC 图片块：
+    只解码块头所在的前缀，从头部字段读出 MIME、宽高与数据长度，图片数据本身不解码
+    """
+    try:
+        head = base64.b64decode(encoded[:512] + "=" * (-len(encoded[:512]) % 4))
+        pic_type, mime_len = struct.unpack_from(">II", head, 0)
+        mime = head[8 : 8 + mime_len].decode("ascii", "replace")
+        desc_len = struct.unpack_from(">I", head, 8 + mime_len)[0]
+        pos = 12 + mime_len + desc_len
+        width, height, _, _, length = struct.unpack_from(">5I", head, pos)
+    except (binascii.Error, struct.error, ValueError):
+        return f"<{len(encoded) * 3 // 4} B>"
+    dims = (width, height) if width and height else None
+    return _describe(mime, dims, length, PICTURE_TYPES.get(pic_type))
+
+
+def _image_size(data: bytes) -> tuple[int, int] | None:
+    """Pillow 打开时只解析文件头，不解码像素"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+# -------------------- 文本 --------------------
+
+
+def _cap(text: str) -> str:
+    text = " / ".join(
+        line.strip() for line in text.strip().splitlines() if line.strip()
+    )
+    if len(text) > MAX_TEXT_CHARS:
+        return f"{text[:MAX_TEXT_CHARS]}…（共 {len(text)} 字）"
+    return text
+
+
+def _join(items: list[str]) -> str:
+    unique = list(dict.fromkeys(items))
+    text = ", ".join(unique[:MAX_VALUES])
+    if len(unique) > MAX_VALUES:
+        text += f" 等 {len(unique)} 项"
+    return text
@@ -0,0 +1,496 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True, slots=True)
+class LocalePack:
+    """
+    EXIF 语言包：tags 以 Pillow 标签英文名为键，comment 为 UserComment 调试字段，
+    enums 为枚举型标签的取值名，flash 为闪光灯位域各部分，terms 为其它固定用语
+    """
+
+    tags: dict[str, str] = field(default_factory=dict)
+    comment: dict[str, str] = field(default_factory=dict)
+    enums: dict[str, dict] = field(default_factory=dict)
+    flash: dict[str, str] = field(default_factory=dict)
+    terms: dict[str, str] = field(default_factory=dict)
+
+
+ZH = LocalePack(
+    tags={
+        # IFD0
+        "ImageWidth": "图像宽度",
+        "ImageLength": "图像长度",
+        "BitsPerSample": "每样本位数",
+        "Compression": "压缩方式",
+        "PhotometricInterpretation": "光度解释",
+        "ImageDescription": "图片描述",
+        "Make": "制造商",
+        "Model": "型号",
+        "StripOffsets": "条带偏移量",
+        "Orientation": "方向",
+        "SamplesPerPixel": "每像素样本数",
+        "RowsPerStrip": "每条带行数",
+        "StripByteCounts": "条带字节数",
+        "XResolution": "X方向分辨率",
+        "YResolution": "Y方向分辨率",
+        "ResolutionUnit": "分辨率单位",
+        "Software": "软件",
+        "DateTime": "日期时间",
+        "Artist": "艺术家",
+        "HostComputer": "主机计算机",
+        "ColorMap": "颜色映射表",
+        "JpegIFOffset": "JPEG IF偏移量",
+        "JpegIFByteCount": "JPEG IF字节数",
+        "YCbCrPositioning": "YCbCr定位",
+        "Copyright": "版权",
+        # Exif IFD
+        "ExposureTime": "曝光时间",
+        "FNumber": "F值",
+        "ExposureProgram": "曝光程序",
+        "ISOSpeedRatings": "ISO速度等级",
+        "SensitivityType": "敏感度类型",
+        "RecommendedExposureIndex": "推荐曝光指数",
+        "ISOSpeed": "ISO速度",
+        "ExifVersion": "EXIF版本",
+        "DateTimeOriginal": "原始日期时间",
+        "DateTimeDigitized": "数字化日期时间",
+        "OffsetTime": "时区偏移",
+        "OffsetTimeOriginal": "原始时区偏移",
+        "OffsetTimeDigitized": "数字化时区偏移",
+        "ComponentsConfiguration": "组件配置",
+        "CompressedBitsPerPixel": "每像素压缩位数",
+        "ShutterSpeedValue": "快门速度值",
+        "ApertureValue": "光圈值",
+        "BrightnessValue": "亮度值",
+        "ExposureBiasValue": "曝光偏差",
+        "MaxApertureValue": "最大光圈值",
+        "SubjectDistance": "主体距离",
+        "MeteringMode": "测光模式",
+        "LightSource": "光源",
+        "Flash": "闪光灯",
+        "FocalLength": "焦距",
+        "MakerNote": "制造商备注",
+        "UserComment": "用户备注",
+        "SubsecTime": "亚秒时间",
+        "SubsecTimeOriginal": "原始亚秒时间",
+        "SubsecTimeDigitized": "数字化亚秒时间",
+        "FlashPixVersion": "FlashPix版本",
+        "ColorSpace": "颜色空间",
+        "ExifImageWidth": "EXIF图像宽度",
+        "ExifImageHeight": "EXIF图像高度",
+        "RelatedSoundFile": "相关声音文件",
+        "FocalPlaneXResolution": "焦平面X分辨率",
+        "FocalPlaneYResolution": "焦平面Y分辨率",
+        "FocalPlaneResolutionUnit": "焦平面分辨率单位",
+        "SensingMethod": "感光方法",
+        "FileSource": "文件源",
+        "SceneType": "场景类型",
+        "CFAPattern": "CFA模式",
+        "CustomRendered": "自定义渲染",
+        "ExposureMode": "曝光模式",
+        "WhiteBalance": "白平衡",
+        "DigitalZoomRatio": "数字缩放比",
+        "FocalLengthIn35mmFilm": "35mm胶片焦距",
+        "SceneCaptureType": "场景捕获类型",
+        "GainControl": "增益控制",
+        "Contrast": "对比度",
+        "Saturation": "饱和度",
+        "Sharpness": "锐度",
+        "DeviceSettingDescription": "设备设置描述",
+        "SubjectDistanceRange": "主体距离范围",
+        "LensSpecification": "镜头规格",
+        "LensMake": "镜头制造商",
+        "LensModel": "镜头型号",
+        # GPS IFD
+        "GPSVersionID": "GPS版本",
+        "GPSLatitudeRef": "纬度参考",
+        "GPSLatitude": "纬度",
+        "GPSLongitudeRef": "经度参考",
+        "GPSLongitude": "经度",
+        "GPSAltitudeRef": "海拔参考",
+        "GPSAltitude": "海拔",
+        "GPSTimeStamp": "GPS时间",
+        "GPSSatellites": "定位卫星",
+        "GPSStatus": "接收状态",
+        "GPSMeasureMode": "测量模式",
+        "GPSDOP": "定位精度因子",
+        "GPSSpeedRef": "速度单位",
+        "GPSSpeed": "速度",
+        "GPSTrackRef": "运动方向参考",
+        "GPSTrack": "运动方向",
+        "GPSImgDirectionRef": "镜头朝向参考",
+        "GPSImgDirection": "镜头朝向",
+        "GPSMapDatum": "大地坐标系",
+        "GPSDestLatitudeRef": "目标纬度参考",
+        "GPSDestLatitude": "目标纬度",
+        "GPSDestLongitudeRef": "目标经度参考",
+        "GPSDestLongitude": "目标经度",
+        "GPSDestBearingRef": "目标方位参考",
+        "GPSDestBearing": "目标方位",
+        "GPSDestDistanceRef": "目标距离单位",
+        "GPSDestDistance": "目标距离",
+        "GPSProcessingMethod": "定位方式",
+        "GPSAreaInformation": "区域信息",
+        "GPSDateStamp": "GPS日期",
+        "GPSDifferential": "差分校正",
+        "GPSHPositioningError": "水平定位误差",
+        # Interop IFD
+        "InteropIndex": "互操作性标识",
+        "InteropVersion": "互操作性版本",
+        "RelatedImageFileFormat": "关联图像格式",
+        "RelatedImageWidth": "关联图像宽度",
+        "RelatedImageHeight": "关联图像高度",
+    },
+    comment={
+        "filter": "滤镜",
+        "filterIntensity": "滤镜强度",
+        "filterMask": "滤镜掩码",
+        "captureOrientation": "拍摄方向",
+        "highlight": "高光增强",
+        "algolist": "算法列表",
+        "multi-frame": "多帧合成",
+        "brp_mask": "BRP掩码",
+        "brp_del_th": "BRP阈值",
+        "brp_del_sen": "BRP灵敏度",
+        "motionLevel": "运动等级",
+        "delta": "Delta变化",
+        "module": "模块",
+        "hw-remosaic": "重采样硬件",
+        "touch": "触摸对焦点",
+        "sceneMode": "场景模式",
+        "cct_value": "色温值",
+        "AI_Scene": "AI场景",
+        "aec_lux": "曝光光照值",
+        "aec_lux_index": "曝光指数",
+        "HdrStatus": "HDR状态",
+        "albedo": "反照率",
+        "confidence": "置信度",
+        "weatherinfo": "天气信息",
+        "temperature": "温度",
+    },
+    enums={
+        "Orientation": {
+            1: "正常",
+            2: "水平镜像",
+            3: "旋转180°",
+            4: "垂直镜像",
+            5: "水平镜像后顺时针旋转270°",
+            6: "顺时针旋转90°",
+            7: "水平镜像后顺时针旋转90°",
+            8: "顺时针旋转270°",
+        },
+        "ResolutionUnit": {1: "无", 2: "英寸", 3: "厘米"},
+        "FocalPlaneResolutionUnit": {1: "无", 2: "英寸", 3: "厘米"},
+        "YCbCrPositioning": {1: "居中", 2: "共址"},
+        "Compression": {
+            1: "无压缩",
+            5: "LZW",
+            6: "JPEG（旧式）",
+            7: "JPEG",
+            8: "Deflate",
+        },
+        "ExposureProgram": {
+            0: "未定义",
+            1: "手动",
+            2: "程序自动",
+            3: "光圈优先",
+            4: "快门优先",
+            5: "创意程序（慢速）",
+            6: "动作程序（高速）",
+            7: "人像",
+            8: "风景",
+        },
+        "MeteringMode": {
+            0: "未知",
+            1: "平均测光",
+            2: "中央重点平均测光",
+            3: "点测光",
+            4: "多点测光",
+            5: "评价测光",
+            6: "局部测光",
+            255: "其他",
+        },
+        "LightSource": {
+            0: "未知",
+            1: "日光",
+            2: "荧光灯",
+            3: "钨丝灯",
+            4: "闪光灯",
+            9: "晴天",
+            10: "阴天",
+            11: "阴影",
+            12: "日光色荧光灯",
+            13: "日白色荧光灯",
+            14: "冷白色荧光灯",
+            15: "白色荧光灯",
+            17: "标准光源A",
+            18: "标准光源B",
+            19: "标准光源C",
+            20: "D55",
+            21: "D65",
+            22: "D75",
+            23: "D50",
+            24: "ISO影室钨丝灯",
+            255: "其他",
+        },
+        "ColorSpace": {1: "sRGB", 2: "Adobe RGB", 0xFFFF: "未校准"},
+        "SensingMethod": {
+            1: "未定义",
+            2: "单芯片彩色区域传感器",
+            3: "双芯片彩色区域传感器",
+            4: "三芯片彩色区域传感器",
+            5: "彩色顺序区域传感器",
+            7: "三线性传感器",
+            8: "彩色顺序线性传感器",
+        },
+        "CustomRendered": {0: "标准处理", 1: "自定义处理"},
+        "ExposureMode": {0: "自动曝光", 1: "手动曝光", 2: "自动包围曝光"},
+        "WhiteBalance": {0: "自动", 1: "手动"},
+        "SceneCaptureType": {0: "标准", 1: "风景", 2: "人像", 3: "夜景"},
+        "GainControl": {
+            0: "无",
+            1: "低增益提高",
+            2: "高增益提高",
+            3: "低增益降低",
+            4: "高增益降低",
+        },
+        "Contrast": {0: "标准", 1: "柔和", 2: "强烈"},
+        "Saturation": {0: "标准", 1: "低", 2: "高"},
+        "Sharpness": {0: "标准", 1: "柔和", 2: "强烈"},
+        "SubjectDistanceRange": {0: "未知", 1: "微距", 2: "近景", 3: "远景"},
+        "SensitivityType": {
+            0: "未知",
+            1: "SOS",
+            2: "REI",
+            3: "ISO速度",
+            4: "SOS + REI",
+            5: "SOS + ISO速度",
+            6: "REI + ISO速度",
+            7: "SOS + REI + ISO速度",
+        },
+        "FileSource": {1: "胶片扫描仪", 2: "反射式扫描仪", 3: "数码相机"},
+        "SceneType": {1: "直接拍摄"},
+        "GPSLatitudeRef": {"N": "北纬", "S": "南纬"},
+        "GPSLongitudeRef": {"E": "东经", "W": "西经"},
+        "GPSAltitudeRef": {0: "海平面以上", 1: "海平面以下"},
+        "GPSStatus": {"A": "正在测量", "V": "测量中断"},
+        "GPSMeasureMode": {"2": "二维", "3": "三维"},
+        "GPSSpeedRef": {"K": "km/h", "M": "mph", "N": "节"},
+        "GPSTrackRef": {"T": "真北", "M": "磁北"},
+        "GPSImgDirectionRef": {"T": "真北", "M": "磁北"},
+        "GPSDestBearingRef": {"T": "真北", "M": "磁北"},
+        "GPSDestDistanceRef": {"K": "千米", "M": "英里", "N": "海里"},
+        "GPSDifferential": {0: "无差分校正", 1: "差分校正"},
+    },
+    flash={
+        "fired": "已闪光",
+        "not_fired": "未闪光",
+        "return_missing": "未检测到回闪",
+        "return_detected": "检测到回闪",
+        "mode_on": "强制闪光",
+        "mode_off": "强制关闭",
+        "mode_auto": "自动",
+        "no_function": "无闪光功能",
+        "red_eye": "防红眼",
+        "separator": "，",
+    },
+    terms={
+        "address": "地址",
+        "coordinates": "坐标",
+        "map": "地图",
+        # XMP / IPTC / ICC 附加元数据
+        "rating": "评分",
+        "creator_tool": "创建工具",
+        "create_date": "创建时间",
+        "modify_date": "修改时间",
+        "title": "标题",
+        "description": "描述",
+        "creator": "作者",
+        "keywords": "关键词",
+        "rights": "版权",
+        "headline": "标题摘要",
+        "city": "城市",
+        "country": "国家",
+        "hierarchical_keywords": "层级关键词",
+        "raw_process": "RAW 处理版本",
+        "raw_profile": "RAW 相机配置",
+        "raw_white_balance": "RAW 白平衡",
+        "raw_exposure": "RAW 曝光调整",
+        "history": "编辑历史",
+        "object_name": "对象名",
+        "byline": "作者",
+        "copyright": "版权",
+        "caption": "说明",
+        "profile": "配置文件",
+        "color_space": "色彩空间",
+        "device_class": "设备类别",
+        "version": "版本",
+    },
+)
+
+# 标签名直接使用 Pillow 的英文名
+EN = LocalePack(
+    enums={
+        "Orientation": {
+            1: "Horizontal (normal)",
+            2: "Mirror horizontal",
+            3: "Rotate 180",
+            4: "Mirror vertical",
+            5: "Mirror horizontal and rotate 270 CW",
+            6: "Rotate 90 CW",
+            7: "Mirror horizontal and rotate 90 CW",
+            8: "Rotate 270 CW",
+        },
+        "ResolutionUnit": {1: "None", 2: "inches", 3: "cm"},
+        "FocalPlaneResolutionUnit": {1: "None", 2: "inches", 3: "cm"},
+        "YCbCrPositioning": {1: "Centered", 2: "Co-sited"},
+        "Compression": {
+            1: "Uncompressed",
+            5: "LZW",
+            6: "JPEG (old-style)",
+            7: "JPEG",
+            8: "Deflate",
+        },
+        "ExposureProgram": {
+            0: "Not defined",
+            1: "Manual",
+            2: "Program AE",
+            3: "Aperture-priority AE",
+            4: "Shutter speed priority AE",
+            5: "Creative (slow speed)",
+            6: "Action (high speed)",
+            7: "Portrait",
+            8: "Landscape",
+        },
+        "MeteringMode": {
+            0: "Unknown",
+            1: "Average",
+            2: "Center-weighted average",
+            3: "Spot",
+            4: "Multi-spot",
+            5: "Multi-segment",
+            6: "Partial",
+            255: "Other",
+        },
+        "LightSource": {
+            0: "Unknown",
+            1: "Daylight",
+            2: "Fluorescent",
+            3: "Tungsten",
+            4: "Flash",
+            9: "Fine weather",
+            10: "Cloudy",
+            11: "Shade",
+            12: "Daylight fluorescent",
+            13: "Day white fluorescent",
+            14: "Cool white fluorescent",
+            15: "White fluorescent",
+            17: "Standard light A",
+            18: "Standard light B",
+            19: "Standard light C",
+            20: "D55",
+            21: "D65",
+            22: "D75",
+            23: "D50",
+            24: "ISO studio tungsten",
+            255: "Other",
+        },
+        "ColorSpace": {1: "sRGB", 2: "Adobe RGB", 0xFFFF: "Uncalibrated"},
+        "SensingMethod": {
+            1: "Not defined",
+            2: "One-chip color area",
+            3: "Two-chip color area",
+            4: "Three-chip color area",
+            5: "Color sequential area",
+            7: "Trilinear",
+            8: "Color sequential linear",
+        },
+        "CustomRendered": {0: "Normal", 1: "Custom"},
+        "ExposureMode": {0: "Auto", 1: "Manual", 2: "Auto bracket"},
+        "WhiteBalance": {0: "Auto", 1: "Manual"},
+        "SceneCaptureType": {0: "Standard", 1: "Landscape", 2: "Portrait", 3: "Night"},
+        "GainControl": {
+            0: "None",
+            1: "Low gain up",
+            2: "High gain up",
+            3: "Low gain down",
+            4: "High gain down",
+        },
+        "Contrast": {0: "Normal", 1: "Low", 2: "High"},
+        "Saturation": {0: "Normal", 1: "Low", 2: "High"},
+        "Sharpness": {0: "Normal", 1: "Soft", 2: "Hard"},
+        "SubjectDistanceRange": {0: "Unknown", 1: "Macro", 2: "Close", 3: "Distant"},
+        "SensitivityType": {
+            0: "Unknown",
+            1: "SOS",
+            2: "REI",
+            3: "ISO speed",
+            4: "SOS + REI",
+            5: "SOS + ISO speed",
+            6: "REI + ISO speed",
+            7: "SOS + REI + ISO speed",
+        },
+        "FileSource": {
+            1: "Film scanner",
+            2: "Reflection print scanner",
+            3: "Digital camera",
+        },
+        "SceneType": {1: "Directly photographed"},
+        "GPSLatitudeRef": {"N": "North", "S": "South"},
+        "GPSLongitudeRef": {"E": "East", "W": "West"},
+        "GPSAltitudeRef": {0: "Above sea level", 1: "Below sea level"},
+        "GPSStatus": {"A": "Measurement active", "V": "Measurement void"},
+        "GPSMeasureMode": {"2": "2D", "3": "3D"},
+        "GPSSpeedRef": {"K": "km/h", "M": "mph", "N": "knots"},
+        "GPSTrackRef": {"T": "True north", "M": "Magnetic north"},
+        "GPSImgDirectionRef": {"T": "True north", "M": "Magnetic north"},
+        "GPSDestBearingRef": {"T": "True north", "M": "Magnetic north"},
+        "GPSDestDistanceRef": {"K": "km", "M": "miles", "N": "nautical miles"},
+        "GPSDifferential": {0: "No correction", 1: "Differential corrected"},
+    },
+    flash={
+        "fired": "Fired",
+        "not_fired": "Did not fire",
+        "return_missing": "Return not detected",
+        "return_detected": "Return detected",
+        "mode_on": "Compulsory",
+        "mode_off": "Off",
+        "mode_auto": "Auto",
+        "no_function": "No flash function",
+        "red_eye": "Red-eye reduction",
+        "separator": ", ",
+    },
+    terms={
+        "address": "Address",
+        "coordinates": "Coordinates",
+        "map": "Map",
+        "rating": "Rating",
+        "creator_tool": "Creator Tool",
+        "create_date": "Create Date",
+        "modify_date": "Modify Date",
+        "title": "Title",
+        "description": "Description",
+        "creator": "Creator",
+        "keywords": "Keywords",
+        "rights": "Rights",
+        "headline": "Headline",
+        "city": "City",
+        "country": "Country",
+        "hierarchical_keywords": "Hierarchical Keywords",
+        "raw_process": "Raw Process Version",
+        "raw_profile": "Raw Camera Profile",
+        "raw_white_balance": "Raw White Balance",
+        "raw_exposure": "Raw Exposure",
+        "history": "Edit History",
+        "object_name": "Object Name",
+        "byline": "By-line",
+        "copyright": "Copyright",
+        "caption": "Caption",
+        "profile": "Profile",
+        "color_space": "Color Space",
+        "device_class": "Device Class",
+        "version": "Version",
+    },
+)
+
+LOCALES: dict[str, LocalePack] = {"zh": ZH, "en": EN}
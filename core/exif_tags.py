@@ -0,0 +1,113 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+
+from PIL import ExifTags
+
+from .exif_locales import LOCALES, LocalePack
+from .exif_values import (
+    MAP_URL,
+    VALUE_FORMATTERS,
+    build_flash_table,
+    format_enum,
+    format_user_comment,
+    format_value,
+    gps_coordinates,
+)
+
+IFD = ExifTags.IFD
+
+# 仅作为子 IFD 指针的标签：内容会被展开，本身不展示
+POINTER_TAGS = {IFD.Exif, IFD.GPSInfo, IFD.Interop}
+
+# 合并为十进制坐标展示的 GPS 标签：纬度参考、纬度、经度参考、经度
+GPS_COORD_TAGS = {1, 2, 3, 4}
+
+
+@dataclass(frozen=True, slots=True)
+class TagSpec:
+    label: str
+    format: Callable[[object], str] = format_value
+
+
+@dataclass(frozen=True, slots=True)
+class TagTable:
+    """数字标签 id → (显示名, 值格式化)，按 IFD 分组：IFD0 与 Exif IFD 共用 main"""
+
+    main: dict[int, TagSpec]
+    gps: dict[int, TagSpec]
+    interop: dict[int, TagSpec]
+    terms: dict[str, str]
+
+
+def _build_formatters(pack: LocalePack) -> dict[str, Callable]:
+    """语言无关的解码器 + 本语言的枚举表 / 闪光灯位域表 / 备注字段名"""
+    formatters = dict(VALUE_FORMATTERS)
+    for name, table in pack.enums.items():
+        formatters[name] = partial(format_enum, table)
+    formatters["Flash"] = partial(format_enum, build_flash_table(pack.flash))
+    formatters["UserComment"] = partial(format_user_comment, labels=pack.comment)
+    return formatters
+
+
+def _build_specs(
+    names: dict[int, str], pack: LocalePack, formatters: dict[str, Callable]
+) -> dict[int, TagSpec]:
+    return {
+        tag_id: TagSpec(pack.tags.get(name, name), formatters.get(name, format_value))
+        for tag_id, name in names.items()
+        if tag_id not in POINTER_TAGS
+    }
+
+
+def _build_table(pack: LocalePack) -> TagTable:
+    formatters = _build_formatters(pack)
+    return TagTable(
+        main=_build_specs(ExifTags.TAGS, pack, formatters),
+        gps=_build_specs(ExifTags.GPSTAGS, pack, formatters),
+        interop=_build_specs(
+            {tag.value: tag.name for tag in ExifTags.Interop}, pack, formatters
+        ),
+        terms=pack.terms,
+    )
+
+
+TAG_TABLES: dict[str, TagTable] = {
+    locale: _build_table(pack) for locale, pack in LOCALES.items()
+}
+
+
+def get_tag_table(locale: str) -> TagTable:
+    """未知语言回退到中文"""
+    return TAG_TABLES.get(locale) or TAG_TABLES["zh"]
+
+
+def translate_tags(ifd: dict, specs: dict[int, TagSpec]) -> dict[str, str]:
+    """
+    按标签表翻译一个 IFD：每个标签一次查表，表外标签忽略
+    专用解码器按标准类型取值，厂商写入的类型不符（如 FNumber 为字符串）时按通用格式显示
+    """
+    result = {}
+    for tag_id, value in ifd.items():
+        if spec := specs.get(tag_id):
+            try:
+                result[spec.label] = spec.format(value)
+            except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+                result[spec.label] = format_value(value)
+    return result
+
+
+def translate_gps(
+    gps: dict, table: TagTable, address: str | None = None
+) -> dict[str, str]:
+    """经纬度合并为十进制坐标并附地图链接，其余 GPS 标签逐个查表翻译"""
+    result = {}
+    if address:
+        result[table.terms["address"]] = address
+    if coords := gps_coordinates(gps):
+        lat, lon = coords
+        result[table.terms["coordinates"]] = f"{lat:.6f}, {lon:.6f}"
+        result[table.terms["map"]] = MAP_URL.format(lat=lat, lon=lon)
+        gps = {k: v for k, v in gps.items() if k not in GPS_COORD_TAGS}
+    result.update(translate_tags(gps, table.gps))
+    return result
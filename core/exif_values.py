@@ -0,0 +1,312 @@
+import math
+import re
+from collections.abc import Callable
+from functools import lru_cache, wraps
+
+from PIL.TiffImagePlugin import IFDRational
+
+# UserComment 前 8 字节为字符集标识
+COMMENT_CHARSETS = {
+    b"ASCII\x00\x00\x00": "ascii",
+    b"UNICODE\x00": "utf-16",
+    b"JIS\x00\x00\x00\x00\x00": "shift_jis",
+    b"\x00" * 8: "utf-8",
+}
+
+# 厂商调试字符串中的拼写变体 → 规范键名
+COMMENT_ALIASES = {"fileterIntensity": "filterIntensity"}
+
+# ComponentsConfiguration 各字节含义
+COMPONENTS = {1: "Y", 2: "Cb", 3: "Cr", 4: "R", 5: "G", 6: "B"}
+
+MAP_URL = "https://www.openstreetmap.org/?mlat={lat:.6f}&mlon={lon:.6f}#map=16/{lat:.6f}/{lon:.6f}"
+
+MAX_TEXT_BYTES = 64  # 超过该长度的二进制值只显示字节数
+
+
+def memoize(func: Callable) -> Callable:
+    """按值缓存格式化结果；相机写入的值高度重复，命中后只剩一次字典查找"""
+    cached = lru_cache(maxsize=4096, typed=True)(func)
+
+    @wraps(func)
+    def wrapper(value):
+        try:
+            return cached(value)
+        except TypeError:  # 不可哈希的值（如 list）直接计算
+            return func(value)
+
+    return wrapper
+
+
+# -------------------- 通用 --------------------
+
+
+def _num(value, digits: int = 2) -> str:
+    number = float(value)
+    if math.isnan(number) or math.isinf(number):
+        return "?"
+    return f"{round(number, digits):g}"
+
+
+@memoize
+def format_value(value) -> str:
+    """无专用解码器的标签：有理数转小数，字节串尽量转文本，元组逐项格式化"""
+    if isinstance(value, IFDRational):
+        return _num(value, 4)
+    if isinstance(value, bytes):
+        text = value.rstrip(b"\x00")
+        if (
+            len(text) <= MAX_TEXT_BYTES
+            and text.isascii()
+            and text.decode().isprintable()
+        ):
+            return text.decode()
+        return f"<{len(value)} B>"
+    if isinstance(value, str):
+        return value.strip("\x00 ")
+    if isinstance(value, tuple):
+        return ", ".join(format_value(v) for v in value)
+    return str(value)
+
+
+def format_enum(table: dict, value) -> str:
+    """枚举值查表；字节串（FileSource / SceneType）取首字节"""
+    key = value[0] if isinstance(value, bytes) and value else value
+    if isinstance(key, str):
+        key = key.strip("\x00 ")
+    return table.get(key, format_value(value))
+
+
+# -------------------- 曝光 / 镜头 --------------------
+
+
+@memoize
+def format_exposure(value) -> str:
+    seconds = float(value)
+    if not seconds > 0:
+        return format_value(value)
+    if seconds < 1:
+        return f"1/{round(1 / seconds)} s"
+    return f"{_num(seconds, 1)} s"
+
+
+@memoize
+def format_fnumber(value) -> str:
+    return f"f/{_num(value, 1)}"
+
+
+@memoize
+def format_apex_aperture(value) -> str:
+    """APEX 光圈值 Av → F 值；损坏的超大值按原值输出"""
+    try:
+        return f"f/{_num(2 ** (float(value) / 2), 1)}"
+    except OverflowError:
+        return format_value(value)
+
+
+@memoize
+def format_apex_shutter(value) -> str:
+    """APEX 快门值 Tv → 曝光时间；损坏的超大值按原值输出"""
+    try:
+        return format_exposure(2 ** -float(value))
+    except OverflowError:
+        return format_value(value)
+
+
+@memoize
+def format_ev(value) -> str:
+    return f"{round(float(value), 2):+g} EV"
+
+
+@memoize
+def format_mm(value) -> str:
+    return f"{_num(value, 1)} mm"
+
+
+@memoize
+def format_meters(value) -> str:
+    return f"{_num(value)} m"
+
+
+@memoize
+def format_degrees(value) -> str:
+    return f"{_num(value, 1)}°"
+
+
+@memoize
+def format_zoom(value) -> str:
+    return f"{_num(value)}x"
+
+
+@memoize
+def format_lens_spec(value) -> str:
+    """(最短焦距, 最长焦距, 最短焦距时最大光圈, 最长焦距时最大光圈)"""
+    if not isinstance(value, tuple) or len(value) != 4:
+        return format_value(value)
+    f_min, f_max, a_min, a_max = (_num(v, 1) for v in value)
+    focal = f_min if f_min == f_max else f"{f_min}-{f_max}"
+    aperture = a_min if a_min == a_max else f"{a_min}-{a_max}"
+    return f"{focal} mm f/{aperture}"
+
+
+# -------------------- 字节编码的标签 --------------------
+
+
+@memoize
+def format_version(value) -> str:
+    """ExifVersion / FlashPixVersion：b"0231" → 2.31"""
+    text = format_value(value)
+    if len(text) == 4 and text.isdigit():
+        return f"{int(text[:2])}.{text[2:]}"
+    return text
+
+
+@memoize
+def format_gps_version(value) -> str:
+    if isinstance(value, bytes | tuple):
+        return ".".join(str(v) for v in value)
+    return format_value(value)
+
+
+@memoize
+def format_components(value) -> str:
+    if not isinstance(value, bytes | tuple):
+        return format_value(value)
+    return "".join(COMPONENTS.get(v, "") for v in value) or format_value(value)
+
+
+# -------------------- 闪光灯 --------------------
+
+
+def build_flash_table(words: dict[str, str]) -> dict[int, str]:
+    """Flash 为位域：预先展开全部 0x00~0x7F 取值，解码时只需一次查表"""
+    modes = {1: words["mode_on"], 2: words["mode_off"], 3: words["mode_auto"]}
+    table = {}
+    for value in range(0x80):
+        if value & 0x20:
+            table[value] = words["no_function"]
+            continue
+        parts = [words["fired"] if value & 0x01 else words["not_fired"]]
+        if mode := modes.get((value >> 3) & 0x03):
+            parts.append(mode)
+        if (ret := (value >> 1) & 0x03) >= 2:
+            parts.append(words["return_detected" if ret == 3 else "return_missing"])
+        if value & 0x40:
+            parts.append(words["red_eye"])
+        table[value] = words["separator"].join(parts)
+    return table
+
+
+# -------------------- GPS --------------------
+
+
+@memoize
+def format_gps_time(value) -> str:
+    """GPSTimeStamp：(时, 分, 秒) → HH:MM:SS"""
+    if not isinstance(value, tuple) or len(value) != 3:
+        return format_value(value)
+    h, m, s = (float(v) for v in value)
+    return f"{int(h):02d}:{int(m):02d}:{s:05.2f}".removesuffix(".00") + " UTC"
+
+
+@memoize
+def format_dms(value) -> str:
+    """单独出现的度分秒（如目标经纬度）"""
+    if not isinstance(value, tuple) or len(value) != 3:
+        return format_value(value)
+    d, m, s = (float(v) for v in value)
+    return f"{int(d)}°{int(m)}′{s:.2f}″"
+
+
+def dms_to_decimal(dms, ref) -> float | None:
+    try:
+        deg, minute, sec = (float(v) for v in dms)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    dec = deg + minute / 60 + sec / 3600
+    if math.isnan(dec):
+        return None
+    return -dec if str(ref).strip("\x00 ") in {"S", "W"} else dec
+
+
+def gps_coordinates(gps: dict) -> tuple[float, float] | None:
+    """GPS IFD → (纬度, 经度) 十进制度数"""
+    lat = dms_to_decimal(gps.get(2), gps.get(1))
+    lon = dms_to_decimal(gps.get(4), gps.get(3))
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+# -------------------- UserComment --------------------
+
+
+def format_user_comment(value, labels: dict[str, str]) -> str:
+    """
+    去掉字符集前缀后解析厂商写入的 `key: value; ...` 调试字符串，
+    逐项换行并翻译字段名；不是这种格式时原样返回文本
+    """
+    if isinstance(value, bytes):
+        encoding = COMMENT_CHARSETS.get(value[:8])
+        if encoding:
+            value = value[8:]
+        try:
+            value = value.decode(encoding or "utf-8")
+        except UnicodeDecodeError:
+            value = value.decode("latin-1", errors="ignore")
+    value = value.strip("\x00 ")
+
+    lines = []
+    for part in value.split(";"):
+        key, sep, val = part.partition(":")
+        if not sep:
+            continue
+        key = key.strip()
+        key = COMMENT_ALIASES.get(key, key)
+        lines.append(f"{labels.get(key, key)}: {_parse_comment_value(val.strip())}")
+    return "\n" + "\n".join(lines) if lines else value
+
+
+def _parse_comment_value(value: str):
+    if value.lower() == "null" or value == "":
+        return None
+    # (x, y) → tuple
+    if re.match(r"\(-?\d+(\.\d+)?,\s*-?\d+(\.\d+)?\)", value):
+        return tuple(float(n) for n in re.findall(r"-?\d+\.?\d*", value))
+    if re.fullmatch(r"-?\d+", value):
+        return int(value)
+    if re.fullmatch(r"-?\d+\.\d+", value):
+        return float(value)
+    return value
+
+
+# 标签英文名 → 与语言无关的解码器
+VALUE_FORMATTERS: dict[str, Callable] = {
+    "ExposureTime": format_exposure,
+    "FNumber": format_fnumber,
+    "ApertureValue": format_apex_aperture,
+    "MaxApertureValue": format_apex_aperture,
+    "ShutterSpeedValue": format_apex_shutter,
+    "ExposureBiasValue": format_ev,
+    "BrightnessValue": format_ev,
+    "FocalLength": format_mm,
+    "FocalLengthIn35mmFilm": format_mm,
+    "SubjectDistance": format_meters,
+    "DigitalZoomRatio": format_zoom,
+    "LensSpecification": format_lens_spec,
+    "ExifVersion": format_version,
+    "FlashPixVersion": format_version,
+    "InteropVersion": format_version,
+    "ComponentsConfiguration": format_components,
+    "GPSVersionID": format_gps_version,
+    "GPSTimeStamp": format_gps_time,
+    "GPSAltitude": format_meters,
+    "GPSLatitude": format_dms,
+    "GPSLongitude": format_dms,
+    "GPSDestLatitude": format_dms,
+    "GPSDestLongitude": format_dms,
+    "GPSTrack": format_degrees,
+    "GPSImgDirection": format_degrees,
+    "GPSDestBearing": format_degrees,
+    "GPSHPositioningError": format_meters,
+}
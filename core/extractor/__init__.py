@@ -1,9 +1,12 @@
 from .audio import AudioExtractor
+from .dispatch import Extractors
 from .image import ImageExtractor
-from .video import VideoExtractor
+from .video import StreamInfo, VideoExtractor
 
 __all__ = [
     "AudioExtractor",
+    "Extractors",
     "ImageExtractor",
+    "StreamInfo",
     "VideoExtractor",
 ]
@@ -1,11 +1,15 @@
-from io import BytesIO
-
-from mutagen._file import File as MutagenFile
+import asyncio
 
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
+from mutagen._file import File as MutagenFile
 
+from ..audio_analysis import FFMPEG_TIMEOUT, analyze_audio
+from ..audio_tags import read_tags
 from ..file_type import FileExt
+from ..media_source import MediaSource
+from ..metrics import metrics
+from ..tiers import Tier
 from ..utils import get_storage_size
 
 
@@ -15,21 +19,71 @@ class AudioExtractor:
     def __init__(self, config: AstrBotConfig):
         self.conf = config
 
-    async def get_audio_info(self, audio: bytes, ext: FileExt) -> str | None:
-        details = self._get_audio_details(audio, ext)
+    async def get_audio_info(
+        self, audio: MediaSource, ext: FileExt, tier: Tier | None = None
+    ) -> str | None:
+        details = await self.get_audio_details(audio, ext, tier)
+        return self.format_details(details)
+
+    async def get_audio_details(
+        self, audio: MediaSource, ext: FileExt, tier: Tier | None = None
+    ) -> dict | None:
+        """结构化的音频信息，供格式化与归档共用；mutagen 解析在线程中执行"""
+        details = await asyncio.to_thread(self._get_audio_details, audio, ext)
+        skip_analysis = tier is not None and tier.skip_analysis
+        if details and self.conf["enable_audio_analysis"] and not skip_analysis:
+            try:
+                # 解码与统计是同步的，放到线程中执行，ffmpeg 超时后会被终止
+                details["analysis"] = await asyncio.to_thread(
+                    analyze_audio,
+                    audio,
+                    details.get("sample_rate"),
+                    details.get("channels"),
+                    details.get("duration"),
+                    tier.budget if tier else FFMPEG_TIMEOUT,
+                )
+            except Exception as e:
+                logger.warning(f"音频响度分析失败: {e}")
         logger.debug(f"[音频信息] 解析结果: {details}")
-        return self._format_details(details) if details else None
+        return details
+
+    def format_details(self, details: dict | None) -> str | None:
+        if not details:
+            return None
+        with metrics.timer("audio", "format"):
+            return self._format_details(details)
+
+    def format_summary(self, details: dict | None) -> str | None:
+        """摘要：格式 / 时长 / 大小与标题、艺术家"""
+        if not details:
+            return None
+        with metrics.timer("audio", "summary"):
+            lines = ["【音频信息】："]
+            basic = [f"格式: {details.get('format')}"]
+            if dur := details.get("duration"):
+                basic.append(f"时长: {dur}s")
+            if size := details.get("file_size"):
+                basic.append(f"大小: {size}")
+            lines.append("，".join(basic))
+            tags = details.get("tags") or {}
+            for name in ("标题", "艺术家", "专辑"):
+                if value := tags.get(name):
+                    lines.append(f"{name}: {value}")
+            if tags:
+                lines.append(f"标签: {len(tags)} 项")
+            return "\n".join(lines)
 
     # -------------------- 内部逻辑 --------------------
-    def _get_audio_details(self, audio: bytes, ext: FileExt) -> dict | None:
+    def _get_audio_details(self, audio: MediaSource, ext: FileExt) -> dict | None:
         # 1. AMR 裸流特殊处理
         if ext == FileExt.AMR:
             return self._parse_amr(audio)
 
         # 2. 其它格式交给 mutagen
         try:
-            file = MutagenFile(BytesIO(audio))
-            if not file:
+            file = MutagenFile(audio.reader())
+            # 无标签的文件对象本身为假值（如 WAV），只能用 is None 判断
+            if file is None:
                 return None
         except Exception as e:
             logger.debug(f"mutagen 解析失败: {e}")
@@ -48,15 +102,12 @@ class AudioExtractor:
                     "channels": getattr(file.info, "channels", None),
                 }
             )
-        if file.tags:
-            info["tags"] = {
-                k: ", ".join(map(str, v)) if isinstance(v, list | tuple) else str(v)
-                for k, v in file.tags.items()
-            }
+        if tags := read_tags(file):
+            info["tags"] = tags
         return info
 
     # --------------- AMR-NB 专用解析 ---------------
-    def _parse_amr(self, data: bytes) -> dict:
+    def _parse_amr(self, data: MediaSource) -> dict:
         # AMR-NB 固定参数
         FRAME_MS = 20 / 1000  # 20 ms
         FRAME_SIZE = 32  # 字节/帧
@@ -85,6 +136,16 @@ class AudioExtractor:
             lines.append(f"采样率: {sr} Hz")
         if ch := info.get("channels"):
             lines.append(f"声道数: {ch}")
+        if ana := info.get("analysis"):
+            lines.append("\n响度分析:")
+            if (peak := ana.get("peak_db")) is not None:
+                lines.append(f"峰值: {peak} dBFS")
+            if (rms := ana.get("rms_db")) is not None:
+                lines.append(f"RMS: {rms} dBFS")
+            if (lufs := ana.get("lufs")) is not None:
+                lines.append(f"近似响度: {lufs} LUFS")
+            lines.append(f"静音占比: {ana['silence_ratio']:.1%}")
+            lines.append(f"波形: {ana['waveform']}")
         if tags := info.get("tags"):
             lines.append("\n标签信息:")
             lines.extend(f"{k}: {v}" for k, v in tags.items())
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from functools import partial
+
+from ..file_type import FileExt
+from ..media_source import MediaSource
+from ..tiers import Tier
+from .audio import AudioExtractor
+from .image import ImageExtractor
+from .video import VideoExtractor
+
+
+@dataclass(frozen=True, slots=True)
+class Extractors:
+    """三类提取器的组合，插件进程与共享解析进程共用同一套分发逻辑"""
+
+    image: ImageExtractor
+    audio: AudioExtractor
+    video: VideoExtractor
+
+    async def extract(
+        self,
+        media: str,
+        source: MediaSource,
+        ext: FileExt,
+        mode: str,
+        group_id: str | None,
+        tier: Tier,
+    ) -> dict | None:
+        """结构化结果，供格式化、缓存与归档共用"""
+        if media == "image":
+            return await self.image.get_image_details(source, ext, group_id, tier)
+        if media == "audio":
+            return await self.audio.get_audio_details(source, ext, tier)
+        return await self.video.get_video_details(source, mode == "章节", tier)
+
+    def formatters(self, media: str, ext: FileExt):
+        """(摘要格式化, 完整格式化)"""
+        if media == "image":
+            return self.image.format_summary, self.image.format_details
+        if media == "audio":
+            return self.audio.format_summary, self.audio.format_details
+        return (
+            partial(self.video.format_summary, ext=ext),
+            partial(self.video.format_details, ext=ext),
+        )
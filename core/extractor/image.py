@@ -1,155 +1,144 @@
-import re
-from io import BytesIO
-
-from PIL import ExifTags, Image
+import asyncio
+import time
 
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
+from PIL import ExifTags, Image
 
+from ..animation import format_delays, parse_animation
+from ..exif_tags import IFD, get_tag_table, translate_gps, translate_tags
+from ..exif_values import gps_coordinates
 from ..file_type import FileExt
 from ..geo_resolver import GeoResolver
+from ..hash_index import ImageHashIndex
+from ..heif import parse_heif
+from ..jpeg_segments import read_jpeg_metadata
+from ..media_source import MediaSource
+from ..metrics import metrics
+from ..phash import compute_hash
+from ..reply import camera_lines
+from ..tiers import Tier
 from ..utils import get_storage_size
 
-# 中英文映射
-KEY_MAP = {
-    "ImageWidth": "图像宽度",
-    "ImageLength": "图像长度",
-    "GPSInfo": "GPS信息",
-    "ResolutionUnit": "分辨率单位",
-    "ExifOffset": "EXIF偏移量",
-    "Make": "制造商",
-    "Model": "型号",
-    "Orientation": "方向",
-    "DateTime": "日期时间",
-    "YCbCrPositioning": "YCbCr定位",
-    "XResolution": "X方向分辨率",
-    "YResolution": "Y方向分辨率",
-    "ExifVersion": "EXIF版本",
-    "SceneType": "场景类型",
-    "ApertureValue": "光圈值",
-    "ColorSpace": "颜色空间",
-    "ExposureBiasValue": "曝光偏差",
-    "MaxApertureValue": "最大光圈值",
-    "ExifImageHeight": "EXIF图像高度",
-    "BrightnessValue": "亮度值",
-    "DateTimeOriginal": "原始日期时间",
-    "FlashPixVersion": "FlashPix版本",
-    "WhiteBalance": "白平衡",
-    "ExifInteroperabilityOffset": "EXIF互操作性偏移量",
-    "Flash": "闪光灯",
-    "ExifImageWidth": "EXIF图像宽度",
-    "ComponentsConfiguration": "组件配置",
-    "MeteringMode": "测光模式",
-    "OffsetTime": "时区偏移",
-    "SubsecTimeOriginal": "原始亚秒时间",
-    "SubsecTime": "亚秒时间",
-    "SubsecTimeDigitized": "数字化亚秒时间",
-    "OffsetTimeOriginal": "原始时区偏移",
-    "DateTimeDigitized": "数字化日期时间",
-    "OffsetTimeDigitized": "数字化时区偏移",
-    "ShutterSpeedValue": "快门速度值",
-    "SensingMethod": "感光方法",
-    "ExposureTime": "曝光时间",
-    "FNumber": "F值",
-    "ExposureProgram": "曝光程序",
-    "ISOSpeedRatings": "ISO速度等级",
-    "ISOSpeed": "ISO速度",
-    "ExposureMode": "曝光模式",
-    "LightSource": "光源",
-    "FocalLengthIn35mmFilm": "35mm胶片焦距",
-    "SceneCaptureType": "场景捕获类型",
-    "FocalLength": "焦距",
-    "Software": "软件",
-    "SensitivityType": "敏感度类型",
-    "RecommendedExposureIndex": "推荐曝光指数",
-    "DigitalZoomRatio": "数字缩放比",
-    "UserComment": "用户备注",
-    "MakerNote": "制造商备注",
-    "JpegIFOffset": "JPEG IF偏移量",
-    "JpegIFByteCount": "JPEG IF字节数",
-    "filter": "滤镜",
-    "filterIntensity": "滤镜强度",
-    "filterMask": "滤镜掩码",
-    "captureOrientation": "拍摄方向",
-    "highlight": "高光增强",
-    "algolist": "算法列表",
-    "multi-frame": "多帧合成",
-    "brp_mask": "BRP掩码",
-    "brp_del_th": "BRP阈值",
-    "brp_del_sen": "BRP灵敏度",
-    "motionLevel": "运动等级",
-    "delta": "Delta变化",
-    "module": "模块",
-    "hw-remosaic": "重采样硬件",
-    "touch": "触摸对焦点",
-    "sceneMode": "场景模式",
-    "cct_value": "色温值",
-    "AI_Scene": "AI场景",
-    "aec_lux": "曝光光照值",
-    "aec_lux_index": "曝光指数",
-    "HdrStatus": "HDR状态",
-    "albedo": "反照率",
-    "confidence": "置信度",
-    "weatherinfo": "天气信息",
-    "temperature": "温度",
-    "fileterIntensity": "滤镜强度",
-    "ImageDescription": "图片描述",
-    "BitsPerSample": "每样本位数",
-    "Compression": "压缩方式",
-    "PhotometricInterpretation": "光度解释",
-    "StripOffsets": "条带偏移量",
-    "SamplesPerPixel": "每像素样本数",
-    "RowsPerStrip": "每条带行数",
-    "StripByteCounts": "条带字节数",
-    "Artist": "艺术家",
-    "HostComputer": "主机计算机",
-    "Copyright": "版权",
-    "ColorMap": "颜色映射表",
-    "ISOspeed ratings": "ISO速度等级",
-    "CompressedBitsPerPixel": "每像素压缩位数",
-    "SubjectDistance": "主体距离",
-    "RelatedSoundFile": "相关声音文件",
-    "InteroperabilityOffset": "EXIF互操作性偏移量",
-    "FocalPlaneXResolution": "焦平面X分辨率",
-    "FocalPlaneYResolution": "焦平面Y分辨率",
-    "FocalPlaneResolutionUnit": "焦平面分辨率单位",
-    "FileSource": "文件源",
-    "CFAPattern": "CFA模式",
-    "CustomRendered": "自定义渲染",
-    "GainControl": "增益控制",
-    "Contrast": "对比度",
-    "Saturation": "饱和度",
-    "Sharpness": "锐度",
-    "DeviceSettingDescription": "设备设置描述",
-    "SubjectDistanceRange": "主体距离范围",
-    "LensMake": "镜头制造商",
-    "LensModel": "镜头型号",
-    "LensSpecification": "镜头规格",
-}
+
+# Pillow 不能直接打开的容器格式，走 heif 模块的 box 解析
+HEIF_TYPES = {FileExt.HEIC, FileExt.AVIF}
 
 
 class ImageExtractor:
     """图片信息提取器"""
 
-    def __init__(self, config: AstrBotConfig, geo_resolver: GeoResolver):
+    def __init__(
+        self,
+        config: AstrBotConfig,
+        geo_resolver: GeoResolver,
+        hash_index: ImageHashIndex | None = None,
+    ):
         self.conf = config
         self.geo_resolver = geo_resolver
-        self.key_map = KEY_MAP
+        self.hash_index = hash_index
+        self.tags = get_tag_table(config["exif_locale"])
 
-    async def get_image_info(self, image: bytes, ext: FileExt) -> str | None:
+    async def get_image_info(
+        self,
+        image: MediaSource,
+        ext: FileExt,
+        group_id: str | None = None,
+        tier: Tier | None = None,
+    ) -> str | None:
         """对外统一入口：返回格式化后的图片信息字符串"""
-        details = await self._get_image_details(image)
+        details = await self.get_image_details(image, ext, group_id, tier)
+        return self.format_details(details)
+
+    async def get_image_details(
+        self,
+        image: MediaSource,
+        ext: FileExt,
+        group_id: str | None = None,
+        tier: Tier | None = None,
+    ) -> dict | None:
+        """结构化的图片信息，供格式化与归档共用"""
+        start = time.perf_counter()
+        details = await self._get_image_details(image, ext, group_id, tier)
+        exif_cost = time.perf_counter() - start
+
+        # 像素统计阶段（降采样解码 + NumPy 向量化）
+        skip_analysis = tier is not None and tier.skip_analysis
+        if ext in HEIF_TYPES:  # Pillow 无法解码 HEIF，只做容器解析
+            skip_analysis = True
+        if details and self.conf["enable_pixel_stats"] and not skip_analysis:
+            start = time.perf_counter()
+            try:
+                # 延迟导入：只有开启像素统计时才需要 NumPy
+                from ..pixel_stats import analyze_pixels
+
+                details["pixel_stats"] = await asyncio.to_thread(
+                    analyze_pixels, image, self.conf["pixel_stats_max_pixels"]
+                )
+            except Exception as e:
+                logger.warning(f"像素统计失败: {e}")
+            logger.debug(
+                f"[图片信息] EXIF 阶段 {exif_cost * 1000:.1f} ms，"
+                f"像素统计阶段 {(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+
         logger.debug(f"[图片信息] 解析结果: {details}")
-        return self._format_details(details) if details else None
+        return details
 
-    async def _get_image_details(self, img_bytes: bytes) -> dict:
+    def format_details(self, details: dict | None) -> str | None:
+        if not details:
+            return None
+        with metrics.timer("image", "format"):
+            return self._format_details(details)
+
+    def format_summary(self, details: dict | None) -> str | None:
+        """摘要：格式 / 尺寸 / 大小、设备与拍摄信息，其余内容只给出条目数"""
+        if not details:
+            return None
+        with metrics.timer("image", "summary"):
+            lines = ["【图片信息】："]
+            basic = [f"格式: {details.get('actual_format')}"]
+            if size := details.get("size"):
+                basic.append(f"尺寸: {size[0]}×{size[1]}")
+            basic.append(f"大小: {details.get('file_size')}")
+            lines.append("，".join(basic))
+            if anim := details.get("animation"):
+                lines.append(f"动图: {anim['frames']} 帧，{anim['duration']} ms")
+            lines.extend(camera_lines(details))
+            if ph := details.get("phash"):
+                if seen := ph.get("seen"):
+                    lines.append(f"重复检测: 此前出现过 {seen} 次")
+            counts = [
+                f"{name} {len(details[key])} 项"
+                for key, name in (
+                    ("exif", "EXIF"),
+                    ("gps_info", "GPS"),
+                    ("xmp", "XMP"),
+                    ("iptc", "IPTC"),
+                )
+                if details.get(key)
+            ]
+            if counts:
+                lines.append("元数据: " + "、".join(counts))
+            return "\n".join(lines)
+
+    async def _get_image_details(
+        self,
+        image: MediaSource,
+        ext: FileExt,
+        group_id: str | None = None,
+        tier: Tier | None = None,
+    ) -> dict:
         """提取图片的详细信息"""
 
-        with Image.open(BytesIO(img_bytes)) as img:
+        if ext in HEIF_TYPES:
+            return await self._get_heif_details(image, ext, tier)
+
+        with Image.open(image.reader()) as img:
             info = {
                 "actual_format": img.format,
                 "size": img.size,
-                "file_size": get_storage_size(img_bytes),
+                "file_size": get_storage_size(image),
                 "mode": img.mode,
             }
 
@@ -158,85 +147,109 @@ class ImageExtractor:
             if dpi:
                 info["dpi"] = dpi
 
+            # 动图帧统计（逐块扫描，不解码帧）
+            if anim := await asyncio.to_thread(parse_animation, image.view, ext):
+                info["animation"] = anim
+
             # 内置缩略图
             thumb = img.info.get("thumbnail")
             if thumb:
                 info["thumbnail"] = {"size": thumb.size, "mode": thumb.mode}
 
-            # EXIF
-            exif_data = getattr(img, "_getexif", lambda: None)()
-            if exif_data:
-                exif_info = {
-                    ExifTags.TAGS.get(k, k): v
-                    for k, v in exif_data.items()
-                    if k in ExifTags.TAGS
-                }
-                # 处理GPS信息
-                if "GPSInfo" in exif_info:
-                    gps_raw = exif_info.pop("GPSInfo")
-                    if self.conf["enable_geo_resolver"]:
-                        info["gps_info"] = (
-                            await self.geo_resolver.resolve(gps_raw) or gps_raw
-                        )
-                    else:
-                        info["gps_info"] = gps_raw
+            exif = img.getexif()
+            if exif:
+                info.update(await self._get_exif_details(exif, tier))
+
+            # XMP / IPTC / ICC：一次扫描 JPEG 头部标记段，到 SOS 为止
+            if ext == FileExt.JPG:
+                info.update(read_jpeg_metadata(image.view))
 
-                # 用户备注
-                if "UserComment" in exif_info:
-                    raw_comment = exif_info.pop("UserComment")
-                    exif_info["UserComment"] = (
-                        self._parse_and_join(raw_comment) or raw_comment
+            # 感知哈希 + 重复检测（放在最后，draft 会改变解码参数）
+            # 解码缩放与 SQLite 查询都是同步操作，放到线程中执行，不阻塞事件循环
+            # 只有头部数据的档位无法解码像素，跳过分析的档位也不计算
+            skip_hash = tier is not None and (tier.header_only or tier.skip_analysis)
+            if self.hash_index and not skip_hash:
+                algo = self.conf["phash_algorithm"]
+                try:
+                    value = await asyncio.to_thread(compute_hash, img, algo)
+                    seen = await asyncio.to_thread(
+                        self.hash_index.lookup_and_add, value, group_id
                     )
-                # 转中文标签
-                exif_chinese = {
-                    self.key_map.get(tag, tag): value
-                    for tag, value in exif_info.items()
-                }
-                info["exif"] = exif_chinese
+                except Exception as e:
+                    logger.warning(f"感知哈希计算失败: {e}")
+                else:
+                    info["phash"] = {
+                        "algorithm": algo,
+                        "value": f"{value:016x}",
+                        **seen,
+                    }
 
             return info
 
-    def _parse_and_join(self, text: str) -> str:
-        """解析调试字符串 → 映射中文 → 拼接为一个整字符串"""
-        result = {}
+    async def _get_heif_details(
+        self, image: MediaSource, ext: FileExt, tier: Tier | None
+    ) -> dict | None:
+        """HEIC / AVIF：只读 meta 下的几 KB 元数据 box，不解码像素"""
+        heif = parse_heif(image.view)
+        if heif is None:
+            return None
 
-        if isinstance(text, bytes):
+        info = {
+            "actual_format": ext.name,
+            "size": (heif["width"], heif["height"]) if "width" in heif else None,
+            "file_size": get_storage_size(image),
+            "mode": f"{heif['bit_depth']} bit" if "bit_depth" in heif else None,
+            "heif": {
+                key: heif[key]
+                for key in ("brand", "codec", "tiles", "rotation", "color", "items")
+                if key in heif
+            },
+        }
+        if thumb := heif.get("thumbnail"):
+            info["thumbnail"] = {"size": thumb, "mode": heif.get("codec")}
+
+        # Exif 项与 JPEG 的 APP1 同为 TIFF 结构，走同一套翻译流程
+        if tiff := heif.get("exif"):
+            exif = Image.Exif()
             try:
-                text = text.decode("utf-8")
-            except UnicodeDecodeError:
-                text = text.decode("latin-1", errors="ignore")
-        # 按 ; 分割，过滤掉空字段
-        parts = [p.strip() for p in text.split(";") if p.strip()]
-
-        for part in parts:
-            if ":" not in part:
-                continue
-
-            key, value = part.split(":", 1)
-            key = key.strip()
-            value = value.strip()
-
-            # === 值解析 ===
-            if value.lower() == "null" or value == "":
-                value = None
-
-            # (x, y) → tuple
-            elif re.match(r"\(-?\d+(\.\d+)?,\s*-?\d+(\.\d+)?\)", value):
-                nums = re.findall(r"-?\d+\.?\d*", value)
-                value = tuple(float(n) for n in nums)
-
-            # 数字转换 → int/float
+                exif.load(tiff)
+            except Exception as e:
+                logger.warning(f"HEIF Exif 解析失败: {e}")
             else:
-                if re.fullmatch(r"-?\d+", value):
-                    value = int(value)
-                elif re.fullmatch(r"-?\d+\.\d+", value):
-                    value = float(value)
+                info.update(await self._get_exif_details(exif, tier))
+        return info
+
+    async def _get_exif_details(self, exif: Image.Exif, tier: Tier | None) -> dict:
+        """EXIF：IFD0 / Exif / Interop 逐标签查表翻译，GPS 单独处理"""
+        exif_ifd = exif.get_ifd(IFD.Exif)
+        exif_info = translate_tags(exif, self.tags.main)
+        exif_info.update(translate_tags(exif_ifd, self.tags.main))
+        if IFD.Interop in exif_ifd:  # 无指针时 get_ifd 会抛 KeyError
+            interop = exif.get_ifd(IFD.Interop)
+            exif_info.update(translate_tags(interop, self.tags.interop))
 
-            # === 字段名中英文转换 ===
-            cn_key = self.key_map.get(key, key)  # 没定义就用原英文
-            result[cn_key] = value
+        info = {
+            "camera": {
+                "make": exif.get(ExifTags.Base.Make),
+                "model": exif.get(ExifTags.Base.Model),
+                "datetime": exif_ifd.get(ExifTags.Base.DateTimeOriginal)
+                or exif.get(ExifTags.Base.DateTime),
+            }
+        }
+        if gps_raw := exif.get_ifd(IFD.GPSInfo):
+            info["coordinates"] = gps_coordinates(gps_raw)
+            info["gps_info"] = await self._get_gps_info(gps_raw, tier)
+        if exif_info:
+            info["exif"] = exif_info
+        return info
 
-        return "\n" + "\n".join(f"{k}: {v}" for k, v in result.items())
+    async def _get_gps_info(self, gps_raw: dict, tier: Tier | None) -> dict:
+        """十进制坐标 + 地图链接，开启逆地理解析时附带地址"""
+        address = None
+        skip_geo = tier is not None and tier.skip_geo
+        if self.conf["enable_geo_resolver"] and not skip_geo:
+            address = await self.geo_resolver.resolve(gps_raw)
+        return translate_gps(gps_raw, self.tags, address)
 
     def _format_details(self, info: dict) -> str:
         """将图片信息整理为可读文本"""
@@ -250,11 +263,59 @@ class ImageExtractor:
         if dpi := info.get("dpi"):
             s += f"\nDPI: {dpi}"
 
+        if heif := info.get("heif"):
+            s += f"\n容器品牌: {heif['brand']}"
+            s += f"\n编码: {heif.get('codec')}"
+            if tiles := heif.get("tiles"):
+                s += f"\n网格分块: {tiles}"
+            if rotation := heif.get("rotation"):
+                s += f"\n旋转: {rotation}°"
+            if color := heif.get("color"):
+                s += f"\n色彩信息: {color}"
+
+        if anim := info.get("animation"):
+            loop = anim["loop"]
+            s += f"\n帧数: {anim['frames']}"
+            s += f"\n总时长: {anim['duration']} ms"
+            s += f"\n帧间隔: {format_delays(anim['delays'])}"
+            s += f"\n循环次数: {'无限' if loop == 0 else loop}"
+
         if thumb := info.get("thumbnail"):
             s += f"\n缩略图: 尺寸 {thumb['size']}，模式 {thumb['mode']}"
 
+        if stats := info.get("pixel_stats"):
+            mean, std = stats["mean"], stats["std"]
+            s += f"\n亮度均值(RGB): {mean[0]}, {mean[1]}, {mean[2]}"
+            s += f"\n亮度标准差(RGB): {std[0]}, {std[1]}, {std[2]}"
+            s += "\n主色调: " + ", ".join(
+                f"{color}({ratio:.1%})" for color, ratio in stats["palette"]
+            )
+            s += f"\n清晰度(拉普拉斯方差): {stats['sharpness']}"
+            if (alpha := stats.get("alpha_coverage")) is not None:
+                s += f"\n透明区域占比: {alpha:.1%}"
+
+        if ph := info.get("phash"):
+            s += f"\n感知哈希({ph['algorithm']}): {ph['value']}"
+            if seen := ph.get("seen"):
+                first_time = time.strftime(
+                    "%Y-%m-%d %H:%M", time.localtime(ph["first_time"])
+                )
+                s += f"\n重复检测: 此前出现过 {seen} 次"
+                s += f"，首次于 {ph.get('first_group') or '私聊'}（{first_time}）"
+
         if gps := info.get("gps_info"):
-            s += f"\nGPS信息: {gps}"
+            s += "\nGPS信息:" + "".join(f"\n  {k}: {v}" for k, v in gps.items())
+
+        terms = self.tags.terms
+        for section in ("icc", "iptc", "xmp"):
+            if fields := info.get(section):
+                s += f"\n{section.upper()}:"
+                for k, v in fields.items():
+                    if isinstance(v, list):  # 编辑历史逐条换行
+                        s += f"\n  {terms.get(k, k)}:"
+                        s += "".join(f"\n    {item}" for item in v)
+                    else:
+                        s += f"\n  {terms.get(k, k)}: {v}"
 
         if exif := info.get("exif"):
             s += "\n"
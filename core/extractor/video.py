@@ -1,13 +1,62 @@
+import asyncio
 import json
-import os
+import re
 import subprocess
-from tempfile import NamedTemporaryFile
+from dataclasses import dataclass
 
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
 
 from ..file_type import FileExt
+from ..media_source import MediaSource
+from ..metrics import metrics
+from ..reply import camera_lines
+from ..tiers import Tier
 from ..utils import get_storage_size
+from ..video_analysis import analyze_video
+
+# 流类型中文名
+CODEC_TYPE_NAMES = {
+    "video": "视频",
+    "audio": "音频",
+    "subtitle": "字幕",
+    "data": "数据",
+    "attachment": "附件",
+}
+
+# HDR 传输特性
+HDR_TRANSFERS = {"smpte2084": "HDR10/PQ", "arib-std-b67": "HLG"}
+
+FFPROBE_TIMEOUT = 5.0  # 未指定档位时 ffprobe 的时限（秒）
+
+# ISO 6709 位置串，如 +31.2340+121.4667+012.3/
+ISO6709_RE = re.compile(r"([+-]\d+(?:\.\d+)?)([+-]\d+(?:\.\d+)?)")
+
+
+@dataclass(slots=True)
+class StreamInfo:
+    """单条流的紧凑记录，只保留展示所需字段"""
+
+    index: int
+    codec_type: str
+    codec_name: str | None = None
+    language: str | None = None
+    title: str | None = None
+    width: int | None = None
+    height: int | None = None
+    fps: float | None = None
+    pix_fmt: str | None = None
+    color_space: str | None = None
+    color_transfer: str | None = None
+    color_primaries: str | None = None
+    rotation: int | None = None
+    channels: int | None = None
+    channel_layout: str | None = None
+    sample_rate: str | None = None
+    bit_rate: int | None = None
+    default: bool = False
+    forced: bool = False
+    attached_pic: bool = False
 
 
 class VideoExtractor:
@@ -16,21 +65,90 @@ class VideoExtractor:
     def __init__(self, config: AstrBotConfig):
         self.conf = config
 
-    async def get_video_info(self, video: bytes, ext: FileExt) -> str | None:
-        details = self._parse_by_ffprobe(video)
+    async def get_video_info(
+        self,
+        video: MediaSource,
+        ext: FileExt,
+        show_chapters: bool = False,
+        tier: Tier | None = None,
+    ) -> str | None:
+        details = await self.get_video_details(video, show_chapters, tier)
+        return self.format_details(details, ext)
+
+    async def get_video_details(
+        self,
+        video: MediaSource,
+        show_chapters: bool = False,
+        tier: Tier | None = None,
+    ) -> dict | None:
+        """
+        结构化的视频信息，供格式化与归档共用
+        ffprobe 与样本表分析都在线程中执行，ffprobe 的时限取档位的时间预算
+        """
+        timeout = tier.budget if tier else FFPROBE_TIMEOUT
+        details = await asyncio.to_thread(
+            self._parse_by_ffprobe, video, show_chapters, timeout
+        )
+        if details and tier and tier.skip_streams:
+            details.pop("streams", None)
+        skip_analysis = tier is not None and tier.skip_analysis
+        if details and self.conf["enable_video_analysis"] and not skip_analysis:
+            try:
+                details["analysis"] = await asyncio.to_thread(analyze_video, video.view)
+            except Exception as e:
+                logger.warning(f"视频样本表分析失败: {e}")
         logger.debug(f"[视频信息] 解析结果: {details}")
-        return self._format_details(details, ext) if details else None
+        return details
+
+    def format_details(self, details: dict | None, ext: FileExt) -> str | None:
+        if not details:
+            return None
+        with metrics.timer("video", "format"):
+            return self._format_details(details, ext)
+
+    def format_summary(self, details: dict | None, ext: FileExt) -> str | None:
+        """摘要：格式 / 时长 / 分辨率 / 编码与拍摄信息，流与章节只给出数量"""
+        if not details:
+            return None
+        with metrics.timer("video", "summary"):
+            lines = ["【视频信息】："]
+            basic = [f"格式: {ext}"]
+            if dur := details.get("duration"):
+                basic.append(f"时长: {dur}s")
+            if size := details.get("file_size"):
+                basic.append(f"大小: {size}")
+            lines.append("，".join(basic))
+            video = []
+            if all(res := (details.get("width"), details.get("height"))):
+                video.append(f"{res[0]}×{res[1]}")
+            if fps := details.get("fps"):
+                video.append(f"{fps} fps")
+            codecs = "/".join(
+                filter(None, (details.get("video_codec"), details.get("audio_codec")))
+            )
+            if codecs:
+                video.append(codecs)
+            if video:
+                lines.append("画面: " + "，".join(video))
+            lines.extend(camera_lines(details))
+            counts = [
+                f"{name} {len(details[key])} 个"
+                for key, name in (("streams", "流"), ("chapters", "章节"))
+                if details.get(key)
+            ]
+            if counts:
+                lines.append("包含: " + "、".join(counts))
+            return "\n".join(lines)
 
     # -------------------- ffprobe 解析 --------------------
 
-    def _parse_by_ffprobe(self, data: bytes) -> dict | None:
-        tmp_path = None
+    def _parse_by_ffprobe(
+        self,
+        data: MediaSource,
+        show_chapters: bool = False,
+        timeout: float = FFPROBE_TIMEOUT,
+    ) -> dict | None:
         try:
-            with NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                f.write(data)
-                f.flush()
-                tmp_path = f.name
-
             cmd = [
                 "ffprobe",
                 "-v",
@@ -39,14 +157,16 @@ class VideoExtractor:
                 "json",
                 "-show_format",
                 "-show_streams",
-                tmp_path,
             ]
-
-            proc = subprocess.run(
-                cmd,
-                capture_output=True,
-                timeout=5,
-            )
+            if show_chapters:
+                cmd.append("-show_chapters")
+
+            with data.path(".mp4") as tmp_path:
+                proc = subprocess.run(
+                    [*cmd, tmp_path],
+                    capture_output=True,
+                    timeout=timeout,
+                )
 
             # --- 调试信息 ---
             logger.debug(
@@ -78,15 +198,11 @@ class VideoExtractor:
             logger.error(f"ffprobe 调用异常: {e}")
             return None
 
-        finally:
-            if tmp_path:
-                os.remove(tmp_path)
-
         return self._parse_ffprobe_result(info, data)
 
     # -------------------- 解析结构 --------------------
 
-    def _parse_ffprobe_result(self, info: dict, data: bytes) -> dict:
+    def _parse_ffprobe_result(self, info: dict, data: MediaSource) -> dict:
         video_stream = None
         audio_stream = None
 
@@ -123,8 +239,62 @@ class VideoExtractor:
                 }
             )
 
+        # 拍摄设备 / 时间 / 位置（手机录制的视频写在容器标签中）
+        tags = info.get("format", {}).get("tags", {})
+        result["camera"] = {
+            "make": tags.get("com.apple.quicktime.make") or tags.get("make"),
+            "model": tags.get("com.apple.quicktime.model") or tags.get("model"),
+            "datetime": tags.get("com.apple.quicktime.creationdate")
+            or tags.get("creation_time"),
+        }
+        location = tags.get("com.apple.quicktime.location.ISO6709") or tags.get(
+            "location"
+        )
+        if location and (m := ISO6709_RE.match(location)):
+            result["coordinates"] = (float(m[1]), float(m[2]))
+
+        # 完整流清单（字幕、多音轨、封面、HDR、旋转等）
+        result["streams"] = [self._parse_stream(s) for s in info.get("streams", [])]
+
+        if chapters := info.get("chapters"):
+            result["chapters"] = [
+                (
+                    round(float(c.get("start_time", 0)), 2),
+                    round(float(c.get("end_time", 0)), 2),
+                    c.get("tags", {}).get("title"),
+                )
+                for c in chapters
+            ]
+
         return result
 
+    def _parse_stream(self, stream: dict) -> StreamInfo:
+        tags = stream.get("tags", {})
+        disposition = stream.get("disposition", {})
+        bit_rate = stream.get("bit_rate")
+        return StreamInfo(
+            index=stream.get("index", 0),
+            codec_type=stream.get("codec_type", "unknown"),
+            codec_name=stream.get("codec_name"),
+            language=tags.get("language"),
+            title=tags.get("title"),
+            width=stream.get("width"),
+            height=stream.get("height"),
+            fps=self._calc_fps(stream) if stream.get("codec_type") == "video" else None,
+            pix_fmt=stream.get("pix_fmt"),
+            color_space=stream.get("color_space"),
+            color_transfer=stream.get("color_transfer"),
+            color_primaries=stream.get("color_primaries"),
+            rotation=self._get_rotation(stream),
+            channels=stream.get("channels"),
+            channel_layout=stream.get("channel_layout"),
+            sample_rate=stream.get("sample_rate"),
+            bit_rate=int(bit_rate) if str(bit_rate).isdigit() else None,
+            default=bool(disposition.get("default")),
+            forced=bool(disposition.get("forced")),
+            attached_pic=bool(disposition.get("attached_pic")),
+        )
+
     # -------------------- 工具方法 --------------------
 
     def _calc_fps(self, stream: dict) -> float | None:
@@ -137,8 +307,51 @@ class VideoExtractor:
         except Exception:
             return None
 
+    @staticmethod
+    def _get_rotation(stream: dict) -> int | None:
+        """旋转角度：新版 ffprobe 在 side_data 中，旧版在 tags.rotate 中"""
+        for side in stream.get("side_data_list", []):
+            if "rotation" in side:
+                return int(side["rotation"])
+        rotate = stream.get("tags", {}).get("rotate")
+        return int(rotate) if rotate and rotate.lstrip("-").isdigit() else None
+
     # -------------------- 输出格式化 --------------------
 
+    def _format_stream(self, st: StreamInfo) -> str:
+        parts = [f"#{st.index} {CODEC_TYPE_NAMES.get(st.codec_type, st.codec_type)}"]
+        if st.attached_pic:
+            parts[0] = f"#{st.index} 封面"
+        if st.codec_name:
+            parts.append(st.codec_name)
+        if st.width and st.height:
+            parts.append(f"{st.width}×{st.height}")
+        if st.fps:
+            parts.append(f"{st.fps}fps")
+        if st.pix_fmt:
+            parts.append(st.pix_fmt)
+        if hdr := HDR_TRANSFERS.get(st.color_transfer or ""):
+            parts.append(hdr)
+        if st.color_primaries and st.color_primaries != "unknown":
+            parts.append(f"色域 {st.color_primaries}")
+        if st.rotation:
+            parts.append(f"旋转 {st.rotation}°")
+        if st.channels:
+            parts.append(st.channel_layout or f"{st.channels}ch")
+        if st.sample_rate:
+            parts.append(f"{st.sample_rate}Hz")
+        if st.bit_rate:
+            parts.append(f"{st.bit_rate // 1000}kbps")
+        if st.language and st.language != "und":
+            parts.append(f"[{st.language}]")
+        if st.title:
+            parts.append(f"「{st.title}」")
+        if st.default:
+            parts.append("默认")
+        if st.forced:
+            parts.append("强制")
+        return " ".join(parts)
+
     def _format_details(self, info: dict, ext: FileExt) -> str:
         lines = ["【视频信息】："]
 
@@ -164,4 +377,31 @@ class VideoExtractor:
         if ch := info.get("channels"):
             lines.append(f"声道数: {ch}")
 
+        if ana := info.get("analysis"):
+            lines.append("\n码流分析:")
+            if "frames" in ana:
+                lines.append(f"总帧数: {ana['frames']}，关键帧: {ana['keyframes']}")
+            else:
+                lines.append(f"关键帧: {ana['keyframes']}（来自 Cues 索引）")
+            if gop := ana.get("gop"):
+                lines.append(f"GOP: 平均 {gop['avg']} 帧（{gop['min']}~{gop['max']}）")
+            if interval := ana.get("keyframe_interval"):
+                lines.append(f"关键帧间隔: {interval}s")
+            br = ana["bitrate"]
+            lines.append(f"平均码率: {br['avg']} kbps")
+            lines.append(f"峰值码率: {br['peak']} kbps（第 {br['peak_at']} 秒）")
+            if "vfr" in ana:
+                lines.append(f"可变帧率: {'是' if ana['vfr'] else '否'}")
+
+        if streams := info.get("streams"):
+            lines.append(f"\n流列表（共 {len(streams)} 条）:")
+            lines.extend(self._format_stream(st) for st in streams)
+
+        if chapters := info.get("chapters"):
+            lines.append(f"\n章节（共 {len(chapters)} 个）:")
+            lines.extend(
+                f"{start}s ~ {end}s {title or ''}".rstrip()
+                for start, end, title in chapters
+            )
+
         return "\n".join(lines).strip()
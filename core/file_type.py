@@ -1,11 +1,30 @@
+import struct
 from enum import Enum
 
+# ISO-BMFF ftyp 品牌：HEIF 系列与 MP4 共用容器，只能靠品牌区分
+AVIF_BRANDS = {b"avif", b"avis"}
+HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1"}
+
+MAX_BRANDS = 16  # 兼容品牌数量上限，防止畸形 ftyp
+
+
+def ftyp_brands(data: bytes) -> set[bytes]:
+    """主品牌 + 兼容品牌；data 只需包含 ftyp box"""
+    if len(data) < 16 or data[4:8] != b"ftyp":
+        return set()
+    size = min(struct.unpack_from(">I", data, 0)[0], len(data), 16 + MAX_BRANDS * 4)
+    brands = {bytes(data[8:12])}
+    brands.update(bytes(data[pos : pos + 4]) for pos in range(16, size - 3, 4))
+    return brands
+
 
 class FileExt(str, Enum):
     JPG = "jpg"
     PNG = "png"
     GIF = "gif"
     WEBP = "webp"
+    HEIC = "heic"
+    AVIF = "avif"
 
     MP3 = "mp3"
     WAV = "wav"
@@ -27,6 +46,8 @@ class FileExt(str, Enum):
             cls.PNG,
             cls.GIF,
             cls.WEBP,
+            cls.HEIC,
+            cls.AVIF,
         }
 
     @classmethod
@@ -60,12 +81,22 @@ class FileExt(str, Enum):
     def is_known(self) -> bool:
         return self is not FileExt.UNKNOWN
 
+    def media_type(self) -> str:
+        """媒体大类：image / audio / video / unknown"""
+        if self.is_image():
+            return "image"
+        if self.is_audio():
+            return "audio"
+        if self.is_video():
+            return "video"
+        return "unknown"
+
     @classmethod
     def from_bytes(cls, data: bytes) -> "FileExt":
         if not data:
             return cls.UNKNOWN
 
-        head = data[:16]
+        head = data[:32]
 
         # --- image ---
         if head.startswith(b"\xff\xd8\xff"):
@@ -89,6 +120,13 @@ class FileExt(str, Enum):
         if head.startswith(b"#!AMR"):
             return cls.AMR
 
+        # AVIF 先于 HEIF 判断：AVIF 文件通常同时声明 mif1 品牌
+        if brands := ftyp_brands(head):
+            if brands & AVIF_BRANDS:
+                return cls.AVIF
+            if brands & HEIF_BRANDS:
+                return cls.HEIC
+
         # --- video ---
         if b"ftyp" in head:
             return cls.MP4
@@ -3,6 +3,8 @@ import aiohttp
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
 
+from .metrics import metrics
+
 
 class GeoResolver:
     """GPS 逆地理解析"""
@@ -15,6 +17,10 @@ class GeoResolver:
         """
         对外接口：解析 GPS 信息
         """
+        with metrics.timer("image", "geo"):
+            return await self._resolve(gps_info)
+
+    async def _resolve(self, gps_info: dict) -> dict | None:
         try:
             lat, lon = self._parse_gps(gps_info)
             if lat is None or lon is None:
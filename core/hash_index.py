@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+import time
+from itertools import combinations
+from pathlib import Path
+
+from astrbot.api import logger
+
+from .phash import hamming
+
+CHUNKS = 4  # 64 bit 拆成 4 段，每段 16 bit
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+MAX_THRESHOLD = 11  # 段内半径 ≤ 2，避免 SQL 参数过多
+
+
+class ImageHashIndex:
+    """
+    感知哈希持久化索引（多索引哈希 MIH）
+    由鸽巢原理，汉明距离 ≤ r 的两个哈希至少有一段距离 ≤ r // 4，
+    因此只需按段查索引，再对少量候选计算完整汉明距离
+    """
+
+    def __init__(self, db_path: Path, threshold: int = 6):
+        self.threshold = min(threshold, MAX_THRESHOLD)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()  # 连接在多个线程间共用
+        cols = ", ".join(f"c{i} INTEGER" for i in range(CHUNKS))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS image_hash ("
+            f"id INTEGER PRIMARY KEY, hash INTEGER, {cols}, group_id TEXT, ts REAL)"
+        )
+        for i in range(CHUNKS):
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_c{i} ON image_hash (c{i})"
+            )
+        self.conn.commit()
+
+    def add(self, value: int, group_id: str | None):
+        with self.lock:
+            self._insert(value, group_id)
+            self.conn.commit()
+
+    def _insert(self, value: int, group_id: str | None):
+        chunks = self._split(value)
+        self.conn.execute(
+            "INSERT INTO image_hash (hash, "
+            + ", ".join(f"c{i}" for i in range(CHUNKS))
+            + ", group_id, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._to_signed(value), *chunks, group_id, time.time()),
+        )
+
+    def query(self, value: int) -> list[tuple[int, str | None, float]]:
+        """返回 (距离, 群号, 时间戳) 列表，按时间升序"""
+        sub_radius = self.threshold // CHUNKS
+        clauses, params = [], []
+        for i, chunk in enumerate(self._split(value)):
+            variants = self._chunk_variants(chunk, sub_radius)
+            clauses.append(f"c{i} IN ({', '.join('?' * len(variants))})")
+            params.extend(variants)
+
+        rows = self.conn.execute(
+            "SELECT hash, group_id, ts FROM image_hash WHERE "
+            + " OR ".join(clauses)
+            + " ORDER BY ts",
+            params,
+        ).fetchall()
+
+        result = []
+        for h, group_id, ts in rows:
+            dist = hamming(value, h & 0xFFFFFFFFFFFFFFFF)
+            if dist <= self.threshold:
+                result.append((dist, group_id, ts))
+        return result
+
+    def lookup_and_add(self, value: int, group_id: str | None) -> dict:
+        """
+        查询历史记录后写入本次哈希，返回重复统计
+        查询与写入在同一个 IMMEDIATE 事务内完成：线程锁串行化本进程内的调用，
+        事务的写锁串行化共用数据库的其它进程（共享解析进程的工作进程），
+        同一图片并发到达时后到者一定能看到先到者的记录
+        """
+        try:
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    matches = self.query(value)
+                    self._insert(value, group_id)
+                except BaseException:
+                    self.conn.rollback()
+                    raise
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"图片哈希索引读写失败: {e}")
+            return {}
+        info: dict = {"seen": len(matches)}
+        if matches:
+            _, first_group, first_ts = matches[0]
+            info["first_group"] = first_group
+            info["first_time"] = first_ts
+        return info
+
+    def close(self):
+        self.conn.close()
+
+    # -------------------- 内部工具 --------------------
+
+    @staticmethod
+    def _split(value: int) -> list[int]:
+        return [(value >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(CHUNKS)]
+
+    @staticmethod
+    def _to_signed(value: int) -> int:
+        """SQLite 只支持有符号 64 位整数"""
+        return value - (1 << 64) if value >= 1 << 63 else value
+
+    @staticmethod
+    def _chunk_variants(chunk: int, radius: int) -> list[int]:
+        """枚举与 chunk 汉明距离 ≤ radius 的所有 16 位取值"""
+        variants = [chunk]
+        for r in range(1, radius + 1):
+            for bits in combinations(range(CHUNK_BITS), r):
+                v = chunk
+                for b in bits:
+                    v ^= 1 << b
+                variants.append(v)
+        return variants
@@ -0,0 +1,258 @@
+import struct
+
+from .file_type import AVIF_BRANDS, HEIF_BRANDS, ftyp_brands
+from .video_analysis import iter_boxes
+
+
+def parse_heif(data: bytes | memoryview) -> dict | None:
+    """
+    只解析 meta 下的 pitm / iinf / iloc / iref / iprp 等元数据 box，不解码任何图像数据；
+    返回主图尺寸、编码、旋转、网格分块与 Exif 原始数据（TIFF 头开始）
+    """
+    brands = ftyp_brands(data)
+    if not brands & (HEIF_BRANDS | AVIF_BRANDS):
+        return None
+
+    # 顶层 box 头同样可能被截断（如 size=1 却缺少 64 位大小字段）
+    try:
+        top = iter_boxes(data, 0, len(data))
+        meta = next(((body, end) for btype, body, end in top if btype == b"meta"), None)
+        if not meta:
+            return None
+        boxes = _read_meta(data, *meta)
+    except (struct.error, IndexError, ValueError):
+        return None
+
+    primary = boxes["primary"]
+    items = boxes["items"]
+    props = boxes["props"]
+    item_type = items.get(primary, {}).get("type")
+    refs = boxes["refs"]
+
+    result = {
+        "brand": bytes(data[8:12]).decode("ascii", "replace"),
+        "items": len(items),
+    }
+    primary_props = props.get(primary, {})
+    if ispe := primary_props.get("ispe"):
+        result["width"], result["height"] = ispe
+    if (rotation := primary_props.get("irot")) is not None:
+        result["rotation"] = rotation
+    if depth := primary_props.get("pixi"):
+        result["bit_depth"] = depth
+    if colr := primary_props.get("colr"):
+        result["color"] = colr
+
+    # 网格图：主项为 grid，由 dimg 引用的分块拼成，编码取自分块
+    tiles = refs.get((b"dimg", primary), [])
+    if item_type == "grid" and tiles:
+        result["tiles"] = len(tiles)
+        result["codec"] = items.get(tiles[0], {}).get("type")
+        tile_props = props.get(tiles[0], {})
+        if "bit_depth" not in result and (depth := tile_props.get("pixi")):
+            result["bit_depth"] = depth
+    else:
+        result["codec"] = item_type
+
+    # 缩略图：thmb 引用指向主图
+    thumbs = [src for (t, src), dst in refs.items() if t == b"thmb" and primary in dst]
+    if thumbs and (thumb_ispe := props.get(thumbs[0], {}).get("ispe")):
+        result["thumbnail"] = thumb_ispe
+
+    # Exif：类型为 Exif 的项，优先取通过 cdsc 描述主图的那一个
+    exif_items = [i for i, info in items.items() if info.get("type") == "Exif"]
+    described = [i for i in exif_items if primary in refs.get((b"cdsc", i), [])]
+    if exif_id := (described or exif_items or [None])[0]:
+        result["exif"] = _read_exif(data, boxes, exif_id)
+    return result
+
+
+# -------------------- meta --------------------
+
+
+def _read_meta(data, start: int, end: int) -> dict:
+    boxes: dict = {"primary": None, "items": {}, "locations": {}, "refs": {}}
+    boxes["props"] = {}
+    prop_list: list[tuple[str, object]] = []
+    associations: dict[int, list[int]] = {}
+
+    def walk(s: int, e: int):
+        for btype, body, box_end in iter_boxes(data, s, e):
+            if btype == b"iprp":
+                walk(body, box_end)
+            elif btype == b"ipco":
+                prop_list.extend(_read_properties(data, body, box_end))
+            elif btype == b"pitm":
+                version = data[body]
+                fmt = ">H" if version == 0 else ">I"
+                boxes["primary"] = struct.unpack_from(fmt, data, body + 4)[0]
+            elif btype == b"iinf":
+                boxes["items"] = _read_iinf(data, body, box_end)
+            elif btype == b"iloc":
+                boxes["locations"] = _read_iloc(data, body, box_end)
+            elif btype == b"iref":
+                boxes["refs"] = _read_iref(data, body, box_end)
+            elif btype == b"idat":
+                boxes["idat"] = body
+            elif btype == b"ipma":
+                associations.update(_read_ipma(data, body, box_end))
+
+    # meta 是 FullBox，子 box 从第 4 字节开始
+    walk(start + 4, end)
+
+    for item_id, indices in associations.items():
+        item_props = boxes["props"].setdefault(item_id, {})
+        for index in indices:
+            if 0 < index <= len(prop_list):  # 属性序号从 1 开始，0 表示无
+                name, value = prop_list[index - 1]
+                item_props.setdefault(name, value)
+    return boxes
+
+
+def _read_iinf(data, body: int, end: int) -> dict[int, dict]:
+    version = data[body]
+    entries_start = body + (6 if version == 0 else 8)
+    items = {}
+    for btype, infe, _ in iter_boxes(data, entries_start, end):
+        if btype != b"infe" or data[infe] < 2:  # 只支持 v2 / v3 infe
+            continue
+        pos = infe + 4
+        if data[infe] == 2:
+            item_id = struct.unpack_from(">H", data, pos)[0]
+            pos += 2
+        else:
+            item_id = struct.unpack_from(">I", data, pos)[0]
+            pos += 4
+        item_type = bytes(data[pos + 2 : pos + 6]).decode("ascii", "replace")
+        items[item_id] = {"type": item_type}
+    return items
+
+
+def _read_iloc(data, body: int, end: int) -> dict[int, tuple]:
+    """item_ID → (构造方式, [(偏移, 长度), ...])"""
+    version = data[body]
+    sizes = struct.unpack_from(">H", data, body + 4)[0]
+    offset_size, length_size = sizes >> 12, (sizes >> 8) & 0xF
+    base_size = (sizes >> 4) & 0xF
+    index_size = sizes & 0xF if version in (1, 2) else 0
+    pos = body + 6
+
+    def read(n: int) -> int:
+        nonlocal pos
+        value = int.from_bytes(data[pos : pos + n], "big") if n else 0
+        pos += n
+        return value
+
+    count = read(2 if version < 2 else 4)
+    locations = {}
+    for _ in range(count):
+        item_id = read(2 if version < 2 else 4)
+        method = read(2) & 0xF if version in (1, 2) else 0
+        read(2)  # data_reference_index
+        base = read(base_size)
+        extents = []
+        for _ in range(read(2)):
+            read(index_size)
+            offset = read(offset_size)
+            extents.append((base + offset, read(length_size)))
+        locations[item_id] = (method, extents)
+        if pos > end:
+            raise ValueError("iloc 越界")
+    return locations
+
+
+def _read_iref(data, body: int, end: int) -> dict[tuple[bytes, int], list[int]]:
+    """(引用类型, 源 item) → 目标 item 列表"""
+    version = data[body]
+    id_fmt, id_size = (">H", 2) if version == 0 else (">I", 4)
+    refs = {}
+    for btype, ref, ref_end in iter_boxes(data, body + 4, end):
+        src = struct.unpack_from(id_fmt, data, ref)[0]
+        count = struct.unpack_from(">H", data, ref + id_size)[0]
+        first = ref + id_size + 2
+        refs[(btype, src)] = [
+            struct.unpack_from(id_fmt, data, first + i * id_size)[0]
+            for i in range(count)
+            if first + (i + 1) * id_size <= ref_end
+        ]
+    return refs
+
+
+def _read_ipma(data, body: int, end: int) -> dict[int, list[int]]:
+    version, flags = data[body], data[body + 3]
+    pos = body + 4
+    count = struct.unpack_from(">I", data, pos)[0]
+    pos += 4
+    result = {}
+    for _ in range(count):
+        if version < 1:
+            item_id = struct.unpack_from(">H", data, pos)[0]
+            pos += 2
+        else:
+            item_id = struct.unpack_from(">I", data, pos)[0]
+            pos += 4
+        n = data[pos]
+        pos += 1
+        indices = []
+        for _ in range(n):
+            if flags & 1:
+                indices.append(struct.unpack_from(">H", data, pos)[0] & 0x7FFF)
+                pos += 2
+            else:
+                indices.append(data[pos] & 0x7F)
+                pos += 1
+        result[item_id] = indices
+        if pos > end:
+            raise ValueError("ipma 越界")
+    return result
+
+
+def _read_properties(data, start: int, end: int) -> list[tuple[str, object]]:
+    """ipco 中的属性按出现顺序编号；只解析需要的几种，其余占位"""
+    props = []
+    for btype, body, box_end in iter_boxes(data, start, end):
+        value = None
+        if btype == b"ispe":
+            value = struct.unpack_from(">II", data, body + 4)
+        elif btype == b"irot":
+            value = (data[body] & 0x3) * 90  # 逆时针角度
+        elif btype == b"pixi":
+            channels = data[body + 4]
+            value = data[body + 5] if channels else None
+        elif btype == b"colr":
+            kind = bytes(data[body : body + 4])
+            if kind == b"nclx":
+                value = "nclx({}/{}/{})".format(
+                    *struct.unpack_from(">HHH", data, body + 4)
+                )
+            elif kind in (b"prof", b"rICC"):
+                value = f"ICC ({box_end - body - 4} B)"
+        props.append((btype.decode("ascii", "replace"), value))
+    return props
+
+
+# -------------------- Exif --------------------
+
+
+def _read_exif(data, boxes: dict, item_id: int) -> bytes | None:
+    """拼接 Exif 项的各个 extent，去掉 4 字节 TIFF 头偏移前缀"""
+    method, extents = boxes["locations"].get(item_id, (0, []))
+    if method == 1:  # 数据位于 idat 中
+        base = boxes.get("idat")
+        if base is None:
+            return None
+    elif method == 0:
+        base = 0
+    else:
+        return None
+
+    payload = bytearray()
+    for offset, length in extents:
+        start = base + offset
+        if length == 0 or start + length > len(data):  # 头部档位下可能未下载到
+            return None
+        payload += data[start : start + length]
+    if len(payload) < 4:
+        return None
+    tiff_offset = struct.unpack_from(">I", payload, 0)[0]
+    return bytes(payload[4 + tiff_offset :])
@@ -0,0 +1,262 @@
+import io
+import struct
+import xml.etree.ElementTree as ET
+
+# APP 段标识
+XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+PHOTOSHOP_HEADER = b"Photoshop 3.0\x00"
+ICC_HEADER = b"ICC_PROFILE\x00"
+
+# 不带长度字段的标记：TEM、RST0~7
+STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+SOS, EOI = 0xDA, 0xD9
+
+# -------------------- XMP --------------------
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RDF_LI = f"{{{RDF}}}li"
+RDF_DESCRIPTION = f"{{{RDF}}}Description"
+NS_XMP = "http://ns.adobe.com/xap/1.0/"
+NS_DC = "http://purl.org/dc/elements/1.1/"
+NS_PHOTOSHOP = "http://ns.adobe.com/photoshop/1.0/"
+NS_XMP_MM = "http://ns.adobe.com/xap/1.0/mm/"
+NS_ST_EVT = "http://ns.adobe.com/xap/1.0/sType/ResourceEvent#"
+NS_CRS = "http://ns.adobe.com/camera-raw-settings/1.0/"
+NS_LR = "http://ns.adobe.com/lightroom/1.0/"
+
+# 只提取这些字段：限定名 → 结果键名；其余元素解析后立即丢弃
+XMP_FIELDS = {
+    f"{{{NS_XMP}}}Rating": "rating",
+    f"{{{NS_XMP}}}CreatorTool": "creator_tool",
+    f"{{{NS_XMP}}}CreateDate": "create_date",
+    f"{{{NS_XMP}}}ModifyDate": "modify_date",
+    f"{{{NS_DC}}}title": "title",
+    f"{{{NS_DC}}}description": "description",
+    f"{{{NS_DC}}}creator": "creator",
+    f"{{{NS_DC}}}subject": "keywords",
+    f"{{{NS_DC}}}rights": "rights",
+    f"{{{NS_PHOTOSHOP}}}Headline": "headline",
+    f"{{{NS_PHOTOSHOP}}}City": "city",
+    f"{{{NS_PHOTOSHOP}}}Country": "country",
+    f"{{{NS_LR}}}hierarchicalSubject": "hierarchical_keywords",
+    f"{{{NS_CRS}}}ProcessVersion": "raw_process",
+    f"{{{NS_CRS}}}CameraProfile": "raw_profile",
+    f"{{{NS_CRS}}}WhiteBalance": "raw_white_balance",
+    f"{{{NS_CRS}}}Exposure2012": "raw_exposure",
+    f"{{{NS_XMP_MM}}}History": "history",
+}
+
+ST_EVT_ACTION = f"{{{NS_ST_EVT}}}action"
+ST_EVT_AGENT = f"{{{NS_ST_EVT}}}softwareAgent"
+ST_EVT_WHEN = f"{{{NS_ST_EVT}}}when"
+
+MAX_HISTORY = 10  # 编辑历史只保留最近几步
+
+# -------------------- IPTC --------------------
+
+PHOTOSHOP_IPTC = 0x0404  # Photoshop 图像资源中的 IPTC-NAA 记录
+
+# IPTC IIM 第 2 记录（应用记录）数据集编号 → 结果键名
+IPTC_FIELDS = {
+    5: "object_name",
+    25: "keywords",
+    80: "byline",
+    90: "city",
+    101: "country",
+    105: "headline",
+    116: "copyright",
+    120: "caption",
+}
+IPTC_REPEATABLE = {25}
+
+
+def scan_jpeg_segments(data: bytes | memoryview) -> dict[str, bytes]:
+    """
+    顺序遍历 JPEG 标记段，遇到 SOS 即停止，只需要文件头部；
+    收集 APP1 XMP、APP13 Photoshop 资源与按序号拼接的 APP2 ICC 分块
+    """
+    if data[:2] != b"\xff\xd8":
+        return {}
+
+    segments: dict[str, bytes] = {}
+    icc_chunks: dict[int, bytes] = {}
+    pos, size = 2, len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            break
+        marker = data[pos + 1]
+        if marker == 0xFF:  # 填充字节
+            pos += 1
+            continue
+        if marker in STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if marker in (SOS, EOI):
+            break
+
+        length = struct.unpack_from(">H", data, pos + 2)[0]
+        body, end = pos + 4, pos + 2 + length
+        if length < 2 or end > size:
+            break
+
+        if marker == 0xE1 and data[body : body + len(XMP_HEADER)] == XMP_HEADER:
+            segments.setdefault("xmp", bytes(data[body + len(XMP_HEADER) : end]))
+        elif marker == 0xED and data[body : body + 14] == PHOTOSHOP_HEADER:
+            segments["photoshop"] = bytes(data[body + 14 : end])
+        elif marker == 0xE2 and data[body : body + 12] == ICC_HEADER:
+            icc_chunks[data[body + 12]] = bytes(data[body + 14 : end])
+        pos = end
+
+    if icc_chunks:
+        segments["icc"] = b"".join(icc_chunks[i] for i in sorted(icc_chunks))
+    return segments
+
+
+def read_jpeg_metadata(data: bytes | memoryview) -> dict:
+    """XMP / IPTC / ICC 三类附加元数据，缺失的部分不出现在结果中"""
+    segments = scan_jpeg_segments(data)
+    result = {}
+    if (xmp := segments.get("xmp")) and (fields := parse_xmp(xmp)):
+        result["xmp"] = fields
+    if (ps := segments.get("photoshop")) and (fields := parse_iptc(ps)):
+        result["iptc"] = fields
+    if (icc := segments.get("icc")) and (fields := parse_icc(icc)):
+        result["icc"] = fields
+    return result
+
+
+# -------------------- XMP --------------------
+
+
+def parse_xmp(packet: bytes) -> dict:
+    """
+    iterparse 增量解析：元素结束时检查是否为目标字段，处理后立即 clear，
+    rdf:Description 上以属性形式写入的简单字段同样提取
+    """
+    result: dict = {}
+    try:
+        for _, elem in ET.iterparse(io.BytesIO(packet), events=("end",)):
+            if key := XMP_FIELDS.get(elem.tag):
+                if key == "history":
+                    result[key] = _xmp_history(elem)
+                else:
+                    result[key] = _xmp_value(elem)
+                elem.clear()
+            elif elem.tag == RDF_DESCRIPTION:
+                for name, value in elem.attrib.items():
+                    if key := XMP_FIELDS.get(name):
+                        result.setdefault(key, value)
+    except ET.ParseError:
+        pass  # 截断或带非法字符的包：保留已解析出的字段
+    return {k: v for k, v in result.items() if v}
+
+
+def _xmp_value(elem: ET.Element) -> str:
+    """简单值取文本；rdf:Alt / Seq / Bag 取各 rdf:li 并用逗号连接"""
+    items = [li.text.strip() for li in elem.iter(RDF_LI) if li.text and li.text.strip()]
+    if items:
+        return ", ".join(dict.fromkeys(items))
+    return (elem.text or "").strip()
+
+
+def _xmp_history(elem: ET.Element) -> list[str]:
+    """xmpMM:History 中的 stEvt 事件：属性或子元素两种写法都有"""
+    events = []
+    for li in elem.iter(RDF_LI):
+        fields = dict(li.attrib)
+        for child in li.iter():
+            fields.update(child.attrib)
+            if child.text and child.text.strip():
+                fields.setdefault(child.tag, child.text.strip())
+        if action := fields.get(ST_EVT_ACTION):
+            detail = ", ".join(
+                v for v in (fields.get(ST_EVT_AGENT), fields.get(ST_EVT_WHEN)) if v
+            )
+            events.append(f"{action} ({detail})" if detail else action)
+    return events[-MAX_HISTORY:]
+
+
+# -------------------- IPTC --------------------
+
+
+def parse_iptc(resources: bytes) -> dict:
+    """在 Photoshop 8BIM 资源块中找到 IPTC-NAA 记录，解析第 2 记录的常用数据集"""
+    pos, size = 0, len(resources)
+    while pos + 12 <= size and resources[pos : pos + 4] == b"8BIM":
+        resource_id = struct.unpack_from(">H", resources, pos + 4)[0]
+        name_len = resources[pos + 6]
+        pos += 6 + ((name_len + 2) & ~1)  # Pascal 字符串，含长度字节补齐到偶数
+        if pos + 4 > size:
+            break
+        length = struct.unpack_from(">I", resources, pos)[0]
+        pos += 4
+        if resource_id == PHOTOSHOP_IPTC:
+            return _parse_iim(resources[pos : pos + length])
+        pos += length + (length & 1)
+    return {}
+
+
+def _parse_iim(data: bytes) -> dict:
+    result: dict = {}
+    pos, size = 0, len(data)
+    while pos + 5 <= size and data[pos] == 0x1C:
+        record, dataset = data[pos + 1], data[pos + 2]
+        length = struct.unpack_from(">H", data, pos + 3)[0]
+        if length & 0x8000:  # 扩展长度数据集，这里不会用到，直接停止
+            break
+        value = data[pos + 5 : pos + 5 + length]
+        pos += 5 + length
+        if record != 2 or not (key := IPTC_FIELDS.get(dataset)):
+            continue
+        text = _decode_text(value)
+        if dataset in IPTC_REPEATABLE:
+            result.setdefault(key, []).append(text)
+        else:
+            result[key] = text
+    return {
+        k: ", ".join(v) if isinstance(v, list) else v for k, v in result.items() if v
+    }
+
+
+def _decode_text(value: bytes) -> str:
+    """IPTC 常未声明字符集，中文工具多写 UTF-8，失败时按 Latin-1"""
+    try:
+        return value.decode("utf-8").strip("\x00 ")
+    except UnicodeDecodeError:
+        return value.decode("latin-1").strip("\x00 ")
+
+
+# -------------------- ICC --------------------
+
+
+def parse_icc(profile: bytes) -> dict:
+    """ICC 头部的色彩空间 / 设备类别 / 版本，以及 desc 标签中的配置文件名"""
+    if len(profile) < 132:
+        return {}
+    result = {
+        "color_space": profile[16:20].decode("latin-1").strip(),
+        "device_class": profile[12:16].decode("latin-1").strip(),
+        "version": f"{profile[8]}.{profile[9] >> 4}",
+    }
+    count = struct.unpack_from(">I", profile, 128)[0]
+    for i in range(min(count, (len(profile) - 132) // 12)):
+        sig, offset, length = struct.unpack_from(">4sII", profile, 132 + i * 12)
+        if sig == b"desc":
+            if name := _icc_text(profile[offset : offset + length]):
+                result["profile"] = name
+            break
+    return result
+
+
+def _icc_text(tag: bytes) -> str | None:
+    """v2 的 desc 类型为 ASCII，v4 的 mluc 类型为 UTF-16BE，取第一条记录"""
+    try:
+        if tag[:4] == b"desc":
+            n = struct.unpack_from(">I", tag, 8)[0]
+            return tag[12 : 12 + n].decode("latin-1").strip("\x00 ")
+        if tag[:4] == b"mluc":
+            length, offset = struct.unpack_from(">II", tag, 20)
+            return tag[offset : offset + length].decode("utf-16-be").strip("\x00 ")
+    except (struct.error, UnicodeDecodeError):
+        pass
+    return None
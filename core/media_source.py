@@ -0,0 +1,133 @@
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from tempfile import NamedTemporaryFile
+
+from astrbot.api import logger
+
+
+class ViewReader(io.RawIOBase):
+    """
+    基于 memoryview 的只读可 seek 文件对象，每个读者独立维护位置
+    read() 返回 bytes 副本（PIL / mutagen 需要 bytes），只有 view 切片是零拷贝的
+    """
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos : self._pos + len(buffer)]
+        n = len(chunk)
+        buffer[:n] = chunk
+        self._pos += n
+        return n
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        chunk = self._view[self._pos : end]
+        self._pos += len(chunk)
+        return chunk.tobytes()
+
+
+class MediaSource:
+    """
+    媒体数据的统一载体：底层可以是 bytes、mmap 或落盘的临时文件
+    解析器通过 view（零拷贝切片）、reader()（可 seek 文件对象）或 path()（外部工具）访问
+    """
+
+    def __init__(
+        self,
+        buffer,
+        path: str | None = None,
+        owner: mmap.mmap | None = None,
+    ):
+        self.view = memoryview(buffer).cast("B")
+        self._path = path
+        self._owner = owner
+        self._tmp_path: str | None = None
+
+    # -------------------- 构造 --------------------
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray | memoryview) -> "MediaSource":
+        return cls(data)
+
+    @classmethod
+    def from_file(cls, path: str, delete: bool = False) -> "MediaSource | None":
+        """只读内存映射本地文件；delete=True 时关闭后删除（用于落盘的下载）"""
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:  # 空文件无法映射时抛 ValueError
+            logger.error(f"读取本地文件失败: {e}")
+            return None
+        source = cls(mapped, path=path, owner=mapped)
+        if delete:
+            source._tmp_path = path
+        return source
+
+    # -------------------- 访问 --------------------
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    @property
+    def file_path(self) -> str | None:
+        """底层文件路径（本地文件或落盘的下载），纯内存数据时为 None"""
+        return self._path
+
+    def head(self, n: int) -> bytes:
+        return self.view[:n].tobytes()
+
+    def reader(self) -> ViewReader:
+        return ViewReader(self.view)
+
+    @contextmanager
+    def path(self, suffix: str = ""):
+        """供 ffprobe / ffmpeg 使用的文件路径；已有文件时直接复用，否则写一次临时文件"""
+        if self._path:
+            yield self._path
+            return
+        if not self._tmp_path:
+            with NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                f.write(self.view)
+                self._tmp_path = f.name
+        yield self._tmp_path
+
+    # -------------------- 释放 --------------------
+
+    def close(self):
+        try:
+            self.view.release()
+            if self._owner is not None:
+                self._owner.close()
+        except BufferError:
+            pass  # 仍有 numpy 等视图引用时交给 GC 回收
+        if self._tmp_path:
+            os.remove(self._tmp_path)
+            self._tmp_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,171 @@
+import bisect
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from astrbot.api import logger
+
+# 直方图桶上界（毫秒），最后一个桶为 +Inf
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+EXPORT_INTERVAL = 10  # Prometheus 文本导出的最小间隔（秒）
+
+PREFETCH = "prefetch"  # 预解析的指标以此为前缀，单独统计，不计入用户请求
+
+
+class LatencyHistogram:
+    """固定桶延迟直方图，记录 O(log B)，分位数按桶内线性插值估算"""
+
+    __slots__ = ("counts", "total", "sum_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def record(self, ms: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def quantile(self, q: float) -> float:
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS_MS[i - 1] if i else 0
+                upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else BUCKETS_MS[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return float(BUCKETS_MS[-1])
+
+
+class Metrics:
+    """进程内解析指标：分阶段延迟、请求数、错误数、缓存命中"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.histograms: dict[tuple[str, str], LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+        self.requests: dict[str, int] = defaultdict(int)
+        self.errors: dict[tuple[str, str], int] = defaultdict(int)
+        self.cache: dict[str, list[int]] = defaultdict(lambda: [0, 0])  # [命中, 未命中]
+        self._last_export = 0.0
+
+    @contextmanager
+    def timer(self, media: str, stage: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(media, stage, (time.monotonic() - start) * 1000)
+
+    def observe(self, media: str, stage: str, ms: float):
+        self.histograms[(media, stage)].record(ms)
+
+    def count_request(self, media: str):
+        self.requests[media] += 1
+
+    def count_error(self, media: str, reason: str):
+        self.errors[(media, reason)] += 1
+
+    def count_cache(self, name: str, hit: bool):
+        self.cache[name][0 if hit else 1] += 1
+
+    # -------------------- 输出 --------------------
+
+    def report(self) -> str:
+        uptime = max(time.monotonic() - self.started, 1e-6)
+        total = sum(
+            count
+            for media, count in self.requests.items()
+            if not media.startswith(PREFETCH)
+        )
+        lines = [
+            "【解析统计】：",
+            f"运行时长: {uptime / 3600:.2f} h",
+            f"请求总数: {total}（{total / uptime * 60:.2f} 次/分钟，不含预解析）",
+        ]
+        for media, count in sorted(self.requests.items()):
+            lines.append(f"{media}: {count} 次")
+
+        if self.histograms:
+            lines.append("\n阶段延迟 p50/p95/p99 (ms):")
+            for (media, stage), h in sorted(self.histograms.items()):
+                lines.append(
+                    f"{media}.{stage}: {h.quantile(0.5):.1f} / "
+                    f"{h.quantile(0.95):.1f} / {h.quantile(0.99):.1f}"
+                    f"（{h.total} 次）"
+                )
+
+        if self.cache:
+            lines.append("\n缓存命中率:")
+            for name, (hit, miss) in sorted(self.cache.items()):
+                rate = hit / (hit + miss) if hit + miss else 0.0
+                lines.append(f"{name}: {rate:.1%}（{hit}/{hit + miss}）")
+
+        if self.errors:
+            lines.append("\n错误计数:")
+            for (media, reason), count in sorted(self.errors.items()):
+                lines.append(f"{media}.{reason}: {count}")
+
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# TYPE extract_stage_latency_ms histogram",
+        ]
+        for (media, stage), h in sorted(self.histograms.items()):
+            labels = f'media="{media}",stage="{stage}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS_MS, h.counts):
+                cumulative += count
+                bucket = f'{labels},le="{bound}"'
+                lines.append(
+                    f"extract_stage_latency_ms_bucket{{{bucket}}} {cumulative}"
+                )
+            lines.append(
+                f'extract_stage_latency_ms_bucket{{{labels},le="+Inf"}} {h.total}'
+            )
+            lines.append(f"extract_stage_latency_ms_sum{{{labels}}} {h.sum_ms:.3f}")
+            lines.append(f"extract_stage_latency_ms_count{{{labels}}} {h.total}")
+
+        lines.append("# TYPE extract_requests_total counter")
+        for media, count in sorted(self.requests.items()):
+            lines.append(f'extract_requests_total{{media="{media}"}} {count}')
+
+        lines.append("# TYPE extract_errors_total counter")
+        for (media, reason), count in sorted(self.errors.items()):
+            lines.append(
+                f'extract_errors_total{{media="{media}",reason="{reason}"}} {count}'
+            )
+
+        lines.append("# TYPE extract_cache_total counter")
+        for name, (hit, miss) in sorted(self.cache.items()):
+            lines.append(f'extract_cache_total{{cache="{name}",result="hit"}} {hit}')
+            lines.append(f'extract_cache_total{{cache="{name}",result="miss"}} {miss}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, force: bool = False):
+        """原子写入 Prometheus 文本文件（供 node_exporter textfile 采集）"""
+        if not path:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_export < EXPORT_INTERVAL:
+            return
+        self._last_export = now
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"导出解析指标失败: {e}")
+
+
+# 进程内全局指标
+metrics = Metrics()
@@ -0,0 +1,103 @@
+import math
+from io import BytesIO
+
+from PIL import Image
+
+HASH_SIZE = 8  # 8×8 → 64 bit
+PHASH_SIZE = 32  # pHash 先缩放到 32×32 再取 DCT 低频 8×8
+
+# EXIF IFD1 中内嵌 JPEG 缩略图的偏移与长度
+TAG_THUMB_OFFSET = 0x0201
+TAG_THUMB_LENGTH = 0x0202
+
+
+def compute_hash(img: Image.Image, algorithm: str = "dhash") -> int:
+    """对已打开的图片计算 64 位感知哈希，优先使用 EXIF 内嵌缩略图"""
+    src = _load_exif_thumbnail(img) or img
+    if src is img and img.format == "JPEG":
+        # JPEG 可在解码时直接按 1/8 缩放，避免全尺寸解码
+        img.draft("L", (PHASH_SIZE * 2, PHASH_SIZE * 2))
+
+    if algorithm == "ahash":
+        return _ahash(src)
+    if algorithm == "phash":
+        return _phash(src)
+    return _dhash(src)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+# -------------------- 内部工具 --------------------
+
+
+def _load_exif_thumbnail(img: Image.Image) -> Image.Image | None:
+    """从 APP1 原始数据中截取 IFD1 缩略图（仅 JPEG）"""
+    raw = img.info.get("exif")
+    if not raw:
+        return None
+    try:
+        ifd1 = img.getexif().get_ifd(-1)  # ExifTags.IFD.IFD1
+        offset, length = ifd1.get(TAG_THUMB_OFFSET), ifd1.get(TAG_THUMB_LENGTH)
+        if not offset or not length:
+            return None
+        base = 6 if raw.startswith(b"Exif\x00\x00") else 0
+        thumb = Image.open(BytesIO(raw[base + offset : base + offset + length]))
+        thumb.load()
+        return thumb
+    except Exception:
+        return None
+
+
+def _gray_pixels(img: Image.Image, w: int, h: int) -> list[int]:
+    small = img.convert("L").resize((w, h), Image.Resampling.LANCZOS)
+    return list(small.getdata())
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bool(bit)
+    return value
+
+
+def _ahash(img: Image.Image) -> int:
+    pixels = _gray_pixels(img, HASH_SIZE, HASH_SIZE)
+    avg = sum(pixels) / len(pixels)
+    return _bits_to_int(p > avg for p in pixels)
+
+
+def _dhash(img: Image.Image) -> int:
+    w = HASH_SIZE + 1
+    pixels = _gray_pixels(img, w, HASH_SIZE)
+    return _bits_to_int(
+        pixels[row * w + col] > pixels[row * w + col + 1]
+        for row in range(HASH_SIZE)
+        for col in range(HASH_SIZE)
+    )
+
+
+# DCT-II 系数表，只需要前 8 个频率
+_DCT_COS = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * PHASH_SIZE)) for x in range(PHASH_SIZE)]
+    for u in range(HASH_SIZE)
+]
+
+
+def _phash(img: Image.Image) -> int:
+    n = PHASH_SIZE
+    pixels = _gray_pixels(img, n, n)
+    rows = [pixels[i * n : (i + 1) * n] for i in range(n)]
+    # 先对每行做 DCT（只取低频），再对列做 DCT
+    row_dct = [
+        [sum(c * p for c, p in zip(cos, row)) for cos in _DCT_COS] for row in rows
+    ]
+    coeffs = [
+        sum(cos[y] * row_dct[y][u] for y in range(n))
+        for cos in _DCT_COS
+        for u in range(HASH_SIZE)
+    ]
+    # 去掉直流分量后取中位数
+    median = sorted(coeffs[1:])[len(coeffs[1:]) // 2]
+    return _bits_to_int(c > median for c in coeffs)
@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+from PIL import Image
+
+from .media_source import MediaSource
+
+PALETTE_SIZE = 5  # 主色数量
+PALETTE_BITS = 4  # 每通道量化位数（16 级）
+# reduce 前须先转换的模式：调色板 / 二值图的像素值不能平均，16 位整型 reduce 不支持
+UNREDUCIBLE_MODES = {"P", "PA", "1", "I;16", "I;16L", "I;16B", "I;16N"}
+
+
+def analyze_pixels(source: MediaSource, max_pixels: int = 1_000_000) -> dict | None:
+    """
+    像素统计：各通道亮度均值/标准差、主色调、清晰度（拉普拉斯方差）、透明区域占比
+    先按像素预算降采样解码，统计全部使用 NumPy 向量化计算
+    """
+    with Image.open(source.reader()) as img:
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        mode = "RGBA" if has_alpha else "RGB"
+        arr = np.asarray(_decode_within_budget(img, max_pixels, mode))
+
+    if arr.size == 0:
+        return None
+
+    rgb = arr[..., :3].astype(np.float32)
+    pixels = rgb.reshape(-1, 3)
+
+    result = {
+        "sample_size": (arr.shape[1], arr.shape[0]),
+        "mean": pixels.mean(axis=0).round(1).tolist(),
+        "std": pixels.std(axis=0).round(1).tolist(),
+        "palette": _dominant_colors(arr[..., :3].reshape(-1, 3)),
+        "sharpness": _laplacian_variance(rgb),
+    }
+    if has_alpha:
+        alpha = arr[..., 3]
+        result["alpha_coverage"] = round(float((alpha < 255).mean()), 4)
+    return result
+
+
+# -------------------- 内部工具 --------------------
+
+
+def _decode_within_budget(img: Image.Image, max_pixels: int, mode: str) -> Image.Image:
+    """
+    JPEG 先用 draft 在 DCT 阶段缩放，仍超预算时再用 reduce 整数倍缩小
+    先缩小再转换模式，避免对原尺寸图像做一次完整的模式转换拷贝
+    """
+    w, h = img.size
+    if w * h <= max_pixels:
+        return img.convert(mode)
+
+    if img.format == "JPEG":
+        scale = (max_pixels / (w * h)) ** 0.5
+        img.draft("RGB", (max(1, int(w * scale)), max(1, int(h * scale))))
+        w, h = img.size
+
+    factor = math.ceil((w * h / max_pixels) ** 0.5)
+    if factor > 1:
+        if img.mode in UNREDUCIBLE_MODES:
+            img = img.convert(mode)
+        img = img.reduce(factor)
+    return img.convert(mode)
+
+
+def _dominant_colors(rgb: np.ndarray) -> list[tuple[str, float]]:
+    """每通道量化到 16 级后做直方图，取出现最多的颜色"""
+    shift = 8 - PALETTE_BITS
+    q = (rgb >> shift).astype(np.int32)
+    keys = (q[:, 0] << (2 * PALETTE_BITS)) | (q[:, 1] << PALETTE_BITS) | q[:, 2]
+    counts = np.bincount(keys, minlength=1 << (3 * PALETTE_BITS))
+    top = np.argsort(counts)[::-1][:PALETTE_SIZE]
+
+    mask = (1 << PALETTE_BITS) - 1
+    half = 1 << (shift - 1)
+    total = keys.size
+    palette = []
+    for key in map(int, top):
+        if not counts[key]:
+            break
+        r = ((key >> (2 * PALETTE_BITS)) & mask) << shift | half
+        g = ((key >> PALETTE_BITS) & mask) << shift | half
+        b = (key & mask) << shift | half
+        palette.append((f"#{r:02x}{g:02x}{b:02x}", round(int(counts[key]) / total, 3)))
+    return palette
+
+
+def _laplacian_variance(rgb: np.ndarray) -> float:
+    """灰度图 4 邻域拉普拉斯响应的方差，越大越清晰"""
+    gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    if gray.shape[0] < 3 or gray.shape[1] < 3:
+        return 0.0
+    lap = (
+        gray[:-2, 1:-1]
+        + gray[2:, 1:-1]
+        + gray[1:-1, :-2]
+        + gray[1:-1, 2:]
+        - 4 * gray[1:-1, 1:-1]
+    )
+    return round(float(lap.var()), 2)
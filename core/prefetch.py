@@ -0,0 +1,143 @@
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+from astrbot.api import logger
+from astrbot.core.config.astrbot_config import AstrBotConfig
+
+from .admission import AdmissionController, TokenBucket
+from .metrics import PREFETCH, metrics
+from .reply import Reply
+from .result_cache import ResultCache
+from .utils import LocalResolver, get_content_length, is_local_path
+
+MB = 1024 * 1024
+
+# (路径或 URL, 参数, 群号) → (回复, 归档条目)
+ProcessFunc = Callable[[str, str, str], Awaitable[tuple[Reply, dict | None]]]
+# (路径或 URL, 参数, 群号) → 单飞的键，须与用户请求使用的键一致
+FlightKeyFunc = Callable[[str, str, str | None], tuple]
+
+
+class Prefetcher:
+    """
+    后台预解析：被动收到的媒体消息进入有界队列，由少量后台任务下载并解析，
+    结果写入结果缓存，之后的 /解析 可直接命中
+    优先级低于用户请求：有用户请求在处理、队列已满、超出每分钟下载量或解析耗时预算时直接丢弃
+    """
+
+    def __init__(
+        self,
+        config: AstrBotConfig,
+        admission: AdmissionController,
+        cache: ResultCache,
+        process: ProcessFunc,
+        flight_key: FlightKeyFunc,
+    ):
+        self.groups = {str(g) for g in config["prefetch_groups"]}
+        self.concurrency = max(1, config["prefetch_concurrency"])
+        self.max_bytes = config["prefetch_max_mb"] * MB
+        self.bandwidth = TokenBucket(config["prefetch_bandwidth_mb"] * MB)
+        self.cpu = TokenBucket(config["prefetch_cpu_seconds"])
+        self.queue: asyncio.Queue = asyncio.Queue(config["prefetch_queue_size"])
+        self.admission = admission
+        self.cache = cache
+        self.process = process
+        self.flight_key = flight_key
+        self.queued: set[str] = set()  # 已入队的媒体标识，同一媒体只预解析一次
+        self.workers: list[asyncio.Task] = []
+
+    def accepts(self, group_id: str | None) -> bool:
+        """白名单为空时对所有会话生效"""
+        return not self.groups or str(group_id or "") in self.groups
+
+    def submit(
+        self,
+        media: str,
+        url: str | None,
+        key: str,
+        group_id: str | None,
+        resolve: LocalResolver | None = None,
+    ):
+        """resolve 用于向协议端获取本地缓存路径，只在通过丢弃检查后才调用"""
+        if key in self.queued or (key, "") in self.cache:
+            return
+        try:
+            self.queue.put_nowait((media, url, key, group_id, resolve))
+        except asyncio.QueueFull:
+            metrics.count_error(PREFETCH, "queue_full")
+            return
+        self.queued.add(key)
+        if not self.workers:
+            self.workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+            ]
+
+    async def _worker(self):
+        while True:
+            media, url, key, group_id, resolve = await self.queue.get()
+            try:
+                await self._prefetch(media, url, key, group_id, resolve)
+            except Exception as e:
+                metrics.count_error(PREFETCH, "exception")
+                logger.debug(f"预解析失败: {e}")
+            finally:
+                self.queued.discard(key)
+
+    async def _prefetch(
+        self,
+        media: str,
+        url: str | None,
+        key: str,
+        group_id: str | None,
+        resolve: LocalResolver | None,
+    ):
+        if (key, "") in self.cache:
+            return
+        if reason := self._drop_reason(media):
+            metrics.count_error(PREFETCH, reason)
+            return
+        if resolve and (path := await resolve()):
+            url = path
+        if not url:
+            metrics.count_error(PREFETCH, "no_url")
+            return
+
+        # 大小未知或超过上限的不预解析，下载量计入每分钟带宽预算
+        local = is_local_path(url)
+        try:
+            size = os.path.getsize(url) if local else await get_content_length(url)
+        except OSError:
+            size = None
+        if size is None or size > self.max_bytes:
+            metrics.count_error(PREFETCH, "too_large")
+            return
+        if not local and self.bandwidth.try_acquire(size):
+            metrics.count_error(PREFETCH, "bandwidth")
+            return
+        if self.admission.busy(media):  # HEAD 期间可能有用户请求进入
+            metrics.count_error(PREFETCH, "busy")
+            return
+
+        # 与用户请求共用单飞：预解析进行中到达的 /解析 直接等待这次结果
+        start = time.monotonic()
+        (reply, entry), _ = await self.admission.flight.do(
+            self.flight_key(url, "", group_id), lambda: self.process(url, "", group_id)
+        )
+        self.cpu.consume(time.monotonic() - start)
+        if entry:
+            self.cache.put((key, ""), (reply, entry))
+
+    def _drop_reason(self, media: str) -> str | None:
+        if self.admission.busy(media):
+            return "busy"
+        if self.cpu.exhausted():
+            return "cpu_budget"
+        return None
+
+    async def close(self):
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
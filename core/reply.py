@@ -0,0 +1,71 @@
+from collections.abc import Callable
+
+PAGE_CHARS = 1500  # 单页（单个转发节点）字符上限
+MAX_PAGES = 10  # 完整信息最多分几页，超出部分省略
+
+
+class Reply:
+    """
+    解析回复：摘要在解析完成时生成，完整信息只保存渲染函数，
+    首次读取 detail 时才渲染并缓存结果，只发送摘要时不产生格式化开销
+    """
+
+    __slots__ = ("summary", "render", "_detail")
+
+    def __init__(self, summary: str, render: Callable[[], str | None] | None = None):
+        self.summary = summary
+        self.render = render
+        self._detail: str | None = None
+
+    @property
+    def has_detail(self) -> bool:
+        return self.render is not None
+
+    @property
+    def detail(self) -> str:
+        """完整信息；没有渲染函数时即为摘要"""
+        if self._detail is None:
+            self._detail = (self.render() if self.render else None) or self.summary
+        return self._detail
+
+
+def paginate(text: str, max_chars: int = PAGE_CHARS) -> list[str]:
+    """按行切分为不超过 max_chars 的若干页，单行过长时硬切"""
+    pages, current, size = [], [], 0
+    for line in text.splitlines():
+        if len(line) > max_chars:
+            if current:
+                pages.append("\n".join(current))
+                current, size = [], 0
+            while len(line) > max_chars:
+                pages.append(line[:max_chars])
+                line = line[max_chars:]
+        if current and size + len(line) + 1 > max_chars:
+            pages.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pages.append("\n".join(current))
+    if len(pages) > MAX_PAGES:
+        pages = pages[:MAX_PAGES]
+        pages[-1] += "\n……（内容过长，其余部分已省略）"
+    return pages
+
+
+def camera_lines(details: dict) -> list[str]:
+    """摘要中的设备 / 拍摄时间 / 坐标，图片与视频共用"""
+    lines = []
+    camera = details.get("camera") or {}
+    make, model, taken = (
+        str(camera.get(k) or "").strip("\x00 ") for k in ("make", "model", "datetime")
+    )
+    if make and model.lower().startswith(make.lower()):
+        make = ""  # 部分厂商的型号已包含品牌名
+    if device := " ".join(filter(None, (make, model))):
+        lines.append(f"设备: {device}")
+    if taken:
+        lines.append(f"拍摄时间: {taken}")
+    if coords := details.get("coordinates"):
+        lines.append(f"坐标: {coords[0]:.6f}, {coords[1]:.6f}")
+    return lines
@@ -0,0 +1,35 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class ResultCache:
+    """解析结果 LRU 缓存：键为 (媒体标识, 参数)，条目超过 ttl 秒后视为失效"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key) -> Any | None:
+        item = self.entries.get(key)
+        if item is None:
+            return None
+        stored, value = item
+        if time.monotonic() - stored > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
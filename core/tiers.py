@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+
+from astrbot.core.config.astrbot_config import AstrBotConfig
+
+MB = 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class Tier:
+    """解析档位：决定跳过哪些阶段以及整体耗时预算"""
+
+    name: str
+    label: str
+    budget: float  # 提取阶段的时间预算（秒）
+    skip_geo: bool = False  # 跳过 GPS 逆地理解析
+    skip_streams: bool = False  # 跳过完整流清单
+    skip_analysis: bool = False  # 跳过像素 / 响度 / 码流等重型分析
+    header_only: bool = False  # 只下载并解析头部数据
+
+
+class TierPolicy:
+    """按文件大小（Content-Length 或实际下载量）选择解析档位"""
+
+    def __init__(self, config: AstrBotConfig):
+        self.small_max = config["tier_small_max_mb"] * MB
+        self.medium_max = config["tier_medium_max_mb"] * MB
+        self.header_bytes = config["tier_header_kb"] * 1024
+        self.small = Tier("small", "完整", config["tier_small_budget"])
+        self.medium = Tier(
+            "medium",
+            "精简（跳过地理解析、完整流清单与重型分析）",
+            config["tier_medium_budget"],
+            skip_geo=True,
+            skip_streams=True,
+            skip_analysis=True,
+        )
+        self.huge = Tier(
+            "huge",
+            "仅头部（只读取文件头部元数据）",
+            config["tier_huge_budget"],
+            skip_geo=True,
+            skip_streams=True,
+            skip_analysis=True,
+            header_only=True,
+        )
+
+    def select(self, size: int | None) -> Tier | None:
+        """size 未知时返回 None，由调用方限量下载后再按实际大小判断"""
+        if size is None:
+            return None
+        if size <= self.small_max:
+            return self.small
+        if size <= self.medium_max:
+            return self.medium
+        return self.huge
@@ -1,5 +1,11 @@
-import aiohttp
+import os
+from collections.abc import Awaitable, Callable
+from functools import partial
+from tempfile import NamedTemporaryFile
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
+from urllib.request import url2pathname
 
+import aiohttp
 from astrbot import logger
 from astrbot.core.message.components import File, Image, Record, Reply, Video
 from astrbot.core.platform.astr_message_event import AstrMessageEvent
@@ -7,6 +13,10 @@ from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
     AiocqhttpMessageEvent,
 )
 
+from .media_source import MediaSource
+
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # 下载超过该大小时落盘
+
 
 def get_reply_id(event: AiocqhttpMessageEvent) -> int | None:
     """获取被引用消息的id"""
@@ -15,65 +25,277 @@ def get_reply_id(event: AiocqhttpMessageEvent) -> int | None:
             return int(seg.id)
 
 
-async def get_media(event: AstrMessageEvent) -> str | None:
-    """获取媒体文件"""
+# OneBot 消息段类型 → 获取本地缓存文件的动作
+# 语音不用 get_record：它要求 out_format 并返回转码后的文件，
+# 解析结果会变成转码产物的信息
+LOCAL_FILE_ACTIONS = {
+    "image": "get_image",
+    "record": "get_file",
+    "video": "get_file",
+    "file": "get_file",
+}
+
+
+def to_local_path(value, allowed_dirs: list[str] | None = None) -> str | None:
+    """
+    若 value 指向本机存在的文件（绝对路径或 file:// URI），返回其路径
+    路径来自消息段，不接受相对路径；allowed_dirs 非空时只接受这些目录下的文件，
+    按解析符号链接后的真实路径判断
+    """
+    if not value:
+        return None
+    path = str(value)
+    if path.startswith("file://"):
+        path = url2pathname(urlparse(path).path)
+    elif path.startswith(("http://", "https://", "base64://")):
+        return None
+    if not os.path.isabs(path) or not os.path.isfile(path):
+        return None
+    if allowed_dirs and not any(_is_within(path, d) for d in allowed_dirs):
+        logger.debug(f"本地文件不在允许的目录中: {path}")
+        return None
+    return path
+
+
+def _is_within(path: str, directory: str) -> bool:
+    real, root = os.path.realpath(path), os.path.realpath(directory)
+    try:
+        return os.path.commonpath([real, root]) == root
+    except ValueError:  # Windows 下不同盘符
+        return False
+
+
+def is_local_path(url: str) -> bool:
+    return not url.startswith(("http://", "https://"))
+
+
+# URL 中随时间变化的签名参数，不参与媒体标识
+VOLATILE_PARAMS = {"rkey"}
+
+
+def media_key(file, url) -> str | None:
+    """
+    媒体的稳定标识，用作结果缓存的键：OneBot 消息段的 file 字段（文件名 / 文件 id）
+    在原消息与引用消息中一致；没有时退回去掉签名参数的 URL
+    """
+    file = str(file or "")
+    if file and not file.startswith(("http://", "https://", "base64://")):
+        return file
+    url = str(url or file)
+    if not url.startswith(("http://", "https://")):
+        return None
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in VOLATILE_PARAMS]
+    return urlunsplit(("http", parts.netloc, parts.path, urlencode(query), ""))
+
+
+def _seg_local_path(seg, allowed_dirs: list[str] | None) -> str | None:
+    return to_local_path(getattr(seg, "path", None), allowed_dirs) or to_local_path(
+        getattr(seg, "file", None), allowed_dirs
+    )
+
+
+def _seg_url(seg) -> str | None:
+    url = (
+        getattr(seg, "url", None)
+        or getattr(seg, "file", None)
+        or getattr(seg, "path", None)
+    )
+    return url if url and str(url).startswith("http") else None
+
+
+def _seg_key(seg) -> str | None:
+    return media_key(getattr(seg, "file", None), getattr(seg, "url", None))
+
+
+async def _fetch_local_path(
+    event: AiocqhttpMessageEvent,
+    seg_type: str,
+    data: dict,
+    allowed_dirs: list[str] | None,
+) -> str | None:
+    """通过 get_image / get_file 让协议端返回本地缓存路径（原始文件，不转码）"""
+    if path := to_local_path(data.get("path"), allowed_dirs) or to_local_path(
+        data.get("file"), allowed_dirs
+    ):
+        return path
+    if seg_type not in LOCAL_FILE_ACTIONS or not data.get("file"):
+        return None
+    action = LOCAL_FILE_ACTIONS[seg_type]
+    try:
+        resp = await event.bot.api.call_action(action, file=data["file"])
+    except Exception as e:
+        logger.debug(f"{action} 获取本地文件失败: {e}")
+        return None
+    if not isinstance(resp, dict):
+        return None
+    return to_local_path(resp.get("file"), allowed_dirs)
+
+
+async def get_media(
+    event: AstrMessageEvent,
+    prefer_local: bool = True,
+    allowed_dirs: list[str] | None = None,
+) -> tuple[str | None, str | None]:
+    """
+    获取媒体文件：优先返回协议端本地缓存路径，其次为 HTTP URL
+    返回 (路径或 URL, 媒体标识)；allowed_dirs 限制可读取的本地目录
+    """
     Media = Image | Record | Video | File
     chain = event.get_messages()
-    url = None
-
-    def extract_media_url(seg):
-        url_ = (
-            getattr(seg, "url", None)
-            or getattr(seg, "file", None)
-            or getattr(seg, "path", None)
-        )
-        return url_ if url_ and str(url_).startswith("http") else None
 
-    # 遍历引用消息
+    # 引用消息中的媒体优先于本条消息中的媒体
     reply_seg = next((seg for seg in chain if isinstance(seg, Reply)), None)
-    if reply_seg and reply_seg.chain:
-        for seg in reply_seg.chain:
-            if isinstance(seg, Media):
-                url = extract_media_url(seg)
-
-    # 遍历原始消息
-    if url is None:
-        for seg in chain:
-            if isinstance(seg, Media):
-                url = extract_media_url(seg)
-
-    # 从原始的引用消息中获取
-    if url is None and isinstance(event, AiocqhttpMessageEvent):
+    candidates = [
+        seg
+        for seg in [*(reply_seg.chain if reply_seg and reply_seg.chain else []), *chain]
+        if isinstance(seg, Media)
+    ]
+
+    # 1. 消息段自带的本地路径
+    if prefer_local:
+        for seg in candidates:
+            if path := _seg_local_path(seg, allowed_dirs):
+                return path, _seg_key(seg)
+    else:
+        for seg in candidates:
+            if url := _seg_url(seg):
+                return url, _seg_key(seg)
+
+    # 2. 从原始的引用消息中获取（本地缓存路径 → URL）
+    raw_url = raw_key = None
+    if isinstance(event, AiocqhttpMessageEvent):
         if msg_id := get_reply_id(event):
             raw = await event.bot.get_msg(message_id=msg_id)
             messages = raw.get("message", [])
             for seg in messages:
-                if isinstance(seg, dict):
-                    if seg_url := seg.get("data", {}).get("url"):
-                        url = seg_url
+                if not isinstance(seg, dict):
+                    continue
+                data = seg.get("data", {})
+                key = media_key(data.get("file"), data.get("url"))
+                if prefer_local:
+                    seg_type = seg.get("type")
+                    path = await _fetch_local_path(event, seg_type, data, allowed_dirs)
+                    if path:
+                        return path, key
+                if seg_url := data.get("url"):
+                    raw_url, raw_key = seg_url, key
+
+    # 3. 消息段中的 HTTP URL
+    for seg in candidates:
+        if url := _seg_url(seg):
+            return url, _seg_key(seg)
+
+    return raw_url, raw_key
+
+
+# 可预解析的消息段 → (媒体大类, OneBot 消息段类型)
+# 延迟获取协议端本地缓存路径的函数
+LocalResolver = Callable[[], Awaitable[str | None]]
 
-    return url
+PREFETCH_SEGMENTS = {
+    Image: ("image", "image"),
+    Record: ("audio", "record"),
+    Video: ("video", "video"),
+}
 
-async def download_file(url: str) -> bytes | None:
-    """下载文件"""
+
+def get_message_media(
+    event: AstrMessageEvent,
+    prefer_local: bool = True,
+    allowed_dirs: list[str] | None = None,
+) -> list[tuple[str, str | None, str, LocalResolver | None]]:
+    """
+    本条消息自带的媒体（不含引用消息），
+    返回 [(媒体大类, 路径或 URL, 媒体标识, 本地路径解析)]
+    消息段里没有现成的本地路径时不立即调用协议端动作，而是返回一个解析函数，
+    由预解析在决定真正处理时再调用，避免协议端为随后被丢弃的媒体下载或转码
+    """
+    result = []
+    for seg in event.get_messages():
+        if (kind := PREFETCH_SEGMENTS.get(type(seg))) is None:
+            continue
+        if not (key := _seg_key(seg)):
+            continue
+        media, seg_type = kind
+        path = _seg_local_path(seg, allowed_dirs) if prefer_local else None
+        resolve = None
+        if prefer_local and not path and isinstance(event, AiocqhttpMessageEvent):
+            data = {"file": getattr(seg, "file", None)}
+            resolve = partial(_fetch_local_path, event, seg_type, data, allowed_dirs)
+        url = path or _seg_url(seg)
+        if url or resolve:
+            result.append((media, url, key, resolve))
+    return result
+
+
+async def download_file(url: str, max_bytes: int | None = None) -> MediaSource | None:
+    """
+    流式下载文件，指定 max_bytes 时只读取前 max_bytes 字节（优先使用 Range 请求）
+    小文件留在内存中，超过 SPOOL_MAX_SIZE 时落盘并以内存映射方式返回
+    """
     url = url.replace("https://", "http://")
+    headers = {"Range": f"bytes=0-{max_bytes - 1}"} if max_bytes else None
+    buf = bytearray()
+    spool = None
+    size = 0
     try:
         async with aiohttp.ClientSession() as client:
-            response = await client.get(url)
-            date = await response.read()
-            return date
+            async with client.get(url, headers=headers) as response:
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    if max_bytes:  # 服务端忽略 Range 时，读够即停
+                        chunk = chunk[: max_bytes - size]
+                    size += len(chunk)
+                    if spool:
+                        spool.write(chunk)
+                    else:
+                        buf += chunk
+                        if len(buf) > SPOOL_MAX_SIZE:
+                            spool = NamedTemporaryFile(delete=False)
+                            spool.write(buf)
+                            buf = bytearray()
+                    if max_bytes and size >= max_bytes:
+                        break
     except Exception as e:
         logger.error(f"下载失败: {e}")
+        if spool:
+            spool.close()
+            os.remove(spool.name)
+        return None
+
+    if spool:
+        spool.close()
+        source = MediaSource.from_file(spool.name, delete=True)
+        if source is None:  # 映射失败时临时文件无人接管，在这里删除
+            os.remove(spool.name)
+        return source
+    return MediaSource.from_bytes(buf) if buf else None
+
+
+async def get_content_length(url: str) -> int | None:
+    """通过 HEAD 请求获取文件大小，失败时返回 None"""
+    url = url.replace("https://", "http://")
+    try:
+        async with aiohttp.ClientSession() as client:
+            async with client.head(
+                url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status >= 400:
+                    return None
+                return response.content_length
+    except Exception as e:
+        logger.debug(f"获取文件大小失败: {e}")
+        return None
 
 
-def get_storage_size(img_bytes: bytes) -> str:
-    """字节大小转 KB/MB"""
+def get_storage_size(img_bytes: bytes | MediaSource | int) -> str:
+    """字节大小转 KB/MB，也可直接传入字节数"""
 
     if not img_bytes:
         logger.warning("无法获取图片大小（bytes为空）")
         return ""
 
-    size = len(img_bytes)
+    size = img_bytes if isinstance(img_bytes, int) else len(img_bytes)
 
     if size > 1024 * 1024:
         return f"{size / (1024 * 1024):.2f} MB"
@@ -0,0 +1,471 @@
+import struct
+
+import numpy as np
+
+# MP4 中需要递归进入的容器 box
+MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+# 需要读取的叶子 box
+MP4_TABLES = {b"hdlr", b"mdhd", b"stts", b"stsz", b"stss"}
+
+# Matroska 元素 ID
+MKV_SEGMENT = 0x18538067
+MKV_SEEK_HEAD = 0x114D9B74
+MKV_SEEK = 0x4DBB
+MKV_SEEK_ID = 0x53AB
+MKV_SEEK_POSITION = 0x53AC
+MKV_INFO = 0x1549A966
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_TRACKS = 0x1654AE6B
+MKV_TRACK_ENTRY = 0xAE
+MKV_TRACK_NUMBER = 0xD7
+MKV_TRACK_TYPE = 0x83
+MKV_CLUSTER = 0x1F43B675
+MKV_CLUSTER_TIMECODE = 0xE7
+MKV_SIMPLE_BLOCK = 0xA3
+MKV_BLOCK_GROUP = 0xA0
+MKV_BLOCK = 0xA1
+MKV_REFERENCE_BLOCK = 0xFB
+MKV_CUES = 0x1C53BB6B
+MKV_CUE_POINT = 0xBB
+MKV_CUE_TIME = 0xB3
+MKV_CUE_TRACK_POSITIONS = 0xB7
+MKV_CUE_TRACK = 0xF7
+MKV_CUE_CLUSTER_POSITION = 0xF1
+# 未知大小的 Cluster 遇到这些一级元素即结束
+MKV_TOP_LEVEL = {
+    MKV_CLUSTER,
+    MKV_CUES,
+    MKV_INFO,
+    MKV_TRACKS,
+    MKV_SEEK_HEAD,
+    0x1043A770,  # Chapters
+    0x1254C367,  # Tags
+    0x1941A469,  # Attachments
+}
+
+BLOCK_DTYPE = [("track", "i8"), ("t", "f8"), ("size", "i8"), ("key", "?")]
+
+VFR_TOLERANCE = 0.01  # 帧间隔相对波动超过 1% 视为可变帧率
+
+
+class SampleTable:
+    """
+    单条轨道的紧凑样本表：解码时间（秒）、大小（字节）、关键帧标记，
+    以及时间戳的最小刻度（秒），时间戳取整到刻度会带来最多 1 个刻度的抖动
+    """
+
+    def __init__(
+        self,
+        times: np.ndarray,
+        sizes: np.ndarray,
+        keyframes: np.ndarray,
+        tick: float = 0.0,
+    ):
+        self.times = times
+        self.sizes = sizes
+        self.keyframes = keyframes
+        self.tick = tick
+
+
+def analyze_video(data: bytes | memoryview) -> dict | None:
+    """直接读取容器样本表 / 块头计算 GOP、码率曲线与 VFR，不解码任何帧"""
+    try:
+        if b"ftyp" in bytes(data[:16]):
+            tracks = _read_mp4_tables(data)
+        elif data[:4] == b"\x1a\x45\xdf\xa3":
+            tracks = _read_mkv_tables(data)
+        else:
+            return None
+    except (struct.error, IndexError, ValueError):
+        return None
+
+    video = tracks.get("video")
+    if not video or len(video.times) < 2:
+        return None
+    all_tracks = tracks.get("all") or [video]
+    return _summarize(video, all_tracks, tracks.get("index_only", False))
+
+
+# -------------------- 统计 --------------------
+
+
+def _summarize(
+    video: SampleTable, all_tracks: list[SampleTable], index_only: bool = False
+) -> dict:
+    """index_only=True 时 video 只含索引中的关键帧，不统计总帧数、GOP 与 VFR"""
+    if index_only:
+        interval = np.diff(video.times)
+        return {
+            "keyframes": len(video.times),
+            "keyframe_interval": round(float(interval.mean()), 2),
+            "bitrate": _bitrate(all_tracks),
+        }
+
+    result: dict = {"frames": len(video.times)}
+
+    # GOP / 关键帧间隔
+    key_idx = np.flatnonzero(video.keyframes)
+    result["keyframes"] = len(key_idx)
+    if len(key_idx) > 1:
+        gop = np.diff(key_idx)
+        interval = np.diff(video.times[key_idx])
+        result["gop"] = {
+            "min": int(gop.min()),
+            "max": int(gop.max()),
+            "avg": round(float(gop.mean()), 1),
+        }
+        result["keyframe_interval"] = round(float(interval.mean()), 2)
+    elif len(key_idx) == 1:
+        n = len(video.times)
+        result["gop"] = {"min": n, "max": n, "avg": n}
+
+    result["bitrate"] = _bitrate(all_tracks)
+
+    # 可变帧率检测（忽略最后一帧的时长）
+    deltas = np.diff(video.times)
+    deltas = deltas[deltas > 0]
+    if len(deltas):
+        median = float(np.median(deltas))
+        spread = float(deltas.max() - deltas.min())
+        # 例如 1ms 刻度下 30fps 的帧间隔为 33/34ms 交替，仍属恒定帧率
+        allowed = max(median * VFR_TOLERANCE, video.tick * 1.001)
+        result["vfr"] = spread > allowed
+    return result
+
+
+def _bitrate(all_tracks: list[SampleTable]) -> dict:
+    """按秒汇总所有轨道的数据量"""
+    last = max(float(t.times.max()) for t in all_tracks if len(t.times))
+    seconds = int(last) + 1
+    per_second = np.zeros(seconds, dtype=np.float64)
+    for t in all_tracks:
+        if len(t.times):
+            bins = np.clip(t.times.astype(np.int64), 0, seconds - 1)
+            per_second += np.bincount(bins, weights=t.sizes, minlength=seconds)
+    kbps = per_second * 8 / 1000
+    return {
+        "avg": round(float(kbps.mean()), 1),
+        "peak": round(float(kbps.max()), 1),
+        "peak_at": int(kbps.argmax()),
+    }
+
+
+# -------------------- MP4 --------------------
+
+
+def iter_boxes(data: bytes, start: int, end: int):
+    """遍历 ISO-BMFF box，产出 (类型, 数据起点, 结束位置)；HEIF 解析也复用此函数"""
+    pos = start
+    while pos + 8 <= end:
+        size, btype = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield btype, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _read_mp4_tables(data: bytes) -> dict:
+    tracks: list[tuple[bytes, SampleTable]] = []
+
+    def walk(start: int, end: int, trak: dict | None):
+        for btype, body, box_end in iter_boxes(data, start, end):
+            if btype == b"trak":
+                info: dict = {}
+                walk(body, box_end, info)
+                if table := _mp4_track_table(data, info):
+                    tracks.append((info.get("handler", b""), table))
+            elif btype in MP4_CONTAINERS:
+                walk(body, box_end, trak)
+            elif trak is not None and btype in MP4_TABLES:
+                trak[btype.decode()] = body
+                if btype == b"hdlr":
+                    trak["handler"] = data[body + 8 : body + 12]
+
+    walk(0, len(data), None)
+    video = next((t for h, t in tracks if h == b"vide"), None)
+    return {"video": video, "all": [t for _, t in tracks]}
+
+
+def _mp4_track_table(data: bytes, info: dict) -> SampleTable | None:
+    if not {"mdhd", "stts", "stsz"} <= info.keys():
+        return None
+
+    mdhd = info["mdhd"]
+    timescale_pos = mdhd + (20 if data[mdhd] == 1 else 12)
+    timescale = struct.unpack_from(">I", data, timescale_pos)[0] or 1
+
+    # stts: (count, delta) 游程 → 每个样本的解码时间
+    stts = info["stts"]
+    n_entries = struct.unpack_from(">I", data, stts + 4)[0]
+    runs = np.frombuffer(data, dtype=">u4", count=n_entries * 2, offset=stts + 8)
+    runs = runs.reshape(-1, 2).astype(np.int64)
+    deltas = np.repeat(runs[:, 1], runs[:, 0])
+    times = np.concatenate(([0], np.cumsum(deltas)[:-1])) / timescale
+
+    # stsz: 固定大小或逐样本大小
+    stsz = info["stsz"]
+    fixed, count = struct.unpack_from(">II", data, stsz + 4)
+    if fixed:
+        sizes = np.full(count, fixed, dtype=np.int64)
+    else:
+        sizes = np.frombuffer(data, dtype=">u4", count=count, offset=stsz + 12)
+        sizes = sizes.astype(np.int64)
+
+    n = min(len(times), len(sizes))
+    keyframes = np.ones(n, dtype=bool)
+    if stss := info.get("stss"):
+        k_count = struct.unpack_from(">I", data, stss + 4)[0]
+        numbers = np.frombuffer(data, dtype=">u4", count=k_count, offset=stss + 8)
+        keyframes[:] = False
+        idx = numbers.astype(np.int64) - 1
+        keyframes[idx[(idx >= 0) & (idx < n)]] = True
+
+    return SampleTable(times[:n], sizes[:n], keyframes, 1 / timescale)
+
+
+# -------------------- Matroska --------------------
+
+
+def _read_vint(data: bytes, pos: int, strip: bool) -> tuple[int, int]:
+    """读取 EBML 变长整数，返回 (值, 长度)；strip=True 时去掉长度标记位"""
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("invalid EBML vint")
+    value = first & (mask - 1) if strip else first
+    for i in range(1, length):
+        value = (value << 8) | data[pos + i]
+    if strip and value == (1 << (7 * length)) - 1:
+        value = -1  # 未知大小
+    return value, length
+
+
+def _iter_elements(data: bytes, start: int, end: int):
+    pos = start
+    while pos < end:
+        eid, id_len = _read_vint(data, pos, strip=False)
+        size, size_len = _read_vint(data, pos + id_len, strip=True)
+        body = pos + id_len + size_len
+        elem_end = end if size < 0 else min(body + size, end)
+        yield eid, body, elem_end, size < 0
+        pos = elem_end
+
+
+def _read_uint(data: bytes, start: int, end: int) -> int:
+    return int.from_bytes(data[start:end], "big")
+
+
+def _read_mkv_tables(data: bytes) -> dict:
+    segment = next(
+        (
+            (body, end)
+            for eid, body, end, _ in _iter_elements(data, 0, len(data))
+            if eid == MKV_SEGMENT
+        ),
+        None,
+    )
+    if not segment:
+        return {}
+
+    scale = 1_000_000  # TimecodeScale 默认 1ms
+    duration = 0.0  # 以 TimecodeScale 为单位
+    track_types: dict[int, int] = {}
+    blocks: list[tuple[int, float, int, bool]] = []  # (轨道, 秒, 大小, 关键帧)
+    cues_pos = None
+
+    seg_start, seg_end = segment
+    pos = seg_start
+    while pos < seg_end:
+        eid, body, end, unknown = next(_iter_elements(data, pos, seg_end))
+        if eid == MKV_SEEK_HEAD:
+            cues_pos = _read_seek_head(data, body, end, seg_start, cues_pos)
+        elif eid == MKV_CUES:
+            cues_pos = pos
+        elif eid == MKV_INFO:
+            for cid, cb, ce, _ in _iter_elements(data, body, end):
+                if cid == MKV_TIMECODE_SCALE:
+                    scale = _read_uint(data, cb, ce)
+                elif cid == MKV_DURATION and ce - cb in (4, 8):
+                    fmt = ">f" if ce - cb == 4 else ">d"
+                    duration = struct.unpack_from(fmt, data, cb)[0]
+        elif eid == MKV_TRACKS:
+            for cid, cb, ce, _ in _iter_elements(data, body, end):
+                if cid == MKV_TRACK_ENTRY:
+                    entry = {
+                        tid: _read_uint(data, tb, te)
+                        for tid, tb, te, _ in _iter_elements(data, cb, ce)
+                        if tid in (MKV_TRACK_NUMBER, MKV_TRACK_TYPE)
+                    }
+                    if MKV_TRACK_NUMBER in entry:
+                        number = entry[MKV_TRACK_NUMBER]
+                        track_types[number] = entry.get(MKV_TRACK_TYPE, 0)
+        elif eid == MKV_CLUSTER:
+            if cues_pos is not None:
+                # 有 Cues 索引时直接读索引，不再逐块遍历 Cluster
+                cues = _read_mkv_cues(data, cues_pos, segment, scale, duration)
+                tables = _cue_tables(cues, track_types, scale)
+                if tables:
+                    return tables
+                cues_pos = None
+            end = _read_cluster(data, body, end, unknown, scale, blocks)
+        pos = end
+
+    if not blocks:
+        return {}
+    arr = np.array(blocks, dtype=BLOCK_DTYPE)
+    tables = {}
+    for track in np.unique(arr["track"]):
+        sub = arr[arr["track"] == track]
+        sub = sub[np.argsort(sub["t"], kind="stable")]
+        tick = scale / 1e9
+        tables[int(track)] = SampleTable(sub["t"], sub["size"], sub["key"], tick)
+
+    video_track = next((n for n, t in track_types.items() if t == 1), None)
+    return {"video": tables.get(video_track), "all": list(tables.values())}
+
+
+def _read_seek_head(
+    data: bytes, start: int, end: int, seg_start: int, default: int | None
+) -> int | None:
+    """从 SeekHead 中查找 Cues 的位置（相对 Segment 数据起点）"""
+    for cid, cb, ce, _ in _iter_elements(data, start, end):
+        if cid != MKV_SEEK:
+            continue
+        entry = dict.fromkeys((MKV_SEEK_ID, MKV_SEEK_POSITION), -1)
+        for sid, sb, se, _ in _iter_elements(data, cb, ce):
+            if sid in entry:
+                entry[sid] = _read_uint(data, sb, se)
+        if entry[MKV_SEEK_ID] == MKV_CUES and entry[MKV_SEEK_POSITION] >= 0:
+            return seg_start + entry[MKV_SEEK_POSITION]
+    return default
+
+
+def _read_mkv_cues(
+    data: bytes, pos: int, segment: tuple[int, int], scale: int, duration: float
+) -> dict | None:
+    """
+    读取 Cues：每个 CuePoint 的时间与各轨道所在 Cluster 的位置，
+    并确定最后一个 Cluster 的结束位置与总时长；Cues 不在数据范围内时返回 None
+    """
+    seg_start, seg_end = segment
+    if pos >= seg_end:
+        return None
+    eid, body, end, _ = next(_iter_elements(data, pos, seg_end))
+    if eid != MKV_CUES:
+        return None
+
+    points: list[tuple[int, int, int]] = []  # (轨道, 时间码, Cluster 位置)
+    for cid, cb, ce, _ in _iter_elements(data, body, end):
+        if cid != MKV_CUE_POINT:
+            continue
+        cue_time = None
+        positions = []
+        for pid, pb, pe, _ in _iter_elements(data, cb, ce):
+            if pid == MKV_CUE_TIME:
+                cue_time = _read_uint(data, pb, pe)
+            elif pid == MKV_CUE_TRACK_POSITIONS:
+                fields = {
+                    fid: _read_uint(data, fb, fe)
+                    for fid, fb, fe, _ in _iter_elements(data, pb, pe)
+                    if fid in (MKV_CUE_TRACK, MKV_CUE_CLUSTER_POSITION)
+                }
+                if len(fields) == 2:
+                    positions.append(fields)
+        if cue_time is not None:
+            points.extend(
+                (f[MKV_CUE_TRACK], cue_time, f[MKV_CUE_CLUSTER_POSITION])
+                for f in positions
+            )
+
+    if not points:
+        return None
+    # Cues 位于 Cluster 之后时，最后一个 Cluster 到 Cues 为止，否则到 Segment 末尾
+    last_cluster = max(p[2] for p in points)
+    cues_at = pos - seg_start
+    return {
+        "points": points,
+        "end": cues_at if cues_at > last_cluster else seg_end - seg_start,
+        "duration": duration * scale / 1e9,
+    }
+
+
+def _cue_tables(cues: dict | None, track_types: dict, scale: int) -> dict:
+    """
+    由 Cues 构造样本表：视频轨道的 CuePoint 即关键帧；
+    相邻 Cluster 起点之差是该时间段内所有轨道的数据量，按时间均匀摊到每秒
+    """
+    video_track = next((n for n, t in track_types.items() if t == 1), None)
+    if not cues or video_track is None:
+        return {}
+    points = np.array(
+        [(t, p) for track, t, p in cues["points"] if track == video_track],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    points = points[np.argsort(points[:, 0], kind="stable")]
+    # 同一时间码只保留一个点；Cluster 位置须随时间单调递增，否则索引不可信
+    points = points[np.unique(points[:, 0], return_index=True)[1]]
+    if len(points) < 2 or np.any(np.diff(points[:, 1]) < 0):
+        return {}
+
+    times = points[:, 0] * scale / 1e9
+    positions = points[:, 1]
+    # 最后一段的时长取 Duration，缺失时按平均关键帧间隔估计
+    end_t = max(cues["duration"], times[-1] + (times[-1] - times[0]) / (len(times) - 1))
+    edges = np.append(times, end_t)
+    cum_bytes = np.append(positions, max(cues["end"], positions[-1])) - positions[0]
+    grid = np.arange(int(np.ceil(end_t)) + 1, dtype=np.float64)
+    per_second = np.diff(np.interp(grid, edges, cum_bytes))
+
+    seconds = grid[:-1]
+    keys = np.ones(len(times), dtype=bool)
+    video = SampleTable(times, np.zeros(len(times), dtype=np.int64), keys, scale / 1e9)
+    traffic = SampleTable(seconds, per_second, np.zeros(len(seconds), dtype=bool))
+    return {"video": video, "all": [traffic], "index_only": True}
+
+
+def _read_cluster(
+    data: bytes, start: int, end: int, unknown: bool, scale: int, blocks: list
+) -> int:
+    """
+    只读块头（轨道号、相对时间码、标志位），按大小跳过帧数据；
+    返回 Cluster 结束位置
+    """
+    cluster_tc = 0
+    pos = start
+    while pos < end:
+        eid, body, elem_end, _ = next(_iter_elements(data, pos, end))
+        if unknown and eid in MKV_TOP_LEVEL:
+            return pos
+        if eid == MKV_CLUSTER_TIMECODE:
+            cluster_tc = _read_uint(data, body, elem_end)
+        elif eid == MKV_SIMPLE_BLOCK:
+            track, n = _read_vint(data, body, strip=True)
+            rel, flags = struct.unpack_from(">hB", data, body + n)
+            t = (cluster_tc + rel) * scale / 1e9
+            blocks.append((track, t, elem_end - body, bool(flags & 0x80)))
+        elif eid == MKV_BLOCK_GROUP:
+            key = True
+            block = None
+            for cid, cb, ce, _ in _iter_elements(data, body, elem_end):
+                if cid == MKV_BLOCK:
+                    block = (cb, ce)
+                elif cid == MKV_REFERENCE_BLOCK:
+                    key = False
+            if block:
+                track, n = _read_vint(data, block[0], strip=True)
+                rel = struct.unpack_from(">h", data, block[0] + n)[0]
+                t = (cluster_tc + rel) * scale / 1e9
+                blocks.append((track, t, block[1] - block[0], key))
+        pos = elem_end
+    return end
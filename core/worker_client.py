@@ -0,0 +1,63 @@
+import asyncio
+from dataclasses import asdict
+
+from .file_type import FileExt
+from .media_source import MediaSource
+from .tiers import Tier
+from .worker_protocol import (
+    ERROR,
+    REQUEST,
+    RESULT,
+    WorkerError,
+    read_frame,
+    write_frame,
+)
+
+
+class WorkerClient:
+    """
+    共享解析进程的客户端：每个请求一条 Unix 套接字连接
+    文件已落盘时只发送路径，由解析进程自行映射；否则把数据作为帧体发送
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+
+    async def extract(
+        self,
+        media: str,
+        source: MediaSource,
+        ext: FileExt,
+        mode: str,
+        group_id: str | None,
+        tier: Tier,
+    ) -> tuple[dict | None, bool]:
+        """
+        返回 (结构化结果, 是否命中解析进程的结果缓存)
+        解析进程不可用或连接中断时抛 ConnectionError / OSError，由调用方回退到本地解析；
+        提取本身失败时抛 WorkerError
+        """
+        request = {
+            "media": media,
+            "ext": ext.value,
+            "mode": mode,
+            "group_id": group_id,
+            "tier": asdict(tier),
+            "path": source.file_path,
+        }
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            body = b"" if source.file_path else source.view
+            await write_frame(writer, REQUEST, request, body)
+            kind, meta, _ = await read_frame(reader)
+        except asyncio.IncompleteReadError as e:
+            raise ConnectionError("解析进程提前关闭了连接") from e
+        finally:
+            writer.close()
+        if kind == ERROR:
+            if meta["retry"]:
+                raise ConnectionError(f"解析进程无法处理: {meta['message']}")
+            raise WorkerError(meta["message"])
+        if kind != RESULT:
+            raise ConnectionError(f"未知的帧类型: {kind}")
+        return meta["details"], meta["cached"]
@@ -0,0 +1,239 @@
+"""
+共享解析进程：同一主机上的多个 AstrBot 实例把解析任务交给它统一执行
+
+    cd <插件目录>
+    python -m core.worker_daemon \
+        --socket /run/astrbot/extract.sock --data-dir <数据目录>
+
+各实例在插件配置 worker_socket 中填写同一路径即可；
+解析进程不可用时插件自动回退到本地解析
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import stat
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from astrbot.api import logger
+
+from .admission import AdmissionController
+from .archive import content_hash
+from .extractor import AudioExtractor, Extractors, ImageExtractor, VideoExtractor
+from .file_type import FileExt
+from .geo_resolver import GeoResolver
+from .hash_index import ImageHashIndex
+from .media_source import MediaSource
+from .result_cache import ResultCache
+from .tiers import Tier
+from .worker_protocol import ERROR, REQUEST, RESULT, read_frame, write_frame
+
+PLUGIN_DIR = Path(__file__).resolve().parents[1]
+
+# -------------------- 工作进程 --------------------
+
+_loop: asyncio.AbstractEventLoop | None = None
+_extractors: Extractors | None = None
+
+
+def _init_worker(config: dict, data_dir: str):
+    """每个工作进程常驻一个事件循环与一套提取器，地理解析会话与哈希库跨任务复用"""
+    global _loop, _extractors
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+    async def build() -> Extractors:
+        hash_index = (
+            ImageHashIndex(Path(data_dir) / "image_hash.db", config["phash_threshold"])
+            if config["enable_phash"]
+            else None
+        )
+        return Extractors(
+            ImageExtractor(config, GeoResolver(config), hash_index),
+            AudioExtractor(config),
+            VideoExtractor(config),
+        )
+
+    _extractors = _loop.run_until_complete(build())
+
+
+def _run_job(request: dict, data: bytes) -> dict | None:
+    """已落盘的文件直接只读映射，否则使用随请求发来的数据"""
+    if path := request["path"]:
+        source = MediaSource.from_file(path)
+        if source is None:
+            raise OSError(f"无法读取文件: {path}")
+    else:
+        source = MediaSource.from_bytes(data)
+    with source:
+        return _loop.run_until_complete(
+            _extractors.extract(
+                request["media"],
+                source,
+                FileExt(request["ext"]),
+                request["mode"],
+                request["group_id"],
+                Tier(**request["tier"]),
+            )
+        )
+
+
+# -------------------- 服务端 --------------------
+
+
+class WorkerDaemon:
+    """
+    Unix 套接字服务：工作进程池执行解析，全局按媒体类型限流，
+    结果按内容哈希缓存，不同实例、不同 URL 的同一文件只解析一次
+    """
+
+    def __init__(self, config: dict, data_dir: Path, workers: int):
+        self.config = config
+        self.admission = AdmissionController(config)
+        self.cache = ResultCache(
+            config["result_cache_size"], config["result_cache_ttl"] * 60
+        )
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config, str(data_dir)),
+        )
+
+    async def serve(self, socket_path: str):
+        if os.path.lexists(socket_path):
+            if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+                raise SystemExit(f"{socket_path} 已存在且不是套接字")
+            if await _is_listening(socket_path):
+                raise SystemExit(f"已有解析进程在监听 {socket_path}")
+            os.remove(socket_path)  # 上次异常退出残留的套接字文件
+
+        # 在受限 umask 下创建，套接字文件一出现就是 0600，不存在权限放宽的窗口
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=socket_path)
+        finally:
+            os.umask(umask)
+        logger.info(f"解析进程已启动: {socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            kind, request, body = await read_frame(reader)
+            if kind != REQUEST:
+                raise ConnectionError(f"未知的帧类型: {kind}")
+            if (path := request["path"]) and not os.access(path, os.R_OK):
+                # 插件与解析进程的文件权限或挂载不同，告知插件改为本地解析
+                message = f"无法读取文件: {path}"
+                await write_frame(writer, ERROR, {"message": message, "retry": True})
+                return
+            start = time.monotonic()
+            details, cached = await self._extract(request, body)
+            logger.debug(
+                f"解析完成: {request['media']} {request['ext']}，"
+                f"{'缓存命中' if cached else f'耗时 {time.monotonic() - start:.2f}s'}"
+            )
+            await write_frame(writer, RESULT, {"details": details, "cached": cached})
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.debug(f"连接中断: {e}")
+        except Exception as e:
+            logger.error(f"解析失败: {e}")
+            # 进程池损坏属于解析进程自身的问题，可以回退；
+            # PIL 等对损坏文件抛的 OSError 不算
+            retry = isinstance(e, BrokenProcessPool)
+            try:
+                await write_frame(writer, ERROR, {"message": str(e), "retry": retry})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _extract(self, request: dict, body: bytes) -> tuple[dict | None, bool]:
+        """
+        同一内容 + 参数 + 档位的并发请求合并为一次，完成后写入结果缓存
+        开启重复检测时图片不缓存也不合并：每次出现都要按所在群查询并写入哈希库
+        """
+
+        async def run():
+            async with self.admission.slot(request["media"]):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.pool, _run_job, request, body)
+
+        if self.config["enable_phash"] and request["media"] == "image":
+            return await run(), False
+        digest = await asyncio.to_thread(self._digest, request["path"], body)
+        if not digest:
+            return await run(), False
+
+        key = (digest, request["media"], request["mode"], request["tier"]["name"])
+        if (details := self.cache.get(key)) is not None:
+            return details, True
+        details, shared = await self.admission.flight.do(key, run)
+        if details:
+            self.cache.put(key, details)
+        return details, shared
+
+    @staticmethod
+    def _digest(path: str | None, body: bytes) -> str | None:
+        """路径请求在这里映射一次文件计算哈希，读取失败时不缓存，交给工作进程报错"""
+        if not path:
+            return content_hash(MediaSource.from_bytes(body))
+        source = MediaSource.from_file(path)
+        if source is None:
+            return None
+        with source:
+            return content_hash(source)
+
+
+async def _is_listening(socket_path: str) -> bool:
+    try:
+        _, writer = await asyncio.open_unix_connection(socket_path)
+    except OSError:
+        return False
+    writer.close()
+    return True
+
+
+def load_config(path: str | None) -> dict:
+    """以 _conf_schema.json 的默认值为底，叠加插件的配置文件"""
+    schema = json.loads((PLUGIN_DIR / "_conf_schema.json").read_text("utf-8"))
+    config = {key: item["default"] for key, item in schema.items()}
+    if path:
+        config.update(json.loads(Path(path).read_text("utf-8-sig")))
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="astrbot_plugin_extract 共享解析进程")
+    parser.add_argument("--socket", required=True, help="Unix 套接字路径")
+    parser.add_argument("--config", help="插件配置文件（JSON），缺省使用默认配置")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument(
+        "--data-dir",
+        required=True,
+        help="数据目录，感知哈希库在此共享，一般填插件的数据目录",
+    )
+    args = parser.parse_args()
+
+    daemon = WorkerDaemon(
+        load_config(args.config), Path(args.data_dir), max(1, args.workers)
+    )
+    try:
+        asyncio.run(daemon.serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
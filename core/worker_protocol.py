@@ -0,0 +1,86 @@
+import asyncio
+import marshal
+import numbers
+import struct
+from dataclasses import fields, is_dataclass
+
+from .extractor import StreamInfo
+
+# 帧头：魔数、帧类型、元数据长度、数据长度（大端）
+HEADER = struct.Struct(">4sBII")
+MAGIC = b"EXTW"
+REQUEST, RESULT, ERROR = 1, 2, 3
+
+MAX_META = 16 * 1024 * 1024  # 元数据长度上限，超出视为损坏的帧
+
+# 可在线路上还原的数据类；插件与解析进程的模块路径不同，不使用 pickle
+WIRE_TYPES = {"StreamInfo": StreamInfo}
+
+
+class WorkerError(Exception):
+    """解析进程中的提取本身失败（文件损坏等），换到本地解析也会失败，不应回退"""
+
+
+def to_wire(obj):
+    """
+    结构化结果 → marshal 可序列化的内置类型：
+    数据类带上类型名，numpy 标量转 Python 数值，有理数（EXIF 的 IFDRational）转 float，
+    其余未知类型（含 str 的子类）转文本
+    """
+    # 按精确类型放行：float 等的子类（如 np.float64）会被 marshal 按缓冲区编码成 bytes
+    if obj is None or type(obj) in (str, bytes, bool, int, float):
+        return obj
+    if isinstance(obj, dict):
+        return {to_wire(k): to_wire(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [to_wire(v) for v in obj]
+    if isinstance(obj, tuple):  # 含 namedtuple
+        return tuple(to_wire(v) for v in obj)
+    if isinstance(obj, bytes | bytearray | memoryview):
+        return bytes(obj)
+    if is_dataclass(obj):
+        data = {f.name: to_wire(getattr(obj, f.name)) for f in fields(obj)}
+        return {"__type__": type(obj).__name__, **data}
+    if getattr(obj, "shape", None) == () and hasattr(obj, "item"):  # numpy 标量
+        return to_wire(obj.item())
+    if isinstance(obj, numbers.Integral):  # IntEnum 等
+        return int(obj)
+    if isinstance(obj, numbers.Real):
+        return float(obj)
+    return str(obj)
+
+
+def from_wire(obj):
+    if isinstance(obj, dict):
+        data = {k: from_wire(v) for k, v in obj.items()}
+        if cls := WIRE_TYPES.get(data.pop("__type__", None)):
+            return cls(**data)
+        return data
+    if isinstance(obj, list):
+        return [from_wire(v) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(from_wire(v) for v in obj)
+    return obj
+
+
+async def write_frame(
+    writer: asyncio.StreamWriter, kind: int, meta, body: bytes | memoryview = b""
+):
+    """元数据用 marshal 编码，媒体数据作为帧体原样发送，不做额外编码"""
+    data = marshal.dumps(to_wire(meta), 4)
+    writer.write(HEADER.pack(MAGIC, kind, len(data), len(body)) + data)
+    if body:
+        writer.write(body)
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, object, bytes]:
+    """返回 (帧类型, 元数据, 帧体)；连接提前关闭时抛 IncompleteReadError"""
+    magic, kind, meta_len, body_len = HEADER.unpack(
+        await reader.readexactly(HEADER.size)
+    )
+    if magic != MAGIC or meta_len > MAX_META:
+        raise ConnectionError("无效的帧头")
+    meta = from_wire(marshal.loads(await reader.readexactly(meta_len)))
+    body = await reader.readexactly(body_len) if body_len else b""
+    return kind, meta, body
@@ -1,16 +1,44 @@
+import asyncio
+import os
+import time
+
 from astrbot.api import logger
 from astrbot.api.event import filter
-from astrbot.api.star import Context, Star
+from astrbot.api.message_components import Node, Nodes, Plain
+from astrbot.api.star import Context, Star, StarTools
 from astrbot.core.config.astrbot_config import AstrBotConfig
 from astrbot.core.platform.astr_message_event import AstrMessageEvent
 from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
     AiocqhttpMessageEvent,
 )
 
-from .core.extractor import AudioExtractor, ImageExtractor, VideoExtractor
+from .core.admission import AdmissionController
+from .core.archive import MetadataArchive, content_hash
+from .core.extractor import (
+    AudioExtractor,
+    Extractors,
+    ImageExtractor,
+    VideoExtractor,
+)
 from .core.file_type import FileExt
 from .core.geo_resolver import GeoResolver
-from .core.utils import download_file, get_media, get_reply_id
+from .core.hash_index import ImageHashIndex
+from .core.media_source import MediaSource
+from .core.metrics import PREFETCH, metrics
+from .core.prefetch import Prefetcher
+from .core.reply import Reply, paginate
+from .core.result_cache import ResultCache
+from .core.tiers import Tier, TierPolicy
+from .core.utils import (
+    download_file,
+    get_content_length,
+    get_media,
+    get_message_media,
+    get_reply_id,
+    get_storage_size,
+    is_local_path,
+)
+from .core.worker_client import WorkerClient
 
 
 class ExtractPlugin(Star):
@@ -18,13 +46,58 @@ class ExtractPlugin(Star):
         super().__init__(context)
         self.config = config
         self.extract_types = self.config["extract_types"]
+        self.data_dir = StarTools.get_data_dir("astrbot_plugin_extract")
         self.geo_resolver = GeoResolver(config)
-        self.image_extractor = ImageExtractor(config, self.geo_resolver)
-        self.audio_extractor = AudioExtractor(config)
-        self.video_extractor = VideoExtractor(config)
+        self.hash_index = (
+            ImageHashIndex(self.data_dir / "image_hash.db", config["phash_threshold"])
+            if config["enable_phash"]
+            else None
+        )
+        self.extractors = Extractors(
+            ImageExtractor(config, self.geo_resolver, self.hash_index),
+            AudioExtractor(config),
+            VideoExtractor(config),
+        )
+        self.worker = (
+            WorkerClient(config["worker_socket"]) if config["worker_socket"] else None
+        )
+        self.admission = AdmissionController(config)
+        self.tiers = TierPolicy(config)
+        self.archive = (
+            MetadataArchive(
+                self.data_dir / "media_meta.db",
+                config["archive_flush_interval"],
+                config["archive_batch_size"],
+            )
+            if config["enable_archive"]
+            else None
+        )
+        self.result_cache = ResultCache(
+            config["result_cache_size"], config["result_cache_ttl"] * 60
+        )
+        self.prefetcher = (
+            Prefetcher(
+                config,
+                self.admission,
+                self.result_cache,
+                lambda url, mode, group_id: self._process(
+                    url, mode, group_id, prefetch=True
+                ),
+                self._flight_key,
+            )
+            if config["enable_prefetch"] and config["result_cache_size"] > 0
+            else None
+        )
 
     async def terminate(self):
+        if self.prefetcher:
+            await self.prefetcher.close()
+        metrics.export(self.config["metrics_export_path"], force=True)
         await self.geo_resolver.close()
+        if self.hash_index:
+            self.hash_index.close()
+        if self.archive:
+            await self.archive.close()
 
     @filter.command("raw")
     async def raw(self, event: AstrMessageEvent):
@@ -37,36 +110,332 @@ class ExtractPlugin(Star):
             yield event.plain_result(str(event.message_obj.raw_message))
 
     @filter.command("解析")
-    async def parse(self, event: AstrMessageEvent):
-        """解析媒体的信息"""
-        url = await get_media(event)
+    async def parse(self, event: AstrMessageEvent, mode: str = ""):
+        """解析媒体的信息，附加“章节”参数可额外输出视频章节，“详情”参数输出完整信息"""
+        want_detail = mode == "详情"
+        if want_detail:
+            mode = ""
+        group_id = event.get_group_id()
+        user_id = event.get_sender_id()
+        if wait := self.admission.check_rate(user_id, group_id):
+            metrics.count_error("unknown", "rate_limited")
+            yield event.plain_result(f"解析请求过于频繁，请 {wait:.0f} 秒后再试")
+            return
+
+        start = time.monotonic()
+        url, key = await get_media(
+            event, self.config["prefer_local_file"], self.config["local_file_dirs"]
+        )
+        resolve_ms = (time.monotonic() - start) * 1000
         if not url:
+            metrics.count_error("unknown", "no_url")
             yield event.plain_result("没解析到有效的URL")
             return
         logger.debug(f"解析媒体: {url}")
-        data = await download_file(url)
-        if not data:
-            yield event.plain_result("媒体下载失败")
-            return
 
-        ext = FileExt.from_bytes(data)
-        logger.debug(f"媒体类型: {ext}")
+        # 结果缓存（含后台预解析的结果）命中时直接回复
+        cache_key = (key, mode) if key and self.result_cache.max_entries > 0 else None
+        cached = self.result_cache.get(cache_key) if cache_key else None
+        if cache_key:
+            metrics.count_cache("result", cached is not None)
+        if cached:
+            reply, entry = cached
+        else:
+            # 相同媒体 + 相同参数的并发请求共享一次下载与解析
+            with self.admission.track():
+                (reply, entry), shared = await self.admission.flight.do(
+                    self._flight_key(url, mode, group_id),
+                    lambda: self._process(url, mode, group_id, resolve_ms),
+                )
+            metrics.count_cache("coalesce", shared)
+            if cache_key and entry and self._cacheable(entry["media"]):
+                self.result_cache.put(cache_key, (reply, entry))
 
-        if ext.is_image() and "image" in self.extract_types:
-            info = await self.image_extractor.get_image_info(data, ext)
+        if self.archive and entry:
+            self.archive.record(**entry, group_id=group_id, user_id=user_id)
+        for result in self._render(event, reply, want_detail):
+            yield result
 
-        elif ext.is_audio() and "audio" in self.extract_types:
-            info = await self.audio_extractor.get_audio_info(data, ext)
+    def _render(self, event: AstrMessageEvent, reply: Reply, want_detail: bool):
+        """
+        按输出模式组织回复：full 为单条完整信息；summary 先发摘要，完整信息在 OneBot 上
+        以合并转发发送、其它平台分页发送；brief 只发摘要，附加“详情”参数时同 summary
+        """
+        output = self.config["output_mode"]
+        if output == "full" or not reply.has_detail:
+            return [event.plain_result(reply.detail)]
+        if output == "brief" and not want_detail:
+            return [
+                event.plain_result(f"{reply.summary}\n（发送“解析 详情”查看完整信息）")
+            ]
 
-        elif ext.is_video() and "video" in self.extract_types:
-            info = await self.video_extractor.get_video_info(data, ext)
+        detail = reply.detail
+        if detail.count("\n") < self.config["forward_min_lines"]:
+            return [event.plain_result(detail)]  # 内容不多时不必拆分
+        pages = paginate(detail)
+        if isinstance(event, AiocqhttpMessageEvent):
+            nodes = [
+                Node(uin=event.get_self_id(), name="解析详情", content=[Plain(page)])
+                for page in pages
+            ]
+            return [
+                event.plain_result(reply.summary),
+                event.chain_result([Nodes(nodes)]),
+            ]
+        if len(pages) > 1:
+            pages = [f"（{i}/{len(pages)}）\n{page}" for i, page in enumerate(pages, 1)]
+        return [event.plain_result(reply.summary), *map(event.plain_result, pages)]
 
-        else:
-            yield event.plain_result("不支持的媒体类型")
+    @filter.event_message_type(filter.EventMessageType.ALL)
+    async def on_media_message(self, event: AstrMessageEvent):
+        """被动监听媒体消息，投递到后台预解析队列"""
+        if not self.prefetcher:
             return
+        group_id = event.get_group_id()
+        if not self.prefetcher.accepts(group_id):
+            return
+        prefer_local = self.config["prefer_local_file"]
+        allowed_dirs = self.config["local_file_dirs"]
+        for media, url, key, resolve in get_message_media(
+            event, prefer_local, allowed_dirs
+        ):
+            if media in self.extract_types and self._cacheable(media):
+                self.prefetcher.submit(media, url, key, group_id, resolve)
+
+    def _cacheable(self, media: str) -> bool:
+        """
+        开启重复检测时图片结果不进结果缓存，也不预解析：转发的图片 file 字段相同，
+        命中缓存会重放旧的出现次数，也不会把这次出现写入哈希库
+        """
+        return not (self.hash_index and media == "image")
+
+    def _flight_key(self, url: str, mode: str, group_id: str | None) -> tuple:
+        """
+        单飞的键；开启重复检测时图片结果与群有关（本群出现次数、写入的群号），
+        下载前又不知道媒体类型，因此一律按群区分
+        """
+        return (url, mode, group_id) if self.hash_index else (url, mode)
+
+    async def _fetch(
+        self, url: str
+    ) -> tuple[MediaSource | None, Tier | None, int | None]:
+        """按档位获取媒体数据：本地缓存文件直接内存映射，否则走 HTTP 下载"""
+        if is_local_path(url):
+            try:
+                total_size = os.path.getsize(url)
+            except OSError:
+                return None, None, None
+            tier = self.tiers.select(total_size)
+            source = MediaSource.from_file(url)
+            if source is not None and tier.header_only:
+                # 超大文件也只取头部，与 HTTP 路径保持一致
+                with source:
+                    header = MediaSource.from_bytes(
+                        source.head(self.tiers.header_bytes)
+                    )
+                return header, tier, total_size
+            return source, tier, total_size
+
+        total_size = await get_content_length(url)
+        tier = self.tiers.select(total_size)
+        if tier is None:
+            # 大小未知：限量下载，读满上限即视为超大文件
+            source = await download_file(url, self.tiers.medium_max + 1)
+            tier = self.tiers.select(len(source)) if source else None
+        elif tier.header_only:
+            source = await download_file(url, self.tiers.header_bytes)
+        else:
+            source = await download_file(url)
+        return source, tier, total_size
+
+    async def _process(
+        self,
+        url: str,
+        mode: str,
+        group_id: str,
+        resolve_ms: float = 0.0,
+        prefetch: bool = False,
+    ) -> tuple[Reply, dict | None]:
+        """
+        选择档位 → 获取数据 → 识别类型 → 提取
+        返回 (回复, 归档条目)，解析失败时归档条目为 None
+        prefetch=True 时指标记在 prefetch.<媒体类型> 下，不混入用户请求的统计
+        """
+        async with self.admission.slot("download"):
+            start = time.monotonic()
+            source, tier, total_size = await self._fetch(url)
+            fetch_ms = (time.monotonic() - start) * 1000
+        stage = "load" if is_local_path(url) else "download"
+        if not source or not tier:
+            if source:
+                source.close()
+            label = PREFETCH if prefetch else "unknown"
+            metrics.count_error(label, "download_failed")
+            return Reply("媒体下载失败"), None
+        with source:
+            return await self._process_data(
+                source,
+                tier,
+                total_size,
+                mode,
+                group_id,
+                resolve_ms,
+                fetch_ms,
+                stage,
+                prefetch,
+            )
+
+    async def _process_data(
+        self,
+        source: MediaSource,
+        tier: Tier,
+        total_size: int | None,
+        mode: str,
+        group_id: str,
+        resolve_ms: float,
+        fetch_ms: float,
+        fetch_stage: str,
+        prefetch: bool,
+    ) -> tuple[Reply, dict | None]:
+        start = time.monotonic()
+        ext = FileExt.from_bytes(source.head(32))
+        sniff_ms = (time.monotonic() - start) * 1000
+        logger.debug(f"媒体类型: {ext}，解析档位: {tier.name}")
+
+        # 下载前尚不知道媒体类型，识别后再归入对应类型的直方图
+        media = ext.media_type()
+        label = f"{PREFETCH}.{media}" if prefetch else media
+        metrics.count_request(label)
+        metrics.observe(label, "resolve", resolve_ms)
+        metrics.observe(label, fetch_stage, fetch_ms)
+        metrics.observe(label, "sniff", sniff_ms)
+
+        if media not in self.extract_types:
+            metrics.count_error(label, "unsupported")
+            return Reply("不支持的媒体类型"), None
+
+        try:
+            async with self.admission.slot(media):
+                with metrics.timer(label, "extract"):
+                    details = await asyncio.wait_for(
+                        self._extract(media, source, ext, mode, group_id, tier),
+                        timeout=tier.budget,
+                    )
+        except asyncio.TimeoutError:
+            metrics.count_error(label, "timeout")
+            return Reply(f"解析超时（{tier.budget}s），解析档位: {tier.label}"), None
+        except Exception:
+            metrics.count_error(label, "exception")
+            raise
+
+        metrics.export(self.config["metrics_export_path"])
 
-        if not info:
-            yield event.plain_result("解析信息时出错")
+        if not details and not tier.header_only:
+            metrics.count_error(label, "extract_failed")
+            return Reply("解析信息时出错"), None
+        if details and tier.header_only and "file_size" in details:
+            # 提取器只看到头部数据，大小改为整个文件的大小
+            details["file_size"] = (
+                get_storage_size(total_size)
+                if total_size
+                else f"超过 {get_storage_size(len(source))}"
+            )
+
+        entry = None
+        if details:
+            # 仅头部档位只拿到了部分数据，其哈希不能代表文件内容，不记录
+            digest = None
+            if self.archive and not tier.header_only:
+                digest = await asyncio.to_thread(content_hash, source)
+            entry = {
+                "media": media,
+                "ext": ext.value,
+                "details": details,
+                "digest": digest,
+            }
+
+        footer = []
+        if tier.header_only:
+            size = (
+                f"{total_size / 1024 / 1024:.2f} MB"
+                if total_size
+                else f"超过 {len(source) / 1024 / 1024:.2f} MB"
+            )
+            footer.append(
+                f"文件总大小: {size}"
+                f"（以上信息仅基于前 {len(source) // 1024} KB 头部数据）"
+            )
+        footer.append(f"解析档位: {tier.label}")
+        if not details:
+            return Reply("\n".join([f"格式: {ext.value}", *footer])), entry
+
+        # 摘要立即生成，完整信息等到真正发送时才渲染
+        summarize, render = self.extractors.formatters(media, ext)
+        return Reply(
+            "\n".join([summarize(details), *footer]),
+            lambda: "\n".join([render(details), *footer]),
+        ), entry
+
+    async def _extract(
+        self,
+        media: str,
+        source: MediaSource,
+        ext: FileExt,
+        mode: str,
+        group_id: str,
+        tier: Tier,
+    ) -> dict | None:
+        """结构化结果，供格式化、缓存与归档共用；配置了共享解析进程时优先交给它"""
+        if self.worker:
+            try:
+                details, cached = await self.worker.extract(
+                    media, source, ext, mode, group_id, tier
+                )
+                metrics.count_cache("worker", cached)
+                return details
+            except OSError as e:  # 含 ConnectionError；WorkerError 照常向上抛出
+                metrics.count_error(media, "worker_unavailable")
+                logger.warning(f"共享解析进程不可用，改为本地解析: {e}")
+        return await self.extractors.extract(media, source, ext, mode, group_id, tier)
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("解析统计")
+    async def stats(self, event: AstrMessageEvent):
+        """查看解析各阶段耗时分位数、吞吐量、缓存命中率与错误计数"""
+        metrics.export(self.config["metrics_export_path"], force=True)
+        yield event.plain_result(metrics.report())
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("解析查询")
+    async def archive_query(self, event: AstrMessageEvent):
+        """查询解析归档：/解析查询 [天数] [机型前缀]，如 /解析查询 7 iPhone 15"""
+        if not self.archive:
+            yield event.plain_result("未启用解析结果归档")
             return
+        args = event.message_str.split()[1:]  # 去掉指令名
+        days = int(args.pop(0)) if args and args[0].isdigit() else 7
+        model = " ".join(args)
+        group_id = event.get_group_id()
+
+        start = time.monotonic()
+        total, rows = await self.archive.query(
+            group_id=group_id,
+            model=model or None,
+            since=time.time() - days * 86400,
+        )
+        cost = (time.monotonic() - start) * 1000
 
-        yield event.plain_result(info)
+        scope = "本群" if group_id else "全部会话"
+        title = f"近 {days} 天{scope}" + (f"机型 {model}" if model else "")
+        lines = [f"{title}的解析记录：共 {total} 条（查询耗时 {cost:.1f} ms）"]
+        for row in rows:
+            when = time.strftime("%m-%d %H:%M", time.localtime(row["ts"]))
+            camera = " ".join(v for v in (row["make"], row["model"]) if v)
+            line = f"{when} {row['media']}/{row['ext']} 用户 {row['user_id']}"
+            if camera:
+                line += f" {camera}"
+            if row["taken_at"]:
+                taken = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["taken_at"]))
+                line += f" 拍摄于 {taken}"
+            lines.append(line)
+        yield event.plain_result("\n".join(lines))